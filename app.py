@@ -1,11 +1,28 @@
 import streamlit as st
 import pandas as pd
-import platform
+import numpy as np
 import io
+import os
+import platform
 import warnings
-import zipfile
-import xml.etree.ElementTree as ET
-import re
+import datetime
+import contextlib
+import perf_trace
+from parse_cache import ParseCache
+from snapshot_store import SnapshotStore
+from pacing_model import PacingModel
+from ingest_daemon import DropFolderIngestor
+from team_store import TeamStore, SOURCE_LABELS
+from scenario import (
+    SCENARIO_AXES, SCENARIO_OUTPUTS, FIXED_AD_TYPES, scenario_grid, evaluate_scenarios,
+    sensitivity_table, one_way_sensitivity,
+)
+from report_core import (
+    DEFAULT_PARAMS, DASHBOARD_HOURS, REPORT_SLOTS, ingest_canonical, final_from_canonical, snapshot_progress_by_hour,
+    manual_aff_count, compute_stats, compute_targets, hourly_goal, hourly_goal_table, estimate_close, cpa_summary,
+    build_report_texts, media_stats_table,
+)
+from report_export import day_section, snapshot_sections, write_report_workbook
 
 # 경고 메시지 무시
 warnings.simplefilter("ignore")
@@ -30,368 +47,212 @@ def set_korean_font():
 
 set_korean_font()
 
-# -----------------------------------------------------------
-# 1. 유틸리티 및 데이터 처리 함수
-# -----------------------------------------------------------
-def clean_currency(x):
-    """쉼표 제거 및 숫자 변환"""
-    if pd.isna(x) or x == '':
-        return 0.0
-    if isinstance(x, (int, float)):
-        return float(x)
-    if isinstance(x, str):
-        try:
-            return float(x.replace(',', '').replace('"', '').replace("'", "").strip())
-        except:
-            return 0.0
-    return 0.0
-
-def classify_product(campaign_name):
-    """상품 구분"""
-    if pd.isna(campaign_name):
-        return '상품'
-    name = str(campaign_name)
-    if '보장' in name or '누적' in name:
-        return '보장분석'
-    else:
-        return '상품'
-
-def get_media_from_plab(row):
-    """피랩 매체 식별"""
-    account = str(row.get('account', '')).upper()
-    gubun = str(row.get('구분', '')).upper()
-    
-    if 'DDN' in account: return '카카오'
-    if 'GDN' in account: return '구글'
-    
-    targets = ['네이버', '카카오', '토스', '구글', 'NAVER', 'KAKAO', 'TOSS', 'GOOGLE']
-    media_map = {'NAVER': '네이버', 'KAKAO': '카카오', 'TOSS': '토스', 'GOOGLE': '구글'}
-    
-    for t in targets:
-        if t in account: return media_map.get(t, t)
-    for t in targets:
-        if t in gubun: return media_map.get(t, t)
-
-    return '기타'
-
-def load_excel_xml_fallback(file):
-    """
-    [최후의 수단] 엑셀 파일을 Zip으로 열어서 XML 데이터를 직접 파싱.
-    openpyxl 라이브러리의 스타일 에러를 100% 우회함.
-    """
+@st.cache_resource
+def get_snapshot_store():
+    """시간대별 실적 스냅샷 저장소 (SQLite, 사용 불가 시 None)"""
     try:
-        file.seek(0)
-        z = zipfile.ZipFile(file)
-        
-        # 1. Shared Strings 추출 (엑셀은 문자열을 별도 XML에 저장함)
-        strings = []
-        if 'xl/sharedStrings.xml' in z.namelist():
-            with z.open('xl/sharedStrings.xml') as f:
-                tree = ET.parse(f)
-                root = tree.getroot()
-                # 네임스페이스 처리
-                ns = {'ns': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
-                for si in root.findall('ns:si', ns):
-                    t = si.find('ns:t', ns)
-                    if t is not None and t.text:
-                        strings.append(t.text)
-                    else:
-                        # 여러 서식이 섞인 경우 <r><t>...
-                        text_parts = []
-                        for r in si.findall('ns:r', ns):
-                            rt = r.find('ns:t', ns)
-                            if rt is not None and rt.text:
-                                text_parts.append(rt.text)
-                        strings.append("".join(text_parts))
-        
-        # 2. 첫 번째 시트 데이터 추출
-        # 보통 xl/worksheets/sheet1.xml에 있음
-        sheet_path = 'xl/worksheets/sheet1.xml'
-        if sheet_path not in z.namelist():
-             # sheet1이 없으면 sheet로 시작하는 첫번째 파일 찾기
-             sheets = [n for n in z.namelist() if n.startswith('xl/worksheets/sheet')]
-             if sheets: sheet_path = sheets[0]
-             else: return None
-
-        with z.open(sheet_path) as f:
-            tree = ET.parse(f)
-            root = tree.getroot()
-            ns = {'ns': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
-            
-            data = []
-            for row in root.findall('ns:sheetData/ns:row', ns):
-                row_data = []
-                cells = row.findall('ns:c', ns)
-                for c in cells:
-                    t = c.get('t') # 데이터 타입
-                    v_tag = c.find('ns:v', ns)
-                    val = v_tag.text if v_tag is not None else None
-                    
-                    if t == 's' and val is not None: # Shared String 참조
-                        try:
-                            val = strings[int(val)]
-                        except:
-                            val = ""
-                    elif t == 'inlineStr': # 인라인 문자열
-                        is_tag = c.find('ns:is', ns)
-                        if is_tag is not None:
-                            t_tag = is_tag.find('ns:t', ns)
-                            val = t_tag.text if t_tag is not None else ""
-                    
-                    row_data.append(val)
-                data.append(row_data)
-        
-        if not data: return None
-        
-        # 첫 줄을 헤더로
-        df = pd.DataFrame(data[1:], columns=data[0])
-        return df
+        return SnapshotStore()
+    except Exception:
+        return None
 
-    except Exception as e:
-        # st.error(f"XML 파싱 실패: {e}")
+@st.cache_resource
+def get_pacing_model():
+    """스냅샷 기반 마감 배수 학습 모델 (스냅샷 DB 옆 JSON에 저장, 사용 불가 시 None)"""
+    store = get_snapshot_store()
+    if store is None:
         return None
+    return PacingModel(os.path.join(os.path.dirname(os.path.abspath(store.path)), "pacing_model.json"))
 
-def load_file_by_rule(file):
-    """파일명 기반 맞춤형 읽기 로직"""
-    name = file.name
-    file.seek(0)
-    
-    # -------------------------------------------------------
-    # 1. 엑셀 파일 (.xlsx, .xls) 처리
-    # -------------------------------------------------------
-    if name.endswith(('.xlsx', '.xls')):
-        # [규칙 A] 토스 엑셀: Header=3
-        if '메리츠 화재' in name:
-            try: return pd.read_excel(file, engine='openpyxl', header=3)
-            except: pass
-
-        # [규칙 B] Performance Lab 등 일반 엑셀
-        try:
-            return pd.read_excel(file, engine='openpyxl')
-        except Exception:
-            # 실패 시 XML 강제 파싱 (스타일 에러 해결)
-            df_force = load_excel_xml_fallback(file)
-            if df_force is not None:
-                return df_force
-            
-            # 그것도 안되면 CSV로 시도
-            try:
-                file.seek(0)
-                return pd.read_csv(file, on_bad_lines='skip')
-            except:
-                st.error(f"❌ 파일 읽기 실패 ({name}). 파일이 손상되었거나 암호가 걸려있을 수 있습니다.")
-                return None
-
-    # -------------------------------------------------------
-    # 2. CSV 파일 처리
-    # -------------------------------------------------------
+@st.cache_resource
+def get_parse_cache():
+    """세션/프로세스 공용 파싱 캐시 (디스크 기반, 사용 불가 시 None)"""
     try:
-        if '캠페인 보고서' in name: # 구글
-            try: return pd.read_csv(file, sep='\t', encoding='utf-16', header=2, on_bad_lines='skip')
-            except: return pd.read_csv(file, sep='\t', encoding='utf-8-sig', header=2, on_bad_lines='skip')
+        return ParseCache()
+    except OSError:
+        return None
 
-        elif '메리츠화재다이렉트' in name: # 카카오
-            try: return pd.read_csv(file, sep='\t', encoding='utf-8', on_bad_lines='skip')
-            except: return pd.read_csv(file, sep='\t', encoding='cp949', on_bad_lines='skip')
+@st.cache_resource
+def get_team_store():
+    """팀 공유 집계 저장소 (SQLite WAL, 사용 불가 시 None)"""
+    try:
+        return TeamStore()
+    except Exception:
+        return None
 
-        elif '메리츠 화재' in name: # 토스
-            try: return pd.read_csv(file, header=3, encoding='utf-8', on_bad_lines='skip')
-            except: return pd.read_csv(file, header=3, encoding='cp949', on_bad_lines='skip')
-            
-    except:
-        pass
+@st.cache_resource
+def get_drop_ingestor(drop_dir):
+    """드롭 폴더 게시 결과 (ingest_daemon.py 가 미리 집계, 이후 들어온 파일만 여기서 처리)"""
+    return DropFolderIngestor(drop_dir, cache=get_parse_cache())
 
-    # 3. 공통 Fallback
-    encodings = ['utf-8', 'cp949', 'euc-kr', 'utf-16', 'utf-8-sig']
-    separators = [',', '\t']
-    
-    for enc in encodings:
-        for sep in separators:
-            try:
-                file.seek(0)
-                df = pd.read_csv(file, encoding=enc, sep=sep, on_bad_lines='skip')
-                if len(df.columns) > 1: return df
-            except: continue
-                
-    st.error(f"❌ 파일 형식을 인식할 수 없습니다: {name}")
-    return None
-
-def find_header_and_reload(df, target_col):
-    """헤더 자동 보정"""
-    if target_col in df.columns: return df
-    
-    # 상위 10행에서 컬럼명 탐색
-    for idx, row in df.head(10).iterrows():
-        row_values = [str(x).strip() for x in row.values]
-        if target_col in row_values:
-            new_df = df.iloc[idx+1:].copy()
-            new_df.columns = row_values
-            return new_df
-    return df
-
-def process_marketing_data(uploaded_files):
-    """파일명 기반 통합 로직"""
-    dfs = []
-    toss_files = [] 
-    
-    for file in uploaded_files:
-        filename = file.name
-        df = load_file_by_rule(file)
-        
-        if df is None: continue
-        
-        # 컬럼 공백 제거
-        df.columns = df.columns.astype(str).str.strip()
-            
-        try:
-            # 1. 네이버
-            if 'result' in filename:
-                df['Cost'] = df['총 비용'].apply(clean_currency)
-                df['상품'] = df['캠페인 이름'].apply(classify_product)
-                df['매체'] = '네이버'
-                grouped = df.groupby(['매체', '상품'])['Cost'].sum().reset_index()
-                grouped['보장'] = 0 
-                dfs.append(grouped)
-
-            # 2. 카카오
-            elif '메리츠화재다이렉트' in filename:
-                df['Cost'] = df['비용'].apply(clean_currency) * 1.1
-                df['상품'] = df['캠페인'].apply(classify_product)
-                df['매체'] = '카카오'
-                grouped = df.groupby(['매체', '상품'])['Cost'].sum().reset_index()
-                grouped['보장'] = 0
-                dfs.append(grouped)
-
-            # 3. 토스 (일단 리스트에 추가)
-            elif '메리츠 화재' in filename:
-                toss_files.append((filename, df))
-
-            # 4. 구글
-            elif '캠페인 보고서' in filename:
-                if '캠페인' in df.columns:
-                    df = df[~df['캠페인'].astype(str).str.contains('합계|Total|--', case=False, na=False)]
-                    df = df[df['캠페인'].notna()]
-
-                cost_val = df['비용'].apply(clean_currency) if '비용' in df.columns else 0
-                df['Cost'] = cost_val * 1.1 * 1.15
-                df['상품'] = df['캠페인'].apply(classify_product)
-                df['매체'] = '구글'
-                grouped = df.groupby(['매체', '상품'])['Cost'].sum().reset_index()
-                grouped['보장'] = 0
-                dfs.append(grouped)
-
-            # 5. 피랩
-            elif 'Performance Lab' in filename:
-                # 유연한 컬럼 찾기
-                send_col = next((c for c in df.columns if 'METIS전송' in c and '율' not in c), None)
-                fail_col = next((c for c in df.columns if 'METIS실패' in c), None)
-                re_col = next((c for c in df.columns if 'METIS재인입' in c), None)
-                
-                if send_col:
-                    s = df[send_col].apply(clean_currency)
-                    f = df[fail_col].apply(clean_currency) if fail_col else 0
-                    r = df[re_col].apply(clean_currency) if re_col else 0
-                    df['보장'] = s - f - r
-                else:
-                    df['보장'] = 0
-
-                df['매체'] = df.apply(get_media_from_plab, axis=1)
-                df['상품'] = df['구분'].apply(classify_product)
-                
-                plab_summary = df.groupby(['매체', '상품'])['보장'].sum().reset_index()
-                plab_summary['Cost'] = 0
-                dfs.append(plab_summary)
-
-        except Exception as e:
-            st.error(f"❌ 데이터 파싱 중 오류 ({filename}): {e}")
-            continue
-
-    # [토스 파일 후처리]
-    if toss_files:
-        toss_total_file = next((item for item in toss_files if '통합' in item[0]), None)
-        target_toss_files = [toss_total_file] if toss_total_file else toss_files
-        
-        for fname, df in target_toss_files:
-            try:
-                # [헤더 자동 보정]
-                if '소진 비용' not in df.columns:
-                    df = find_header_and_reload(df, '소진 비용')
-
-                if '캠페인 명' in df.columns:
-                     df = df[~df['캠페인 명'].astype(str).str.contains('합계|Total', case=False, na=False)]
-                
-                if '소진 비용' in df.columns:
-                    df['Cost'] = df['소진 비용'].apply(clean_currency) * 1.1
-                    df['상품'] = df['캠페인 명'].apply(classify_product)
-                    df['매체'] = '토스'
-                    grouped = df.groupby(['매체', '상품'])['Cost'].sum().reset_index()
-                    grouped['보장'] = 0
-                    dfs.append(grouped)
+# -----------------------------------------------------------
+# 1. 화면 출력 (파싱/집계/보고 계산은 report_core)
+# -----------------------------------------------------------
+def _st_notify(level, msg):
+    """파일 처리 메시지를 스트림릿 화면에 바로 출력 (st.error / st.warning)"""
+    getattr(st, level)(msg)
+
+# 의존 단계별 계산 재사용 (세션 단위)
+# - 입력(deps)이 이전 실행과 같으면 저장된 결과를 그대로 사용, 다르면 그 단계만 다시 계산
+# - 보고 문구/시나리오 입력처럼 계산과 무관한 위젯을 바꿀 때 파일 처리·집계를 반복하지 않음
+MANUAL_KEYS = ['manual_da_cnt', 'manual_da_cost', 'manual_aff_cost', 'manual_aff_cpa']
+TARGET_KEYS = ['target_bojang', 'target_product', 'sa_est_bojang', 'sa_est_prod', 'da_add_target', 'active_member']
+
+def _node(name, deps, compute):
+    memo = st.session_state.setdefault('_nodes', {})
+    hit = memo.get(name)
+    if hit is not None and hit[0] == deps:
+        return hit[1]
+    value = compute()
+    memo[name] = (deps, value)
+    return value
+
+def _forget(name):
+    """실패(일시 오류) 결과는 남기지 않음 → 다음 실행에서 다시 시도"""
+    st.session_state.get('_nodes', {}).pop(name, None)
+
+def show_team_status(team, report_day):
+    """사이드바: 일자별 소스 게시 현황 + 게시 취소"""
+    status = team.sources(report_day)
+    with st.expander(f"👥 팀 게시 현황 ({len(status)}개 매체)", expanded=True):
+        if status.empty:
+            st.caption("아직 게시된 매체가 없습니다.")
+        for row in status.itertuples():
+            st.caption(f"{SOURCE_LABELS.get(row.source, row.source)} · {row.owner} · {row.updated_at[11:16]} · "
+                       f"파일 {row.files}개 · 비용 {row.cost:,.0f}")
+        c1, c2 = st.columns(2)
+        with c1:
+            st.button("🔄 새로고침", key="team_refresh")
+        with c2:
+            if not status.empty:
+                clear = st.multiselect("게시 취소", list(status['source']), format_func=lambda s: SOURCE_LABELS.get(s, s),
+                                       key="team_clear", label_visibility="collapsed", placeholder="게시 취소할 매체")
+                if clear and st.button("🗑️ 취소", key="team_clear_btn"):
+                    team.clear(report_day, clear)
+                    st.rerun()
+
+# 보고 탭: fragment 라 탭 안의 입력을 바꾸면 해당 탭만 다시 실행됨
+@st.fragment
+def render_morning_report(text, acc_res, actual_by_hour):
+    st.subheader("📋 오전 목표 수립")
+    chart_df = pd.DataFrame({'목표 흐름': acc_res}, index=DASHBOARD_HOURS)
+    if not actual_by_hour.empty:
+        chart_df['실제 실적'] = actual_by_hour.reindex(DASHBOARD_HOURS)
+    st.line_chart(chart_df)
+    st.text_area("복사 텍스트:", text, height=300)
+
+@st.fragment
+def render_report_text(title, label, text, height):
+    st.subheader(title)
+    st.text_area(label, text, height=height)
+
+@st.fragment
+def render_tomorrow_report(res, params, targets, est):
+    st.subheader("🌙 명일 자원 수립")
+    c1, c2 = st.columns(2)
+    with c1: tom_member = st.number_input("명일 인원", value=350, key="tom_member")
+    with c2: tom_dawn_ad = st.checkbox("새벽 광고", value=False, key="tom_dawn_ad")
+    params = dict(params, tom_member=tom_member, tom_dawn_ad=tom_dawn_ad)
+    st.text_area("복사 텍스트 (퇴근):", build_report_texts(res, params, targets, est)["18:00"], height=250)
+
+# 엑셀 내보내기: 버튼을 눌렀을 때만 파일 생성 (fragment 라 화면 전체는 다시 실행하지 않음)
+@st.fragment
+def render_export(res, params, targets, est, actual_by_hour, report_day, snapshot_store, pacing_model):
+    with st.expander("📥 엑셀 내보내기 (매체별 실적 · 시간대별 목표 · 보고 문구)"):
+        params = dict(params, tom_member=st.session_state.get('tom_member', params['tom_member']),
+                      tom_dawn_ad=st.session_state.get('tom_dawn_ad', params['tom_dawn_ad']))
+        scope = st.radio("범위", ["현재 화면", "기간 (저장된 스냅샷)"], horizontal=True,
+                         disabled=snapshot_store is None, key="export_scope")
+        if scope == "현재 화면":
+            if st.button("엑셀 만들기", key="export_today"):
+                buf = io.BytesIO()
+                write_report_workbook(buf, [day_section(report_day, res, params, targets, est, actual_by_hour=actual_by_hour)])
+                st.session_state['_export'] = (f"meritz_report_{report_day:%Y%m%d}.xlsx", buf.getvalue())
+        else:
+            period = st.date_input("기간", value=(report_day - datetime.timedelta(days=6), report_day), key="export_period")
+            if len(period) == 2 and st.button("엑셀 만들기", key="export_range"):
+                start, end = period
+                buf = io.BytesIO()
+                days = write_report_workbook(buf, snapshot_sections(snapshot_store, start, end, params, pacing=pacing_model))
+                if days:
+                    st.session_state['_export'] = (f"meritz_report_{start:%Y%m%d}_{end:%Y%m%d}.xlsx", buf.getvalue())
                 else:
-                    st.warning(f"⚠️ 토스 파일에 '소진 비용' 컬럼이 없습니다: {fname}")
-            except Exception as e:
-                st.error(f"❌ 토스 파일 처리 오류 ({fname}): {e}")
+                    st.session_state.pop('_export', None)
+                    st.info("기간 안에 저장된 스냅샷이 없습니다.")
+        if '_export' in st.session_state:
+            name, data = st.session_state['_export']
+            st.download_button(f"📥 {name}", data, file_name=name,
+                               mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+# 시나리오 탭: fragment 라 이 안의 입력을 바꿔도 시나리오 부분만 다시 실행됨
+SCENARIO_NUMERIC = ['target_bojang', 'target_product', 'sa_est_bojang', 'sa_est_prod', 'da_add_target', 'active_member']
+
+@st.fragment
+def render_scenarios(res, params, pacing_model):
+    st.subheader("🧪 목표/배수 시나리오")
+    st.caption("사이드바 값을 기준으로 항목별 범위를 정하면 모든 조합을 한 번에 계산합니다 (현재 실적·요일·시간대 고정).")
+
+    steps = st.slider("항목별 단계 수", 2, 15, 7)
+    axes = {}
+    cols = st.columns(3)
+    for i, key in enumerate(SCENARIO_NUMERIC):
+        base = int(params[key])
+        span = max(50, int(abs(base) * 0.2))
+        with cols[i % 3]:
+            vary = st.checkbox(SCENARIO_AXES[key], value=key in ('target_product', 'active_member'), key=f"sc_vary_{key}")
+            if vary:
+                lo, hi = st.slider("범위", base - 3 * span, base + 3 * span, (base - span, base + span),
+                                   key=f"sc_range_{key}", label_visibility="collapsed")
+                candidates = set(np.linspace(lo, hi, steps).round().astype(int).tolist())
+                if lo <= base <= hi: candidates.add(base) # 기준값 포함 (항목별 영향 계산용)
+                axes[key] = sorted(candidates)
+    c_b, c_f = st.columns(2)
+    with c_b:
+        boost = st.multiselect(SCENARIO_AXES['is_boosting'], [False, True], default=[params['is_boosting']],
+                               format_func=lambda v: "부스팅" if v else "일반")
+        if boost: axes['is_boosting'] = boost
+    with c_f:
+        ad_types = st.multiselect(SCENARIO_AXES['fixed_ad_type'], FIXED_AD_TYPES, default=[params['fixed_ad_type']])
+        if ad_types: axes['fixed_ad_type'] = ad_types
 
-    if not dfs:
-        return None
-
-    # 통합
-    all_data = pd.concat(dfs, ignore_index=True)
-    final_df = all_data.groupby(['매체', '상품']).sum().reset_index()
-    
-    if '보장' not in final_df.columns: final_df['보장'] = 0.0
-    if 'Cost' not in final_df.columns: final_df['Cost'] = 0.0
-    
-    final_df['CPA'] = final_df.apply(lambda x: x['Cost'] / x['보장'] if x['보장'] > 0 else 0, axis=1)
-    
-    return final_df
-
-def convert_to_stats(final_df, manual_aff_cnt, manual_aff_cost, manual_da_cnt, manual_da_cost):
-    """통계 변환"""
-    media_list = ['네이버', '카카오', '토스', '구글', '제휴', '기타']
-    stats = pd.DataFrame(index=media_list, columns=['Bojang_Cnt', 'Prod_Cnt', 'Cost', 'CPA']).fillna(0)
-    
-    if final_df is not None:
-        for _, row in final_df.iterrows():
-            m = row['매체']
-            if m not in stats.index: m = '기타'
-            
-            stats.loc[m, 'Cost'] += row['Cost']
-            if row['상품'] == '보장분석':
-                stats.loc[m, 'Bojang_Cnt'] += row['보장']
-            else:
-                stats.loc[m, 'Prod_Cnt'] += row['보장']
-    
-    # 수기 보정
-    if manual_da_cnt > 0 or manual_da_cost > 0:
-        stats.loc['기타', 'Prod_Cnt'] += manual_da_cnt
-        stats.loc['기타', 'Cost'] += manual_da_cost
-
-    if manual_aff_cnt > 0 or manual_aff_cost > 0:
-        stats.loc['제휴', :] = 0
-        stats.loc['제휴', 'Bojang_Cnt'] = manual_aff_cnt
-        stats.loc['제휴', 'Cost'] = manual_aff_cost
-
-    stats['Total_Cnt'] = stats['Bojang_Cnt'] + stats['Prod_Cnt']
-    stats['CPA'] = stats.apply(lambda x: x['Cost'] / x['Total_Cnt'] if x['Total_Cnt'] > 0 else 0, axis=1)
-    
-    res = {
-        'da_cost': int(stats.drop('제휴')['Cost'].sum()),
-        'da_cnt': int(stats.drop('제휴')['Total_Cnt'].sum()),
-        'da_bojang': int(stats.drop('제휴')['Bojang_Cnt'].sum()),
-        'da_prod': int(stats.drop('제휴')['Prod_Cnt'].sum()),
-        'aff_cost': int(stats.loc['제휴', 'Cost']),
-        'aff_cnt': int(stats.loc['제휴', 'Total_Cnt']),
-        'bojang_cnt': int(stats['Bojang_Cnt'].sum()),
-        'prod_cnt': int(stats['Prod_Cnt'].sum()),
-        'media_stats': stats
-    }
-    
-    res['total_cost'] = res['da_cost'] + res['aff_cost']
-    res['total_cnt'] = res['da_cnt'] + res['aff_cnt']
-    res['ratio_ba'] = res['bojang_cnt'] / res['total_cnt'] if res['total_cnt'] > 0 else 0.898
-    
-    return res
+    try:
+        grid = scenario_grid(params, **axes)
+    except ValueError as e:
+        st.warning(f"⚠️ {e}")
+        return
+    scenarios = evaluate_scenarios(grid, res, params, pacing=pacing_model)
+
+    m1, m2, m3 = st.columns(3)
+    m1.metric("조합 수", f"{len(scenarios):,}개")
+    m2.metric("목표 달성 조합 (현재 기준)", f"{(scenarios['gap_live'] >= 0).mean() * 100:.0f}%")
+    m3.metric("Gap 범위 (현재 기준)", f"{scenarios['gap_live'].min():,} ~ {scenarios['gap_live'].max():,}")
+
+    varied = [k for k in SCENARIO_AXES if scenarios[k].nunique() > 1]
+    if not varied:
+        st.info("바꿔 볼 항목을 하나 이상 선택하세요.")
+        return
+    c1, c2, c3 = st.columns(3)
+    with c1: row = st.selectbox("행", varied, format_func=SCENARIO_AXES.get)
+    with c2: col = st.selectbox("열", [None] + [k for k in varied if k != row],
+                                format_func=lambda k: "(없음)" if k is None else SCENARIO_AXES[k])
+    with c3: value = st.selectbox("값", list(SCENARIO_OUTPUTS), index=list(SCENARIO_OUTPUTS).index('gap_live'),
+                                  format_func=SCENARIO_OUTPUTS.get)
+
+    if col is None:
+        table = scenarios.groupby(row)[value].mean().to_frame(SCENARIO_OUTPUTS[value])
+    else:
+        table = sensitivity_table(scenarios, row, col, value=value)
+    st.markdown(f"##### 📌 {SCENARIO_OUTPUTS[value]} (다른 항목은 평균)")
+    fmt = "{:.1%}" if value == 'achieve_live' else ("{:,.1f}" if value in ('da_per_18', 'cpa_close') else "{:,.0f}")
+    st.dataframe(table.style.format(fmt), use_container_width=True)
+    if row != 'is_boosting' and row != 'fixed_ad_type':
+        chart = table.copy()
+        chart.columns = [str(c) for c in chart.columns]
+        st.line_chart(chart)
+
+    st.markdown("##### 📌 항목별 영향 (기준값에서 한 항목만 바꿨을 때)")
+    st.dataframe(one_way_sensitivity(scenarios, params, value=value), use_container_width=True, hide_index=True)
+    st.download_button("📥 시나리오 전체 (CSV)", scenarios.to_csv(index=False).encode("utf-8-sig"),
+                       file_name="scenarios.csv", mime="text/csv")
 
 # -----------------------------------------------------------
 # MODE: V18.35 Master
@@ -400,109 +261,189 @@ def run_v18_35_master():
     st.title("📊 메리츠화재 DA 통합 시스템 (V18.35 Ultimate)")
     st.markdown("🚀 **XML 파싱 엔진 탑재 (에러 완전 방지)**")
 
-    # 변수 초기화
-    current_bojang, current_prod = 0, 0
+    params = dict(DEFAULT_PARAMS)
     
     with st.sidebar:
         st.header("1. 기본 설정")
-        current_time_str = st.select_slider("⏱️ 현재 기준", options=["09:30", "10:00", "11:00", "12:00", "13:00", "14:00", "15:00", "16:00", "17:00", "18:00"], value="14:00")
+        current_time_str = st.select_slider("⏱️ 현재 기준", options=REPORT_SLOTS, value="14:00")
         is_boosting = False
         if current_time_str in ["16:00", "17:00"]:
             is_boosting = st.checkbox("🔥 긴급 부스팅", value=False)
         day_option = st.selectbox("요일", ['월', '화', '수', '목', '금'], index=0)
+        report_day = st.date_input("기준 일자", value=datetime.date.today())
+        params.update(time=current_time_str, day=day_option, is_boosting=is_boosting)
         
         st.header("2. 목표 수립")
-        active_member = st.number_input("활동 인원", value=359)
+        params['active_member'] = st.number_input("활동 인원", value=359)
         c1, c2 = st.columns(2)
-        with c1: target_bojang = st.number_input("보장 목표", value=500)
-        with c2: target_product = st.number_input("상품 목표", value=3100)
+        with c1: params['target_bojang'] = st.number_input("보장 목표", value=500)
+        with c2: params['target_product'] = st.number_input("상품 목표", value=3100)
         c3, c4 = st.columns(2)
-        with c3: sa_est_bojang = st.number_input("SA 보장", value=200)
-        with c4: sa_est_prod = st.number_input("SA 상품", value=800)
-        da_add_target = st.number_input("DA 버퍼", value=50)
-
-        da_target_bojang = target_bojang - sa_est_bojang
-        da_target_prod = target_product - sa_est_prod + da_add_target
-        da_target_18 = da_target_bojang + da_target_prod
-        target_ratio_ba = da_target_bojang / da_target_18 if da_target_18 > 0 else 0.898
-        
-        if active_member > 0:
-            da_per_18 = round(da_target_18 / active_member, 1)
-            da_target_17 = int(da_target_18 * 0.96)
-            da_per_17 = round(da_target_17 / active_member, 1)
+        with c3: params['sa_est_bojang'] = st.number_input("SA 보장", value=200)
+        with c4: params['sa_est_prod'] = st.number_input("SA 상품", value=800)
+        params['da_add_target'] = st.number_input("DA 버퍼", value=50)
 
         st.header("3. [자동] 10시 자원")
         with st.expander("📂 업로드"):
             st.file_uploader("어제 24시", key="f1")
             st.file_uploader("오늘 10시", key="f3")
-        start_resource_10 = st.number_input("10시 자원", value=1100)
+        params['start_resource_10'] = st.number_input("10시 자원", value=1100)
 
         st.header("4. [실시간] 분석")
-        uploaded_realtime = st.file_uploader("실시간 파일 (파일명 자동 인식)", accept_multiple_files=True)
+        uploaded_realtime = st.file_uploader("실시간 파일 (파일명 자동 인식 · ZIP 가능)", accept_multiple_files=True)
+        drop_dir = st.text_input("📂 드롭 폴더 (자동 집계)", value=os.environ.get("MERITZ_DROP_DIR", ""))
+        drop = None
+        if drop_dir.strip():
+            if os.path.isdir(drop_dir.strip()):
+                drop = get_drop_ingestor(os.path.abspath(drop_dir.strip()))
+                try:
+                    drop_summary = drop.refresh()
+                except Exception as e:
+                    drop_summary = None
+                    st.warning(f"⚠️ 드롭 폴더 처리 실패: {e}")
+                drop_status = drop.status()
+                published = drop_status['published_at'].strftime('%H:%M:%S') if drop_status['published_at'] else "-"
+                st.caption(f"📂 파일 {len(drop_status['files'])}개 · 게시 {published}")
+                if drop_summary and drop_summary['pending']:
+                    st.caption(f"⏳ 복사 중: {', '.join(drop_summary['pending'])}")
+            else:
+                st.warning("⚠️ 드롭 폴더를 찾을 수 없습니다.")
+        team = None
+        if st.checkbox("👥 팀 공유 집계 (매체 담당자별 업로드 합산)", value=False, disabled=get_team_store() is None):
+            team = get_team_store()
+            team_owner = st.text_input("담당자", value=os.environ.get("USER", ""), key="team_owner").strip() or "-"
+        parallel_ingest = st.checkbox("⚡ 병렬 처리 (여러 파일 동시 읽기)", value=True)
+        perf_enabled = st.checkbox("⏱️ 성능 측정 (단계별 시간)", value=False)
+        trace_memory = st.checkbox("메모리 추적 (느림 · 순차 처리)", value=False, disabled=not perf_enabled)
         
         st.markdown("**✏️ 수기 입력 (제휴)**")
         col_m1, col_m2 = st.columns(2)
         with col_m1:
-            manual_da_cnt = st.number_input("DA 추가 건", value=0)
-            manual_da_cost = st.number_input("DA 추가 액", value=0)
+            params['manual_da_cnt'] = st.number_input("DA 추가 건", value=0)
+            params['manual_da_cost'] = st.number_input("DA 추가 액", value=0)
         with col_m2:
-            manual_aff_cost = st.number_input("제휴 소진액", value=11270000) 
-            manual_aff_cpa = st.number_input("제휴 단가", value=14000)
-            manual_aff_cnt = int(manual_aff_cost / manual_aff_cpa) if manual_aff_cpa > 0 else 0
-            st.caption(f"제휴 환산: {manual_aff_cnt:,}건")
+            params['manual_aff_cost'] = st.number_input("제휴 소진액", value=11270000) 
+            params['manual_aff_cpa'] = st.number_input("제휴 단가", value=14000)
+            st.caption(f"제휴 환산: {manual_aff_count(params):,}건")
 
         # --- 데이터 처리 ---
-        final_df = process_marketing_data(uploaded_realtime) if uploaded_realtime else None
-        res = convert_to_stats(final_df, manual_aff_cnt, manual_aff_cost, manual_da_cnt, manual_da_cost)
-        
-        current_total = res['total_cnt']
-        cost_total = res['total_cost']
-        ratio_ba = res['ratio_ba']
-        current_bojang = res['bojang_cnt']
-        current_prod = res['prod_cnt']
+        # 메모리 추적은 프로세스 전체 기준이라 파일별로 나누려면 순차 처리
+        perf = perf_trace.PerfRecorder(trace_memory=trace_memory) if perf_enabled else None
+        max_workers = None if parallel_ingest and not (perf and trace_memory) else 1
+        # 업로드 파일(file_id)·드롭 폴더 게시 번호가 같으면 이전 집계 재사용 (성능 측정 중에는 매번 다시 처리)
+        ingest_deps = (
+            tuple((getattr(f, 'file_id', None), f.name, f.size) for f in uploaded_realtime or []),
+            (drop.drop_dir, drop.status()['generation']) if drop else None,
+            team is not None,
+            perf.run_id if perf else None,
+        )
+
+        def ingest():
+            messages, removed = [], []
+            notify = lambda level, msg: messages.append((level, msg))
+            if uploaded_realtime or team is not None:
+                # 팀 모드는 게시용 표준 표가 필요 (드롭 폴더만 있어도 같은 방식으로 병합)
+                canon = ingest_canonical(uploaded_realtime or [], cache=get_parse_cache(), max_workers=max_workers,
+                                         notify=notify, preloaded=drop.results() if drop else None, removed=removed)
+                return final_from_canonical(canon), canon, messages, removed
+            df = drop.final_df() if drop else None
+            return df, None, messages, drop.status()['removed'] if drop else []
+
+        with perf_trace.recording(perf) if perf else contextlib.nullcontext():
+            final_df, session_canon, ingest_messages, dedup_removed = _node('ingest', ingest_deps, ingest)
+            data_deps = ingest_deps
+            if team is not None:
+                # 내 파일의 소스만 게시 (업로드가 바뀐 경우만) → 다른 담당자 게시분과 합친 일자 통합 표
+                def publish():
+                    try:
+                        return team.publish(report_day, session_canon, team_owner), None
+                    except Exception as e:
+                        return [], f"⚠️ 팀 집계 게시 실패: {e}"
+                _, publish_error = _node('team_publish', (ingest_deps, report_day, team_owner), publish)
+                if publish_error:
+                    st.warning(publish_error)
+                    _forget('team_publish')
+                data_deps = (ingest_deps, report_day, team.signature(report_day))
+                final_df = _node('team_view', data_deps, lambda: final_from_canonical(team.load_canonical(report_day)))
+            stats_deps = (data_deps, tuple(params[k] for k in MANUAL_KEYS))
+            res = _node('stats', stats_deps, lambda: compute_stats(final_df, params))
+        for level, msg in ingest_messages:
+            _st_notify(level, msg)
+        if team is not None:
+            show_team_status(team, report_day)
+
+        # 시간대별 스냅샷 저장 (같은 일자·시간대는 덮어씀, 실적이 바뀐 경우만)
+        snapshot_store = get_snapshot_store()
+        # 기본은 저장 안 함 (MERITZ_SNAPSHOT_DB 로 저장 위치를 정한 환경만 기본 저장)
+        save_snapshot = st.checkbox("📦 스냅샷 자동 저장", value="MERITZ_SNAPSHOT_DB" in os.environ,
+                                    disabled=snapshot_store is None)
+        snapshot_deps = None
+        if snapshot_store is not None and save_snapshot and final_df is not None:
+            snapshot_deps = (stats_deps, report_day, current_time_str)
+
+            def save():
+                try:
+                    snapshot_store.save(report_day, current_time_str, res)
+                except Exception as e:
+                    return f"⚠️ 스냅샷 저장 실패: {e}"
+            snapshot_error = _node('snapshot', snapshot_deps, save)
+            if snapshot_error:
+                st.warning(snapshot_error)
+                _forget('snapshot')
+
+        # 저장소의 일자별 서명: 다른 세션·CLI·팀원이 저장한 스냅샷도 반영 (조회 실패 시 매번 다시 계산)
+        snapshot_sigs = None
+        if snapshot_store is not None:
+            try:
+                snapshot_sigs = snapshot_store.day_signatures()
+            except Exception:
+                snapshot_sigs = object()
+
+        # 저장된 스냅샷으로 마감 배수 학습 (저장소 내용이 바뀌었을 때만 다시 확인)
+        pacing_model = get_pacing_model()
+        use_pacing = st.checkbox("📈 학습 배수 사용", value=True, disabled=pacing_model is None)
+        pacing_deps = snapshot_sigs
+        if pacing_model is not None:
+            def learn():
+                try:
+                    pacing_model.refresh(snapshot_store)
+                except Exception as e:
+                    return f"⚠️ 배수 학습 실패: {e}"
+            pacing_error = _node('pacing', pacing_deps, learn)
+            if pacing_error:
+                st.warning(pacing_error)
+                _forget('pacing')
+                pacing_model = None
+        if not use_pacing:
+            pacing_model = None
 
         st.header("5. 보고 설정")
-        tom_member = st.number_input("명일 인원", value=350)
-        tom_dawn_ad = st.checkbox("새벽 광고", value=False)
-        fixed_ad_type = st.radio("발송 시간", ["없음", "12시", "14시", "Both"], index=2)
-        fixed_content = st.text_input("내용", value="14시 카카오페이 TMS 발송 예정입니다")
-
-    # --- 계산 ---
-    base_mul_14 = 1.35
-    if day_option == '월': base_mul_14 = 1.15
-    elif fixed_ad_type != "없음": base_mul_14 = 1.215
-    
-    mul_14 = base_mul_14
-    mul_16 = 1.25 if is_boosting else 1.10
-
-    est_18_from_14 = int(current_total * mul_14)
-    if est_18_from_14 > da_target_18 + 250: est_18_from_14 = da_target_18 + 150
-    elif est_18_from_14 < da_target_18 - 250: est_18_from_14 = da_target_18 - 150
-
-    est_ba_18_14 = int(est_18_from_14 * ratio_ba)
-    est_prod_18_14 = est_18_from_14 - est_ba_18_14
-
-    cpa_da = round(res['da_cost'] / res['da_cnt'] / 10000, 1) if res['da_cnt'] > 0 else 0
-    cpa_aff = round(res['aff_cost'] / res['aff_cnt'] / 10000, 1) if res['aff_cnt'] > 0 else 0
-    cpa_total = round(cost_total / current_total / 10000, 1) if current_total > 0 else 0
-
-    if fixed_ad_type != "없음":
-        fixed_msg = f"금일 {fixed_content}." if fixed_content.strip() else "금일 특이사항 없이 운영 중이며,"
-    else:
-        fixed_msg = "금일 특이사항 없이 운영 중이며,"
-
-    msg_14 = "금일 고정구좌 이슈없이 집행중이며..." if est_18_from_14 >= da_target_18 else "오전 목표 대비 소폭 부족할 것으로 예상되나, 남은 시간 집중 관리하겠습니다."
-    
-    time_multipliers = {
-        "09:30": 1.0, "10:00": 1.75, "11:00": 1.65, "12:00": 1.55, "13:00": 1.45,
-        "14:00": mul_14, "15:00": (mul_14 + mul_16)/2, "16:00": mul_16, 
-        "17:00": 1.05 if not is_boosting else 1.15, "18:00": 1.0
-    }
-    current_mul = time_multipliers.get(current_time_str, 1.35)
-    est_final_live = int(current_total * current_mul)
+        params['fixed_ad_type'] = st.radio("발송 시간", ["없음", "12시", "14시", "Both"], index=2)
+        params['fixed_content'] = st.text_input("내용", value="14시 카카오페이 TMS 발송 예정입니다")
+
+    # --- 계산 (입력이 바뀐 단계만 다시 계산) ---
+    targets_deps = tuple(params[k] for k in TARGET_KEYS)
+    targets = _node('targets', targets_deps, lambda: compute_targets(params))
+    estimate_deps = (stats_deps, targets_deps, params['day'], params['time'], params['is_boosting'],
+                     params['fixed_ad_type'], pacing_deps if pacing_model is not None else None)
+    est = _node('estimate', estimate_deps, lambda: estimate_close(res, params, targets, pacing=pacing_model))
+    cpa = _node('cpa', stats_deps, lambda: cpa_summary(res))
+    report_deps = (estimate_deps, params['active_member'], params['fixed_content'])
+    texts = _node('texts', report_deps, lambda: build_report_texts(res, params, targets, est))
+    current_total = res['total_cnt']
+    da_target_18 = targets['da_target_18']
+    target_ratio_ba = targets['target_ratio_ba']
+    pace_live = est['pace_live']
+
+    # 저장된 스냅샷 기준 실제 시간대별 실적 (목표 흐름과 비교)
+    day_sig = snapshot_sigs.get(report_day.isoformat()) if isinstance(snapshot_sigs, dict) else snapshot_sigs
+    actual_by_hour = _node('actual_by_hour', (report_day, day_sig),
+                           lambda: snapshot_progress_by_hour(snapshot_store, report_day))
+    acc_res = _node('hourly_goal', (params['start_resource_10'], da_target_18),
+                    lambda: hourly_goal(params['start_resource_10'], da_target_18))
 
     # --- 탭 ---
-    tab0, tab1, tab2, tab3, tab4 = st.tabs(["📊 대시보드", "🌅 09:30 목표", "🔥 14:00 중간", "⚠️ 16:00 마감", "🌙 18:00 퇴근"])
+    tab0, tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 대시보드", "🌅 09:30 목표", "🔥 14:00 중간", "⚠️ 16:00 마감", "🌙 18:00 퇴근", "🧪 시나리오"])
 
     with tab0:
         st.subheader(f"📊 실시간 DA 현황 대시보드 ({current_time_str})")
@@ -510,39 +451,30 @@ def run_v18_35_master():
         c1, c2, c3, c4 = st.columns(4)
         with c1:
             st.metric("최종 목표", f"{da_target_18:,}건")
-            st.markdown(f":grey[보장 {da_target_bojang:,} / 상품 {da_target_prod:,}]")
+            st.markdown(f":grey[보장 {targets['da_target_bojang']:,} / 상품 {targets['da_target_prod']:,}]")
         with c2:
             progress = min(1.0, current_total/da_target_18) if da_target_18 > 0 else 0
             st.metric("현재 실적", f"{current_total:,}건", f"{progress*100:.1f}%")
-            st.markdown(f":grey[보장 {current_bojang:,} / 상품 {current_prod:,}]")
+            st.markdown(f":grey[보장 {res['bojang_cnt']:,} / 상품 {res['prod_cnt']:,}]")
         with c3:
+            est_final_live = est['est_final_live']
             st.metric("마감 예상", f"{est_final_live:,}건", f"Gap: {est_final_live - da_target_18}")
-            est_ba_live = int(est_final_live * ratio_ba)
-            est_prod_live = est_final_live - est_ba_live
-            st.markdown(f":grey[보장 {est_ba_live:,} / 상품 {est_prod_live:,}]")
+            st.markdown(f":grey[보장 {est['est_ba_live']:,} / 상품 {est['est_prod_live']:,}]")
+            if pace_live is not None:
+                st.caption(f"학습 배수 ×{pace_live['mul']:.2f} ({pace_live['n']}일) · 95% 구간 {pace_live['low']:,}~{pace_live['high']:,}")
+            else:
+                st.caption(f"기본 배수 ×{est['current_mul']:.2f} (학습 이력 부족)")
         with c4:
-            st.metric("현재 CPA", f"{cpa_total:.1f}만원")
-            st.markdown(f":grey[DA {cpa_da:.1f} / 제휴 {cpa_aff:.1f}]")
+            st.metric("현재 CPA", f"{cpa['cpa_total']:.1f}만원")
+            st.markdown(f":grey[DA {cpa['cpa_da']:.1f} / 제휴 {cpa['cpa_aff']:.1f}]")
 
         st.progress(progress)
-        
+
         col_d1, col_d2 = st.columns([1, 1])
         with col_d1:
             st.markdown("##### 📌 시간대별 목표 상세")
-            hours = ["10시", "11시", "12시", "13시", "14시", "15시", "16시", "17시", "18시"]
-            weights = [0, 0.11, 0.18, 0.15, 0.11, 0.16, 0.10, 0.10, 0.09]
-            acc_res = [start_resource_10]
-            gap = da_target_18 - start_resource_10
-            total_w = sum(weights)
-            for w in weights[1:]:
-                acc_res.append(acc_res[-1] + round(gap * (w / total_w)))
-            acc_res[-1] = da_target_18
-            
-            df_dash_goal = pd.DataFrame({
-                '누적 목표': [f"{x:,}" for x in acc_res],
-                '보장 목표': [f"{int(x * target_ratio_ba):,}" for x in acc_res],
-                '상품 목표': [f"{int(x * (1-target_ratio_ba)):,}" for x in acc_res]
-            }, index=hours).T
+            df_dash_goal = hourly_goal_table(acc_res, target_ratio_ba, actual_by_hour).map(
+                lambda x: f"{int(x):,}" if pd.notna(x) else "-")
             
             target_col = current_time_str.replace(":00", "시").replace("09:30", "10시")
             def highlight_col(s):
@@ -556,87 +488,46 @@ def run_v18_35_master():
         with col_d2:
             st.markdown("##### 📌 매체별 실적 상세")
             if not res['media_stats'].empty:
-                display_stats = res['media_stats'].copy()
-                display_stats.loc['합계'] = display_stats.sum(numeric_only=True)
-                total_cpa = display_stats.loc['합계', 'Cost'] / display_stats.loc['합계', 'Total_Cnt'] if display_stats.loc['합계', 'Total_Cnt'] > 0 else 0
-                display_stats.loc['합계', 'CPA'] = total_cpa
-                
-                display_stats = display_stats[['Total_Cnt', 'Prod_Cnt', 'Bojang_Cnt', 'Cost', 'CPA']]
-                display_stats.columns = ['토탈', '상품', '보장분석', '비용', 'CPA']
-                display_stats.index.name = '매체'
-                
-                stats_body = display_stats.drop('합계').sort_values('토탈', ascending=False)
-                stats_total = display_stats.loc[['합계']]
-                final_table = pd.concat([stats_body, stats_total])
-                
-                st.dataframe(final_table.style.format("{:,.0f}"), use_container_width=True)
+                table = _node('media_stats_table', stats_deps, lambda: media_stats_table(res))
+                st.dataframe(table.style.format("{:,.0f}"), use_container_width=True)
             else:
                 st.info("데이터가 없습니다.")
 
-    with tab1:
-        st.subheader("📋 오전 목표 수립")
-        st.line_chart(pd.DataFrame({'목표 흐름': acc_res}, index=hours))
-        report_morning = f"""금일 DA+제휴파트 예상마감 공유드립니다.
+        if dedup_removed:
+            with st.expander(f"🧹 중복 제외 ({len(dedup_removed)}건)"):
+                st.caption("같은 매체 리포트끼리 비교해 먼저 반영된 파일과 내용이 같은 파일, "
+                           "일자가 있는 리포트에서 앞 파일들과 겹치는 행은 집계에서 뺐습니다.")
+                st.dataframe(pd.DataFrame(dedup_removed).style.format({'행': "{:,}", '비용': "{:,.0f}", '보장': "{:,.0f}"}),
+                             use_container_width=True, hide_index=True)
 
-[17시 기준]
-총 자원 : {da_target_17:,}건 ({active_member}명, {da_per_17:.1f}건 배정 기준)
-ㄴ 보장분석 : {int(da_target_17*target_ratio_ba):,}건
-ㄴ 상품 : {int(da_target_17*(1-target_ratio_ba)):,}건
+        render_export(res, params, targets, est, actual_by_hour, report_day, snapshot_store, pacing_model)
 
-[18시 기준]
-총 자원 : {da_target_18:,}건 ({active_member}명, {da_per_18:.1f}건 배정 기준)
-ㄴ 보장분석 : {int(da_target_bojang):,}건
-ㄴ 상품 : {int(da_target_prod):,}건
+        if pacing_model is not None:
+            with st.expander("📈 학습된 마감 배수 (요일×시간대)"):
+                st.dataframe(pacing_model.table().style.format("{:.2f}", na_rep="-"), use_container_width=True)
 
-* {fixed_msg}"""
-        st.text_area("복사 텍스트:", report_morning, height=300)
+        if perf is not None:
+            with st.expander("⏱️ 성능 (단계별 시간/메모리)"):
+                st.markdown("##### 단계별 합계")
+                st.dataframe(perf.summary(), use_container_width=True)
+                st.markdown("##### 파일/단계별 상세")
+                st.dataframe(perf.to_frame(), use_container_width=True, hide_index=True)
+                st.download_button("📥 구조화 로그 (JSONL)", perf.to_jsonl(), file_name=f"perf_{perf.run_id}.jsonl", mime="application/x-ndjson")
 
-    with tab2:
-        st.subheader("🔥 14:00 중간 보고")
-        report_1400 = f"""DA파트 금일 14시간 현황 전달드립니다.
-
-금일 목표(18시 기준) : 인당배분 {da_per_18:.1f}건 / 총 {da_target_18:,}건
-현황(14시) : 인당배분 {round(current_total/active_member, 1) if active_member else 0:.1f}건 / 총 {current_total:,}건
-예상 마감(18시 기준) : 인당배분 {round(est_18_from_14/active_member, 1) if active_member else 0:.1f}건 / 총 {est_18_from_14:,}건
-ㄴ 보장분석 : {est_ba_18_14:,}건, 상품 {est_prod_18_14:,}건
-
-* {fixed_msg} {msg_14}
-
-[현재 성과 - 14시 기준]
-- 총합(DA/제휴): {int(cost_total)//10000:,}만원 / 가망CPA {cpa_total:.1f}만원
-- DA: {int(res['da_cost'])//10000:,}만원 / 가망CPA {cpa_da:.1f}만원
-- 제휴: {int(res['aff_cost'])//10000:,}만원 / 가망CPA {cpa_aff:.1f}만원
+    with tab1:
+        render_morning_report(texts["09:30"], acc_res, actual_by_hour)
 
-[예상 마감 - 18시 기준]
-- 총합(DA/제휴): {int(cost_total * 1.35)//10000:,}만원 / 가망CPA {max(3.1, cpa_total-0.2):.1f}만원
-- DA: {int(res['da_cost'] * 1.4)//10000:,}만원 / 가망CPA {max(4.4, cpa_da):.1f}만원
-- 제휴: {int(res['aff_cost'] * 1.25)//10000:,}만원 / 가망CPA {max(2.4, cpa_aff-0.2):.1f}만원"""
-        st.text_area("복사 텍스트 (14시):", report_1400, height=450)
+    with tab2:
+        render_report_text("🔥 14:00 중간 보고", "복사 텍스트 (14시):", texts["14:00"], 450)
 
     with tab3:
-        st.subheader("⚠️ 16:00 마감 임박 보고")
-        report_1600 = f"""DA파트 금일 16시간 현황 전달드립니다.
-
-금일 목표(18시 기준) : 총 {da_target_18:,}건
-ㄴ 보장분석 : {da_target_bojang:,}건, 상품 {da_target_prod:,}건
-
-16시 현황 : 총 {current_total:,}건
-ㄴ 보장분석 : {int(current_bojang):,}건, 상품 {int(current_prod):,}건
-
-* 마감 전까지 배너광고 및 제휴 매체 최대한 활용하여 자원 확보하겠습니다."""
-        st.text_area("복사 텍스트 (16시):", report_1600, height=300)
+        render_report_text("⚠️ 16:00 마감 임박 보고", "복사 텍스트 (16시):", texts["16:00"], 300)
 
     with tab4:
-        st.subheader("🌙 명일 자원 수립")
-        tom_base_total = int(tom_member * 3.15) + (300 if tom_dawn_ad else 0)
-        report_tomorrow = f"""DA+제휴 명일 오전 9시 예상 자원 공유드립니다.
-
-- 9시 예상 시작 자원 : {tom_base_total:,}건
-ㄴ 보장분석 : {int(tom_base_total * target_ratio_ba):,}건
-ㄴ 상품자원 : {int(tom_base_total * (1-target_ratio_ba)):,}건
+        render_tomorrow_report(res, params, targets, est)
 
-* 영업가족 {tom_member}명 기준 인당 {4.4 if not tom_dawn_ad else 5.0}건 이상 확보할 수 있도록 운영 예정입니다."""
-        st.text_area("복사 텍스트 (퇴근):", report_tomorrow, height=250)
+    with tab5:
+        render_scenarios(res, params, pacing_model)
 
 # -----------------------------------------------------------
 # MAIN
@@ -0,0 +1,369 @@
+"""
+여러 일자 일괄 처리 (주간/월간 리뷰용, 프로세스 풀 병렬)
+
+일자별 폴더 트리를 한 번에 처리해 일자 × 매체 × 상품 표(건수/비용/CPA)와 일자별 요약을 만듦.
+
+예)
+  python batch.py ./exports --out ./review                       # 전체 일자
+  python batch.py ./exports --out ./review --from 2026-10-01 --to 2026-10-31
+  python batch.py ./exports --out ./review --force               # 모두 다시 처리
+
+폴더 구조 (일자는 폴더 경로 끝의 날짜로 인식, 하위 폴더 파일은 모두 그 일자 소속)
+  exports/2026-10-01/*.csv   exports/20261002/...   exports/2026/10/03/...
+  일자 폴더에 params.json 이 있으면 수기 입력값 반영
+  (manual_aff_cost, manual_aff_cpa, manual_da_cnt, manual_da_cost — 없으면 0)
+
+결과 파일
+  batch_media_product.csv   일자 × 매체 × 상품 (건수/비용/CPA)
+  batch_days.csv            일자별 요약
+  batch_canonical.parquet   일자 + 표준 중간 형식 (파일/캠페인 단위, pyarrow 없으면 .pkl)
+
+이어서 처리 / 증분 처리
+- 일자별 서명 = 파일 내용 해시(SHA-256) + params.json + 집계 버전
+- 서명이 같은 일자는 건너뜀. 파일 크기/수정 시각이 그대로면 해시 계산도 생략
+- 일자가 끝날 때마다 <out>/days/<일자>.* 와 batch_manifest.json 을 저장
+  → 중간에 멈춰도 다시 실행하면 남은 일자만 처리
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import time
+
+EXPORT_EXTENSIONS = ('.csv', '.tsv', '.txt', '.xlsx', '.xls')
+DAY_PARAMS_FILE = "params.json"
+MANUAL_KEYS = ('manual_aff_cost', 'manual_aff_cpa', 'manual_da_cnt', 'manual_da_cost')
+MANIFEST_NAME = "batch_manifest.json"
+
+# 일자 결과 형식이 바뀌면 올려서 이전 결과를 다시 계산
+BATCH_VERSION = 3
+
+_DAY_RE = re.compile(r'(\d{4})[-_.]?(\d{2})[-_.]?(\d{2})$')
+
+log = logging.getLogger("meritz_report.batch")
+
+
+# -----------------------------------------------------------
+# 1. 일자 폴더 찾기 / 서명
+# -----------------------------------------------------------
+def parse_day(relpath):
+    """폴더 상대 경로 끝의 날짜 → 'YYYY-MM-DD' (없으면 None)"""
+    m = _DAY_RE.search(relpath.replace(os.sep, '-').replace('/', '-'))
+    if not m:
+        return None
+    try:
+        return datetime.date(*map(int, m.groups())).isoformat()
+    except ValueError:
+        return None
+
+
+def find_day_dirs(root):
+    """루트 아래 일자 폴더 → {일자: 폴더 경로} (일자 폴더 안쪽은 더 찾지 않음)"""
+    days = {}
+    for current, dirs, _ in os.walk(root):
+        dirs.sort()
+        keep = []
+        for d in dirs:
+            if d.startswith('.'):
+                continue
+            path = os.path.join(current, d)
+            day = parse_day(os.path.relpath(path, root))
+            if day is None:
+                keep.append(d)
+            elif day in days:
+                log.warning(f"같은 일자 폴더가 여러 개입니다 ({day}): {path} 제외")
+            else:
+                days[day] = path
+        dirs[:] = keep
+    return days
+
+
+def list_day_files(day_dir):
+    """일자 폴더의 리포트 파일 → {상대경로: (크기, 수정 시각 ns)}"""
+    files = {}
+    for current, dirs, names in os.walk(day_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        for name in sorted(names):
+            if name.startswith(('.', '~$')) or not name.lower().endswith(EXPORT_EXTENSIONS):
+                continue
+            path = os.path.join(current, name)
+            st = os.stat(path)
+            files[os.path.relpath(path, day_dir)] = (st.st_size, st.st_mtime_ns)
+    params_path = os.path.join(day_dir, DAY_PARAMS_FILE)
+    if os.path.exists(params_path):
+        st = os.stat(params_path)
+        files[DAY_PARAMS_FILE] = (st.st_size, st.st_mtime_ns)
+    return files
+
+
+def day_signature(day_dir, relpaths):
+    """파일 내용 해시 기반 일자 서명"""
+    from parse_cache import CACHE_VERSION
+
+    h = hashlib.sha256(f"batch{BATCH_VERSION}:cache{CACHE_VERSION}".encode())
+    for rel in sorted(relpaths):
+        fh = hashlib.sha256()
+        with open(os.path.join(day_dir, rel), "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                fh.update(chunk)
+        h.update(f"\0{rel}\0{fh.hexdigest()}".encode())
+    return h.hexdigest()
+
+
+# -----------------------------------------------------------
+# 2. 일자 처리 (작업 프로세스)
+# -----------------------------------------------------------
+def _day_params(day_dir):
+    params = {k: 0 for k in MANUAL_KEYS}
+    path = os.path.join(day_dir, DAY_PARAMS_FILE)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            params.update({k: v for k, v in json.load(f).items() if k in MANUAL_KEYS})
+    return params
+
+
+def process_day(day, day_dir, relpaths, known_signature=None, cache=None):
+    """
+    일자 1개 처리. 내용 서명이 known_signature 와 같으면 처리하지 않고 skipped=True.
+    반환: {'day', 'signature', 'skipped', 'media_product', 'canonical', 'summary', 'messages', 'seconds'}
+    """
+    t0 = time.perf_counter()
+    signature = day_signature(day_dir, relpaths)
+    out = {'day': day, 'signature': signature, 'skipped': signature == known_signature,
+           'media_product': None, 'canonical': None, 'summary': None, 'messages': [], 'seconds': 0.0}
+    if out['skipped']:
+        return out
+
+    import report_core
+
+    params = _day_params(day_dir)
+    aff_cnt = int(params['manual_aff_cost'] / params['manual_aff_cpa']) if params['manual_aff_cpa'] > 0 else 0
+    files = [report_core.open_export_file(os.path.join(day_dir, rel))
+             for rel in relpaths if rel != DAY_PARAMS_FILE]
+    try:
+        results = [report_core.ingest_file(f, cache) for f in files]
+    finally:
+        for f in files:
+            f.close()
+    canon = report_core.select_canonical(results, notify=lambda level, msg: out['messages'].append((level, msg)))
+    final_df = report_core.final_from_canonical(canon)
+    res = report_core.convert_to_stats(final_df, aff_cnt, params['manual_aff_cost'],
+                                       params['manual_da_cnt'], params['manual_da_cost'])
+
+    mp = res['media_product'].rename(columns={'Cnt': '건수', 'Cost': '비용'})
+    mp['CPA'] = (mp['비용'] / mp['건수'].where(mp['건수'] > 0)).fillna(0.0)
+    mp.insert(0, '일자', day)
+    out['media_product'] = mp
+    out['canonical'] = canon if canon is not None else report_core.empty_canonical()
+    out['summary'] = {
+        'day': day, 'files': len(files),
+        **{k: v for k, v in res.items() if k not in ('media_stats', 'media_product')},
+    }
+    out['seconds'] = round(time.perf_counter() - t0, 3)
+    return out
+
+
+# -----------------------------------------------------------
+# 3. 결과 저장소 (이어서 처리용)
+# -----------------------------------------------------------
+class BatchStore:
+    """
+    <out>/batch_manifest.json : {일자: {'signature', 'stats': {파일: [크기, 수정 시각]}, 'summary'}}
+    <out>/days/<일자>.pkl     : 일자 × 매체 × 상품 표
+    <out>/days/<일자>.canonical.parquet (또는 .pkl) : 표준 중간 형식
+    """
+
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        self.days_dir = os.path.join(out_dir, "days")
+        self.manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+        os.makedirs(self.days_dir, exist_ok=True)
+        self.manifest = {}
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, encoding="utf-8") as f:
+                    manifest = json.load(f)
+                if manifest.get('version') == BATCH_VERSION:
+                    self.manifest = manifest['days']
+            except (OSError, ValueError):
+                self.manifest = {}
+
+    def _frame_path(self, day):
+        return os.path.join(self.days_dir, f"{day}.pkl")
+
+    def entry(self, day):
+        """저장된 일자 정보 (결과 파일이 없으면 None)"""
+        entry = self.manifest.get(day)
+        if entry is None or not os.path.exists(self._frame_path(day)):
+            return None
+        return entry
+
+    def put(self, day, signature, stats, summary, media_product, canonical):
+        import report_core
+        media_product.to_pickle(self._frame_path(day))
+        canonical_path = report_core.save_canonical(
+            canonical, os.path.join(self.days_dir, f"{day}.canonical.parquet"))
+        self.manifest[day] = {'signature': signature, 'stats': stats, 'summary': summary,
+                              'canonical': os.path.basename(canonical_path)}
+        self._save_manifest()
+
+    def touch(self, day, signature, stats):
+        """내용은 같고 수정 시각만 바뀐 경우: 파일 정보만 갱신"""
+        self.manifest[day].update(signature=signature, stats=stats)
+        self._save_manifest()
+
+    def _save_manifest(self):
+        fd, tmp = tempfile.mkstemp(dir=self.out_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({'version': BATCH_VERSION, 'days': self.manifest}, f, ensure_ascii=False, default=str)
+        os.replace(tmp, self.manifest_path)
+
+    def load_frame(self, day):
+        import pandas as pd
+        return pd.read_pickle(self._frame_path(day))
+
+    def load_canonical(self, day):
+        """일자 표준 표 (일자 컬럼 없이)"""
+        import report_core
+        return report_core.load_canonical(os.path.join(self.days_dir, self.manifest[day]['canonical']))
+
+
+# -----------------------------------------------------------
+# 4. 일괄 실행
+# -----------------------------------------------------------
+def run_batch(root, out_dir, day_from=None, day_to=None, workers=None, cache=None, force=False,
+              on_progress=None):
+    """
+    반환: (일자×매체×상품 표, 일자별 요약 표, 실행 통계 dict)
+    표준 중간 형식(일자 포함)은 load_batch_canonical(out_dir, days) 로 따로 읽음
+    on_progress(day, status, seconds): 일자가 끝날 때마다 호출 (status: processed/skipped/failed)
+    """
+    import pandas as pd
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    store = BatchStore(out_dir)
+    day_dirs = {d: p for d, p in find_day_dirs(root).items()
+                if (day_from is None or d >= day_from) and (day_to is None or d <= day_to)}
+    counts = {'days': len(day_dirs), 'processed': 0, 'skipped': 0, 'failed': 0}
+    notify = on_progress or (lambda day, status, seconds: None)
+
+    jobs = []
+    for day in sorted(day_dirs):
+        stats = {rel: list(v) for rel, v in list_day_files(day_dirs[day]).items()}
+        entry = None if force else store.entry(day)
+        if entry is not None and entry['stats'] == stats:
+            counts['skipped'] += 1
+            notify(day, 'skipped', 0.0)
+            continue
+        jobs.append((day, stats, entry['signature'] if entry else None))
+
+    if jobs:
+        if workers is None:
+            workers = min(len(jobs), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {pool.submit(process_day, day, day_dirs[day], sorted(stats), known, cache): (day, stats)
+                       for day, stats, known in jobs}
+            for future in as_completed(futures):
+                day, stats = futures[future]
+                try:
+                    out = future.result()
+                except Exception as e:
+                    counts['failed'] += 1
+                    log.error(f"{day} 처리 실패: {type(e).__name__}: {e}")
+                    notify(day, 'failed', 0.0)
+                    continue
+                for level, msg in out['messages']:
+                    log.log(logging.ERROR if level == 'error' else logging.WARNING, f"{day} {msg}")
+                if out['skipped']:
+                    store.touch(day, out['signature'], stats)
+                    counts['skipped'] += 1
+                else:
+                    store.put(day, out['signature'], stats, out['summary'], out['media_product'], out['canonical'])
+                    counts['processed'] += 1
+                notify(day, 'skipped' if out['skipped'] else 'processed', out['seconds'])
+
+    done = [d for d in sorted(day_dirs) if store.entry(d) is not None]
+    if done:
+        table = pd.concat([store.load_frame(d) for d in done], ignore_index=True)
+        summary = pd.DataFrame([store.manifest[d]['summary'] for d in done]).set_index('day')
+    else:
+        table, summary = pd.DataFrame(columns=['일자', '매체', '상품', '건수', '비용', 'CPA']), pd.DataFrame()
+    return table, summary, counts
+
+
+def load_batch_canonical(out_dir, days):
+    """일자별 표준 표 → 하나로 (맨 앞에 '일자' category 컬럼)"""
+    import pandas as pd
+    import report_core
+
+    store = BatchStore(out_dir)
+    loaded, frames = [], []
+    for day in days:
+        if store.entry(day) is None:
+            continue
+        loaded.append(day)
+        frames.append(store.load_canonical(day))
+    if not frames:
+        return None
+    # 일자별 표는 그대로 두고 (표 1개면 concat_canonical 이 그 표를 돌려줌) 일자 컬럼은 행 수만큼 따로 만듦
+    combined = report_core.concat_canonical(frames)
+    days_col = pd.Series(loaded, dtype=object).repeat([len(f) for f in frames])
+    combined.insert(0, '일자', pd.Categorical(days_col.to_numpy()))
+    return combined
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(prog="batch.py", description="일자별 폴더 일괄 집계 (일자 × 매체 × 상품)")
+    p.add_argument("root", help="일자별 폴더가 들어 있는 루트 폴더")
+    p.add_argument("--out", required=True, metavar="DIR", help="결과/이어서 처리 정보 저장 폴더")
+    p.add_argument("--from", dest="day_from", type=datetime.date.fromisoformat, help="시작 일자 YYYY-MM-DD")
+    p.add_argument("--to", dest="day_to", type=datetime.date.fromisoformat, help="종료 일자 YYYY-MM-DD")
+    p.add_argument("--workers", type=int, default=None, help="동시 처리 일자 수 (기본: CPU 수)")
+    p.add_argument("--no-cache", action="store_true", help="파싱 캐시 사용 안 함")
+    p.add_argument("--force", action="store_true", help="저장된 결과 무시하고 모두 다시 처리")
+    p.add_argument("-v", "--verbose", action="store_true", help="진행 로그 출력")
+    args = p.parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format="%(levelname)s %(message)s", stream=sys.stderr)
+    if not os.path.isdir(args.root):
+        log.error(f"폴더를 찾을 수 없습니다: {args.root}")
+        return 2
+
+    cache = None
+    if not args.no_cache:
+        from parse_cache import ParseCache
+        try:
+            cache = ParseCache()
+        except OSError as e:
+            log.warning(f"파싱 캐시 사용 불가: {e}")
+
+    t0 = time.perf_counter()
+    table, summary, counts = run_batch(
+        args.root, args.out,
+        day_from=args.day_from.isoformat() if args.day_from else None,
+        day_to=args.day_to.isoformat() if args.day_to else None,
+        workers=args.workers, cache=cache, force=args.force,
+        on_progress=lambda day, status, seconds: log.info(f"{day} {status} {seconds:.2f}s"),
+    )
+    table.to_csv(os.path.join(args.out, "batch_media_product.csv"), index=False, encoding="utf-8-sig")
+    summary.to_csv(os.path.join(args.out, "batch_days.csv"), encoding="utf-8-sig")
+    canonical = load_batch_canonical(args.out, list(summary.index))
+    if canonical is not None:
+        import report_core
+        report_core.save_canonical(canonical, os.path.join(args.out, "batch_canonical.parquet"))
+    log.info(f"일자 {counts['days']}개 (처리 {counts['processed']}, 건너뜀 {counts['skipped']}, "
+             f"실패 {counts['failed']}) {time.perf_counter() - t0:.2f}s")
+
+    if not summary.empty:
+        cols = [c for c in ['files', 'da_cnt', 'da_cost', 'total_cnt', 'total_cost'] if c in summary.columns]
+        sys.stdout.write(summary[cols].to_string(float_format=lambda x: f"{x:,.0f}") + "\n")
+    return 1 if counts['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
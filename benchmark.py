@@ -0,0 +1,527 @@
+"""
+파싱/집계 파이프라인 벤치마크 (합성 데이터)
+
+예)
+  python benchmark.py                              # 1k, 10k, 100k 행
+  python benchmark.py --sizes 1k,1M,5M --repeat 3
+  python benchmark.py --save-baseline              # 현재 결과를 기준값으로 저장
+  python benchmark.py --impl /path/to/old/app.py   # 같은 함수 이름을 가진 다른 버전과 비교 (여러 번 지정 가능)
+
+단계별 처리 시간(가장 빠른 회차), 처리량(행/s, MB/s), 최대 메모리, 결과 체크섬을 측정하고
+기준값 파일과 비교해서 느려지거나(--tolerance) 결과가 달라진 단계를 표시함.
+메모리: fork 가능한 리눅스는 단계별 자식 프로세스의 RSS 증가분, 그 외에는 tracemalloc 최대치.
+"""
+import argparse
+import datetime
+import importlib.util
+import inspect
+import io
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+import zipfile
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+
+import report_core
+
+# openpyxl 스타일 경고 등은 측정 출력에 섞이지 않도록 무시
+warnings.simplefilter("ignore")
+
+# -----------------------------------------------------------
+# 1. 합성 리포트 생성
+# 실제 매체 리포트와 같은 파일명 규칙 / 인코딩 / 헤더 위치 / 합계 행을 흉내냄
+# -----------------------------------------------------------
+GENERATOR_VERSION = 1
+GEN_CHUNK_ROWS = 250_000
+XLSX_MAX_ROWS = 1_048_576  # 엑셀 시트 최대 행 수 (헤더/머리말 포함)
+WARMUP_ROWS = 200
+
+CAMPAIGNS = np.array(['보장분석_검색_PC', '보장분석_검색_MO', '상품_운전자_DA', '상품_실손_리타겟',
+                      '누적_리마케팅', '브랜드_일반', '상품_암보험_GDN', ''], dtype=object)
+PLAB_ACCOUNTS = np.array(['DDN_메리츠', 'GDN_메리츠', 'NAVER_SA', 'KAKAO_bizboard', 'TOSS_피드',
+                          'google_pmax', 'etc_제휴'], dtype=object)
+PLAB_GUBUN = np.array(['보장분석 네이버', '상품 kakao', '누적 토스', 'toss 상품', '기타'], dtype=object)
+
+# 생성 순서 = process_marketing_data 입력 순서
+SOURCE_FILES = {
+    'naver': 'result_네이버_bench.csv',
+    'kakao': '메리츠화재다이렉트_bench.csv',
+    'toss': '메리츠 화재_bench.xlsx',
+    'google': '캠페인 보고서_bench.csv',
+    'plab': 'Performance Lab_bench.xlsx',
+}
+
+
+def parse_size(text):
+    """'1k' / '100K' / '5M' / '2500' → 행 수"""
+    text = text.strip().lower()
+    mul = {'k': 1_000, 'm': 1_000_000}.get(text[-1:], 1)
+    return int(float(text[:-1] if mul > 1 else text) * mul)
+
+
+def _campaigns(rng, n):
+    return CAMPAIGNS[rng.integers(0, len(CAMPAIGNS), n)]
+
+
+def _money(rng, n):
+    """'12,345' 형태 비용 문자열 (일부는 따옴표 포함 — 실제 내보내기 파일과 동일)"""
+    values = pd.Series(rng.integers(0, 200_000, n)).map('{:,}'.format)
+    quoted = rng.random(n) < 0.05
+    values[quoted] = '"' + values[quoted] + '"'
+    return values.to_numpy(dtype=object)
+
+
+def _chunks(n):
+    for start in range(0, n, GEN_CHUNK_ROWS):
+        yield min(GEN_CHUNK_ROWS, n - start)
+
+
+def _write_csv(path, n, rng, make, sep=',', encoding='utf-8', preamble='', footer=None):
+    """chunk 단위로 써서 5M 행도 메모리 일정. footer: 마지막에 붙일 합계 행 dict"""
+    with open(path, 'w', encoding=encoding, newline='') as f:
+        f.write(preamble)
+        first = True
+        for size in _chunks(n):
+            make(rng, size).to_csv(f, sep=sep, index=False, header=first)
+            first = False
+        if footer is not None:
+            pd.DataFrame([footer]).to_csv(f, sep=sep, index=False, header=first)
+
+
+def _naver(rng, n):
+    return pd.DataFrame({'캠페인 이름': _campaigns(rng, n), '노출수': rng.integers(0, 5000, n),
+                         '클릭수': rng.integers(0, 300, n), '총 비용': _money(rng, n)})
+
+
+def _kakao(rng, n):
+    return pd.DataFrame({'캠페인': _campaigns(rng, n), '소재': 'bizboard', '노출': rng.integers(0, 5000, n),
+                         '비용': _money(rng, n)})
+
+
+def _google(rng, n):
+    return pd.DataFrame({'캠페인': _campaigns(rng, n), '캠페인 유형': '디스플레이',
+                         '노출수': rng.integers(0, 5000, n), '비용': _money(rng, n)})
+
+
+def _toss(rng, n):
+    return pd.DataFrame({'캠페인 명': _campaigns(rng, n), '노출': rng.integers(0, 5000, n),
+                         '소진 비용': _money(rng, n)})
+
+
+def _plab(rng, n):
+    return pd.DataFrame({'account': PLAB_ACCOUNTS[rng.integers(0, len(PLAB_ACCOUNTS), n)],
+                         '구분': PLAB_GUBUN[rng.integers(0, len(PLAB_GUBUN), n)],
+                         'METIS전송': rng.integers(0, 50, n), 'METIS전송율': rng.random(n).round(3),
+                         'METIS실패': rng.integers(0, 5, n), 'METIS재인입': rng.integers(0, 3, n)})
+
+
+def _xlsx_col(i):
+    name = ''
+    i += 1
+    while i:
+        i, r = divmod(i - 1, 26)
+        name = chr(65 + r) + name
+    return name
+
+
+def _xlsx_row(r, values):
+    cells = []
+    for i, v in enumerate(values):
+        ref = f'{_xlsx_col(i)}{r}'
+        if isinstance(v, (int, float, np.integer, np.floating)) and not isinstance(v, bool):
+            cells.append(f'<c r="{ref}"><v>{v}</v></c>')
+        elif v is not None and v != '':
+            cells.append(f'<c r="{ref}" t="inlineStr"><is><t>{escape(str(v))}</t></is></c>')
+    return f'<row r="{r}">{"".join(cells)}</row>'
+
+
+_XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets></workbook>'),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+        '</Relationships>'),
+}
+
+
+def _styles_xml(broken):
+    # broken: 피랩 리포트처럼 numFmtId 가 숫자가 아니어서 openpyxl 이 읽다가 실패하는 스타일
+    fmt_id = 'abc' if broken else '0'
+    return ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+            '<fonts count="1"><font><sz val="11"/><name val="맑은 고딕"/></font></fonts>'
+            '<fills count="1"><fill><patternFill patternType="none"/></fill></fills>'
+            '<borders count="1"><border/></borders>'
+            '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+            f'<cellXfs count="1"><xf numFmtId="{fmt_id}" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+            '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+            '</styleSheet>')
+
+
+def _write_xlsx(path, n, rng, make, preamble=(), footer=None, broken_styles=False):
+    """시트 XML 을 직접 스트리밍으로 작성 (openpyxl 보다 훨씬 빠르고 메모리 일정)"""
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as z:
+        for name, xml in _XLSX_PARTS.items():
+            z.writestr(name, xml)
+        z.writestr('xl/styles.xml', _styles_xml(broken_styles))
+        with z.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as raw:
+            f = io.TextIOWrapper(raw, encoding='utf-8')
+            f.write('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>')
+            r = 0
+            for line in preamble:
+                r += 1
+                f.write(_xlsx_row(r, line))
+            header = True
+            for size in _chunks(n):
+                df = make(rng, size)
+                if header:
+                    r += 1
+                    f.write(_xlsx_row(r, list(df.columns)))
+                    header = False
+                for values in df.itertuples(index=False, name=None):
+                    r += 1
+                    f.write(_xlsx_row(r, values))
+            if footer is not None:
+                r += 1
+                f.write(_xlsx_row(r, list(footer.values())))
+            f.write('</sheetData></worksheet>')
+            f.flush()
+            f.detach()
+
+
+def generate_exports(directory, n, seed=0):
+    """
+    매체별 합성 리포트 생성 (이미 같은 조건으로 만든 파일이 있으면 재사용).
+    반환: {source key: 파일 경로}
+    엑셀은 시트 최대 행 수를 넘지 않도록 자름.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = {key: os.path.join(directory, name) for key, name in SOURCE_FILES.items()}
+    marker = os.path.join(directory, '.generated')
+    stamp = f'{GENERATOR_VERSION}|{n}|{seed}'
+    if os.path.exists(marker) and open(marker).read() == stamp and all(map(os.path.exists, paths.values())):
+        return paths
+
+    rng = np.random.default_rng(seed)
+    xlsx_n = min(n, XLSX_MAX_ROWS - 5)
+    _write_csv(paths['naver'], n, rng, _naver, encoding='utf-8-sig')
+    _write_csv(paths['kakao'], n, rng, _kakao, sep='\t', encoding='cp949')
+    _write_xlsx(paths['toss'], xlsx_n, rng, _toss,
+                preamble=[['토스 광고 리포트'], ['조회 기간', '2026-10-01 ~ 2026-10-01'], []],
+                footer={'캠페인 명': '합계', '노출': 0, '소진 비용': '1,000,000'})
+    _write_csv(paths['google'], n, rng, _google, sep='\t', encoding='utf-16',
+               preamble='캠페인 보고서\n2026년 10월 1일 - 2026년 10월 1일\n',
+               footer={'캠페인': '합계: 계정', '캠페인 유형': '', '노출수': 0, '비용': '999,999'})
+    _write_xlsx(paths['plab'], xlsx_n, rng, _plab, broken_styles=True)
+
+    with open(marker, 'w') as f:
+        f.write(stamp)
+    return paths
+
+# -----------------------------------------------------------
+# 2. 측정
+# -----------------------------------------------------------
+def load_impl(path=None):
+    """비교 대상 구현 (None → report_core). 다른 버전 app.py 등 같은 함수 이름을 가진 파일"""
+    if path is None:
+        return 'report_core', report_core
+    name = f"bench_impl_{abs(hash(os.path.abspath(path)))}"
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(path)))
+    spec.loader.exec_module(module)
+    return path, module
+
+
+def _quiet(level, msg):
+    pass
+
+
+def _call(func, *args, **kwargs):
+    """구현마다 다른 시그니처 대응: 받지 않는 키워드 인자는 빼고 호출"""
+    accepted = inspect.signature(func).parameters
+    return func(*args, **{k: v for k, v in kwargs.items() if k in accepted})
+
+
+def _checksum(out):
+    """결과 비교용 요약 (행 수 + 숫자 컬럼 합계)"""
+    if out is None:
+        return None
+    if isinstance(out, dict):  # convert_to_stats
+        return {k: out[k] for k in ('total_cnt', 'total_cost', 'bojang_cnt', 'prod_cnt')}
+    numeric = out.select_dtypes('number')
+    return {'rows': int(len(out)), 'sum': round(float(np.nansum(numeric.to_numpy(dtype=float))), 2)}
+
+
+def _proc_status_mb(field):
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1]) / 1024
+    raise KeyError(field)
+
+
+def _reset_peak_rss():
+    """VmHWM(최대 RSS)을 현재 값으로 초기화 (리눅스 4.0+, 실패하면 무시)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def _measure_inline(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    seconds = time.perf_counter() - t0
+    return seconds, _checksum(out)
+
+
+def _measure_rss(fn, conn):
+    try:
+        _reset_peak_rss()
+        base = _proc_status_mb('VmRSS')
+        seconds, checksum = _measure_inline(fn)
+        conn.send((seconds, max(0.0, _proc_status_mb('VmHWM') - base), checksum, None))
+    except Exception as e:
+        conn.send((None, None, None, repr(e)))
+    finally:
+        conn.close()
+
+
+def memory_mode():
+    if sys.platform.startswith('linux') and os.path.exists('/proc/self/status'):
+        return 'rss'
+    return 'tracemalloc'
+
+
+def measure(fn, repeat=1, mode=None):
+    """
+    fn 을 repeat 회 실행해 가장 빠른 시간 + 최대 메모리(MB) + 체크섬.
+    rss: 매 회차 fork 한 자식 프로세스에서 실행 (앞 단계가 남긴 메모리/캐시 영향 없음)
+    tracemalloc: 시간 측정 회차와 별도로 한 번 더 실행해서 메모리만 잼 (추적 오버헤드 제외)
+    """
+    mode = mode or memory_mode()
+    times, peaks, checksum = [], [], None
+    if mode == 'rss':
+        ctx = multiprocessing.get_context('fork')
+        for _ in range(repeat):
+            parent, child = ctx.Pipe(duplex=False)
+            proc = ctx.Process(target=_measure_rss, args=(fn, child))
+            proc.start()
+            child.close()
+            seconds, peak, checksum, error = parent.recv()
+            proc.join()
+            if error:
+                raise RuntimeError(error)
+            times.append(seconds)
+            peaks.append(peak)
+    else:
+        for _ in range(repeat):
+            seconds, checksum = _measure_inline(fn)
+            times.append(seconds)
+        tracemalloc.start()
+        try:
+            fn()
+            peaks.append(tracemalloc.get_traced_memory()[1] / 2**20)
+        finally:
+            tracemalloc.stop()
+    return {'seconds': min(times), 'peak_mb': max(peaks), 'checksum': checksum}
+
+
+def _stages(module, paths):
+    """(단계 이름, 입력 행 수 기준 파일들, 실행 함수) — 구현에 없는 함수는 건너뜀"""
+    def opener(path):
+        return lambda: report_core.open_export_file(path)
+
+    stages = []
+    if hasattr(module, 'load_file_by_rule'):
+        for key, path in paths.items():
+            open_file = opener(path)
+
+            def run(open_file=open_file):
+                with open_file() as f:
+                    return _call(module.load_file_by_rule, f, notify=_quiet)
+            stages.append((f'load_file_by_rule:{key}', [path], run))
+    if hasattr(module, 'load_excel_xml_fallback'):
+        open_file = opener(paths['plab'])
+
+        def run_xml():
+            with open_file() as f:
+                return module.load_excel_xml_fallback(f)
+        stages.append(('load_excel_xml_fallback:plab', [paths['plab']], run_xml))
+    if hasattr(module, 'process_marketing_data'):
+        def run_process():
+            files = [report_core.open_export_file(p) for p in paths.values()]
+            try:
+                return _call(module.process_marketing_data, files, cache=None, notify=_quiet)
+            finally:
+                for f in files:
+                    f.close()
+        stages.append(('process_marketing_data', list(paths.values()), run_process))
+    if hasattr(module, 'convert_to_stats') and hasattr(module, 'process_marketing_data'):
+        files = [report_core.open_export_file(p) for p in paths.values()]
+        try:
+            final_df = _call(module.process_marketing_data, files, cache=None, notify=_quiet)
+        finally:
+            for f in files:
+                f.close()
+        stages.append(('convert_to_stats', [],
+                       lambda: module.convert_to_stats(final_df, 805, 11270000, 0, 0)))
+    return stages
+
+
+def _count_rows(paths, n):
+    xlsx_n = min(n, XLSX_MAX_ROWS - 5)
+    return sum(xlsx_n if p.endswith('.xlsx') else n for p in paths)
+
+
+def run_benchmark(module, sizes, data_dir, repeat=1, mode=None, log=print):
+    """
+    반환: {'<rows>/<stage>': {seconds, peak_mb, rows, mb, rows_per_s, mb_per_s, checksum}}
+    측정 전에 작은 합성 리포트로 단계별 한 번씩 실행해 지연 import / 첫 호출 비용을 뺌.
+    """
+    for _, _, fn in _stages(module, generate_exports(os.path.join(data_dir, f'n{WARMUP_ROWS}'), WARMUP_ROWS)):
+        fn()
+
+    results = {}
+    for n in sorted(sizes):
+        t0 = time.perf_counter()
+        paths = generate_exports(os.path.join(data_dir, f'n{n}'), n)
+        log(f'[{n:,}행] 합성 리포트 준비 {time.perf_counter() - t0:.1f}s')
+        for stage, inputs, fn in _stages(module, paths):
+            r = measure(fn, repeat=repeat, mode=mode)
+            rows = _count_rows(inputs, n)
+            mb = sum(os.path.getsize(p) for p in inputs) / 2**20
+            r.update(rows=rows, mb=round(mb, 2),
+                     rows_per_s=round(rows / r['seconds']) if rows and r['seconds'] else None,
+                     mb_per_s=round(mb / r['seconds'], 2) if mb and r['seconds'] else None)
+            r['seconds'] = round(r['seconds'], 4)
+            r['peak_mb'] = round(r['peak_mb'], 1)
+            results[f'{n}/{stage}'] = r
+            log(f'  {stage:<36} {r["seconds"]:>9.3f}s  {r["peak_mb"]:>8.1f}MB')
+    return results
+
+# -----------------------------------------------------------
+# 3. 기준값 비교
+# -----------------------------------------------------------
+MIN_SECONDS_DIFF = 0.05  # 이보다 작은 차이는 측정 오차로 보고 무시
+MIN_MB_DIFF = 5.0
+
+
+def compare(results, baseline, tolerance=0.25):
+    """
+    기준값 대비 비교표.
+    status: ok / slower / more-memory / mismatch(체크섬 다름) / new(기준값 없음)
+    """
+    rows = []
+    for key, r in results.items():
+        size, stage = key.split('/', 1)
+        b = baseline.get(key)
+        row = {'rows': int(size), 'stage': stage, 'seconds': r['seconds'], 'peak_mb': r['peak_mb'],
+               'rows_per_s': r['rows_per_s'], 'base_seconds': None, 'base_peak_mb': None, 'status': 'new'}
+        if b is not None:
+            row.update(base_seconds=b['seconds'], base_peak_mb=b['peak_mb'])
+            status = []
+            if b.get('checksum') != r['checksum']:
+                status.append('mismatch')
+            if (r['seconds'] > b['seconds'] * (1 + tolerance)
+                    and r['seconds'] - b['seconds'] > MIN_SECONDS_DIFF):
+                status.append('slower')
+            if (r['peak_mb'] > b['peak_mb'] * (1 + tolerance)
+                    and r['peak_mb'] - b['peak_mb'] > MIN_MB_DIFF):
+                status.append('more-memory')
+            row['status'] = ','.join(status) or 'ok'
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def load_baseline(path):
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f).get('results', {})
+
+
+def save_baseline(path, results, impl, mode):
+    meta = {'created': datetime.datetime.now().isoformat(timespec='seconds'), 'impl': impl,
+            'memory_mode': mode, 'python': platform.python_version(), 'pandas': pd.__version__,
+            'numpy': np.__version__, 'platform': platform.platform()}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'meta': meta, 'results': results}, f, ensure_ascii=False, indent=2)
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(prog='benchmark.py', description='파싱/집계 파이프라인 벤치마크 (합성 데이터)')
+    p.add_argument('--sizes', default='1k,10k,100k', help='매체별 행 수 목록 (예: 1k,100k,1M,5M)')
+    p.add_argument('--repeat', type=int, default=1, help='단계별 반복 횟수 (가장 빠른 회차 사용)')
+    p.add_argument('--impl', action='append', default=[], metavar='PATH',
+                   help='비교할 구현 파일 (기본: report_core, 여러 번 지정 가능)')
+    p.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'meritz_bench'),
+                   help='합성 리포트 저장 폴더 (같은 크기는 재사용)')
+    p.add_argument('--baseline', default='benchmark_baseline.json', help='기준값 파일')
+    p.add_argument('--save-baseline', action='store_true', help='첫 번째 구현 결과를 기준값으로 저장')
+    p.add_argument('--tolerance', type=float, default=0.25, help='허용 증가율 (0.25 = 25%%)')
+    p.add_argument('--memory', choices=['rss', 'tracemalloc'], default=None, help='메모리 측정 방식')
+    p.add_argument('--json', metavar='FILE', help='측정 결과 JSON 저장')
+    p.add_argument('--fail-on-regression', action='store_true', help='느려지거나 결과가 다르면 종료 코드 1')
+    args = p.parse_args(argv)
+
+    sizes = [parse_size(s) for s in args.sizes.split(',') if s.strip()]
+    mode = args.memory or memory_mode()
+    baseline = load_baseline(args.baseline)
+    impls = [load_impl(path) for path in (args.impl or [None])]
+
+    all_results, regressed = {}, False
+    for label, module in impls:
+        print(f'=== {label} (메모리: {mode}) ===')
+        results = run_benchmark(module, sizes, args.data_dir, repeat=args.repeat, mode=mode)
+        all_results[label] = results
+        table = compare(results, baseline, tolerance=args.tolerance)
+        with pd.option_context('display.width', 200, 'display.max_columns', 20, 'display.max_rows', 500):
+            print(table.to_string(index=False))
+        regressed |= bool(table['status'].str.contains('slower|more-memory|mismatch').any())
+        print()
+
+    if args.save_baseline:
+        label, _ = impls[0]
+        save_baseline(args.baseline, all_results[label], label, mode)
+        print(f'기준값 저장: {os.path.abspath(args.baseline)}')
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(all_results, f, ensure_ascii=False, indent=2)
+    return 1 if regressed and args.fail_on_regression else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+메리츠 보고 자동화 CLI (스트림릿 없이 실행, 크론/스크립트용)
+
+예)
+  python cli.py ./exports --time 14:00
+  python cli.py exports.zip --time 14:00          # 리포트 묶음 ZIP (안의 파일별로 처리)
+  python cli.py ./exports --time 16:00 --report 16:00
+  python cli.py ./exports --format json > report.json
+  python cli.py ./exports --out ./out              # 보고 문구 txt + 매체별 실적 csv/json 저장
+  python cli.py ./exports --xlsx report.xlsx      # 매체별 실적 / 시간대별 목표 / 보고 문구 엑셀
+  python cli.py ./exports --param active_member=340 --param fixed_ad_type=없음
+  python cli.py ./naver --team kim                 # 팀 공유 집계에 네이버 게시 → 다른 담당자 게시분과 합쳐 보고
+
+pandas 등 무거운 모듈은 인자 확인이 끝난 뒤에 불러옴 (--help, 인자 오류는 바로 종료).
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import logging
+import os
+import sys
+import time
+
+WEEKDAYS = ['월', '화', '수', '목', '금', '토', '일']
+REPORT_KEYS = ["09:30", "14:00", "16:00", "18:00"]
+EXPORT_EXTENSIONS = ('.csv', '.tsv', '.txt', '.xlsx', '.xls', '.zip')
+
+log = logging.getLogger("meritz_report")
+
+
+def build_parser():
+    p = argparse.ArgumentParser(prog="cli.py", description="메리츠 DA 보고 문구 / 매체별 실적 생성")
+    p.add_argument("inputs", nargs="+", help="매체 리포트 파일 또는 폴더 (폴더는 하위 파일 전체)")
+    p.add_argument("--time", default="14:00", help="현재 기준 시간대 (09:30, 10:00 ... 18:00)")
+    p.add_argument("--date", type=datetime.date.fromisoformat, default=datetime.date.today(),
+                   help="기준 일자 YYYY-MM-DD (기본: 오늘)")
+    p.add_argument("--day", choices=WEEKDAYS, help="요일 (기본: --date 의 요일)")
+    p.add_argument("--boost", action="store_true", help="긴급 부스팅 (16:00/17:00)")
+    p.add_argument("--param", action="append", default=[], metavar="KEY=VALUE",
+                   help="보고 설정 변경 (report_core.DEFAULT_PARAMS 키, 여러 번 지정 가능)")
+    p.add_argument("--params-json", metavar="FILE", help="보고 설정 JSON 파일 (--param 이 우선)")
+    p.add_argument("--report", choices=REPORT_KEYS + ["all"], default="all", help="출력할 보고 문구")
+    p.add_argument("--format", choices=["text", "json"], default="text", help="표준 출력 형식")
+    p.add_argument("--out", metavar="DIR", help="보고 문구/매체별 실적을 파일로 저장할 폴더")
+    p.add_argument("--xlsx", metavar="FILE", help="매체별 실적/시간대별 목표/보고 문구 엑셀 저장")
+    p.add_argument("--team", metavar="OWNER",
+                   help="팀 공유 집계에 입력 파일의 매체를 게시하고 일자 통합 실적으로 보고 (OWNER: 담당자)")
+    p.add_argument("--workers", type=int, default=None, help="동시 처리 파일 수 (기본: 자동, 1: 순차)")
+    p.add_argument("--no-cache", action="store_true", help="파싱 캐시 사용 안 함")
+    p.add_argument("--no-pacing", action="store_true", help="학습 배수 대신 기존 상수 배수 사용")
+    p.add_argument("--save-snapshot", action="store_true", help="집계 결과를 스냅샷 저장소에 저장")
+    p.add_argument("--perf-log", metavar="FILE", help="단계별 처리 시간 기록 저장 (JSON Lines)")
+    p.add_argument("--trace-memory", action="store_true", help="--perf-log 에 단계별 최대 메모리 포함 (느림, 순차 처리)")
+    p.add_argument("-v", "--verbose", action="store_true", help="진행 로그 출력")
+    return p
+
+
+def _collect_paths(inputs):
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, names in os.walk(item):
+                paths.extend(os.path.join(root, n) for n in sorted(names)
+                             if not n.startswith('.') and n.lower().endswith(EXPORT_EXTENSIONS))
+        elif os.path.isfile(item):
+            paths.append(item)
+        else:
+            raise FileNotFoundError(item)
+    return paths
+
+
+def parse_param_overrides(items, defaults, params_json=None):
+    """--params-json + --param KEY=VALUE → dict (값 형식은 기본값 형식을 따름)"""
+    overrides = {}
+    if params_json:
+        with open(params_json, encoding="utf-8") as f:
+            overrides.update(json.load(f))
+    for item in items:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"--param 형식 오류 (KEY=VALUE): {item}")
+        key = key.strip()
+        if key not in defaults:
+            raise KeyError(f"알 수 없는 보고 설정: {key}")
+        kind = type(defaults[key])
+        if kind is bool:
+            overrides[key] = value.strip().lower() in ("1", "true", "yes", "y", "on")
+        else:
+            overrides[key] = kind(value)
+    return overrides
+
+
+def _parse_params(args, defaults):
+    overrides = parse_param_overrides(args.param, defaults, args.params_json)
+    overrides.update(time=args.time, day=args.day or WEEKDAYS[args.date.weekday()], is_boosting=args.boost)
+    return overrides
+
+
+def _json_default(value):
+    if hasattr(value, "item"):  # numpy 스칼라
+        return value.item()
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    raise TypeError(f"JSON 변환 불가: {type(value)}")
+
+
+def _write_outputs(out_dir, report, table, payload):
+    os.makedirs(out_dir, exist_ok=True)
+    for key, text in report['texts'].items():
+        with open(os.path.join(out_dir, f"report_{key.replace(':', '')}.txt"), "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    table.to_csv(os.path.join(out_dir, "media_stats.csv"), encoding="utf-8-sig")
+    with open(os.path.join(out_dir, "report.json"), "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2, default=_json_default)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format="%(levelname)s %(message)s", stream=sys.stderr)
+
+    try:
+        paths = _collect_paths(args.inputs)
+    except FileNotFoundError as e:
+        log.error(f"파일/폴더를 찾을 수 없습니다: {e}")
+        return 2
+    if not paths:
+        log.error("처리할 리포트 파일이 없습니다.")
+        return 2
+
+    t0 = time.perf_counter()
+    import report_core
+    log.info(f"코어 로딩 {time.perf_counter() - t0:.2f}s")
+
+    try:
+        params = report_core.report_params(**_parse_params(args, report_core.DEFAULT_PARAMS))
+    except (KeyError, ValueError, OSError) as e:
+        log.error(f"보고 설정 오류: {e}")
+        return 2
+    if params['time'] not in report_core.REPORT_SLOTS:
+        log.error(f"알 수 없는 시간대: {params['time']} (가능: {', '.join(report_core.REPORT_SLOTS)})")
+        return 2
+
+    cache = None
+    if not args.no_cache:
+        from parse_cache import ParseCache
+        try:
+            cache = ParseCache()
+        except OSError as e:
+            log.warning(f"파싱 캐시 사용 불가: {e}")
+
+    perf = None
+    if args.perf_log or args.verbose:
+        import perf_trace
+        perf = perf_trace.PerfRecorder(trace_memory=args.trace_memory)
+    workers = 1 if args.trace_memory else args.workers
+
+    t0 = time.perf_counter()
+    files = [report_core.open_export_file(p) for p in paths]
+    try:
+        with perf_trace.recording(perf) if perf else contextlib.nullcontext():
+            if args.team:
+                # 내 파일의 소스만 (일자, 소스) 단위로 교체 → 다른 담당자가 게시한 소스와 합친 표로 집계
+                from team_store import TeamStore
+                team = TeamStore()
+                canon = report_core.ingest_canonical(files, cache=cache, max_workers=workers)
+                published = team.publish(args.date, canon, args.team)
+                log.info(f"팀 집계 게시: {', '.join(published) or '-'} ({team.path})")
+                final_df = report_core.final_from_canonical(team.load_canonical(args.date))
+            else:
+                final_df = report_core.process_marketing_data(files, cache=cache, max_workers=workers)
+            res = report_core.compute_stats(final_df, params)
+    finally:
+        for f in files:
+            f.close()
+    log.info(f"파일 {len(files)}개 처리 {time.perf_counter() - t0:.2f}s")
+    if final_df is None:
+        log.warning("집계된 데이터가 없습니다 (수기 입력값만으로 보고 생성).")
+    if perf is not None:
+        log.info("단계별 처리 시간\n" + perf.summary().to_string())
+        if args.perf_log:
+            with open(args.perf_log, "w", encoding="utf-8") as f:
+                f.write(perf.to_jsonl())
+
+    # 스냅샷 저장소는 --save-snapshot / MERITZ_SNAPSHOT_DB 로 지정했거나 이미 있을 때만 염
+    # (학습 배수만 쓰는 실행이 빈 DB 를 새로 만들지 않도록)
+    store = pacing = None
+    if args.save_snapshot or not args.no_pacing:
+        from snapshot_store import SnapshotStore, default_db_path
+        if args.save_snapshot or "MERITZ_SNAPSHOT_DB" in os.environ or os.path.exists(default_db_path()):
+            store = SnapshotStore()
+    if args.save_snapshot and final_df is not None:
+        store.save(args.date, params['time'], res)
+    if store is not None and not args.no_pacing:
+        from pacing_model import PacingModel
+        pacing = PacingModel(os.path.join(os.path.dirname(os.path.abspath(store.path)), "pacing_model.json"))
+        pacing.refresh(store)
+    report = report_core.build_report(res, params, pacing=pacing)
+
+    table = report_core.media_stats_table(res)
+    texts = report['texts'] if args.report == "all" else {args.report: report['texts'][args.report]}
+    payload = {
+        'date': args.date,
+        'params': params,
+        'summary': {k: v for k, v in res.items() if k not in ('media_stats', 'media_product')},
+        'targets': report['targets'],
+        'estimate': report['estimate'],
+        'cpa': report['cpa'],
+        'media_stats': table.reset_index().to_dict(orient="records"),
+        'texts': texts,
+    }
+
+    if args.out:
+        _write_outputs(args.out, report, table, payload)
+        log.info(f"저장 완료: {os.path.abspath(args.out)}")
+
+    if args.xlsx:
+        import report_export
+        actual = report_core.snapshot_progress_by_hour(store, args.date)
+        section = report_export.day_section(args.date, res, params, pacing=pacing, actual_by_hour=actual)
+        report_export.write_report_workbook(args.xlsx, [section])
+        log.info(f"엑셀 저장: {os.path.abspath(args.xlsx)}")
+
+    if args.format == "json":
+        json.dump(payload, sys.stdout, ensure_ascii=False, indent=2, default=_json_default)
+        sys.stdout.write("\n")
+    else:
+        for key, text in texts.items():
+            sys.stdout.write(f"===== {key} =====\n{text}\n\n")
+        sys.stdout.write(table.to_string(float_format=lambda x: f"{x:,.0f}") + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,375 @@
+import datetime
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# -----------------------------------------------------------
+# 구글 시트 로컬 미러 (백그라운드 증분 동기화)
+# - 화면 갱신(rerun)은 로컬 사본만 읽음 → 네트워크를 기다리지 않음
+# - 백그라운드 스레드가 주기적으로 시트 끝부분(마지막 OVERLAP 행 + 새 행)만 다시 읽어
+#   추가된 행은 붙이고, 끝부분에서 바뀐 행은 행 해시 비교로 교체
+#   (서비스 계정 시트는 A1 범위로 끝부분만 받아옴, 공개 시트 연결은 전체를 받고 파싱/비교만 줄어듦)
+# - FULL_EVERY 회마다 (또는 행이 줄어든 것이 보이면) 전체를 읽어 중간 행 수정/삭제까지 반영
+# - 사본은 pickle 로 디스크에 저장 → 앱 재시작 직후에도 바로 표시
+# - 모든 값은 문자열로 보관 (부분 읽기/전체 읽기 간 형식 추론 차이로 해시가 달라지지 않게), 빈 칸은 NaN
+# - 사본은 시트 행 위치를 그대로 유지하고, frame() 에서 완전히 빈 행을 뺌 (기존 전체 읽기와 같게)
+# -----------------------------------------------------------
+logger = logging.getLogger("meritz_report.gsheet")
+
+DEFAULT_MIRROR_DIR = os.path.join(os.path.expanduser("~"), ".local", "share", "meritz_report")
+DEFAULT_INTERVAL = 300   # 초 (기존 ttl="5m" 과 동일 주기)
+OVERLAP = 50             # 끝부분 재확인 행 수 (입력 중인 최근 행 수정 반영)
+FULL_EVERY = 12          # n 회마다 전체 대조 (기본 1시간)
+
+# 미러 형식이 바뀌면 올려서 이전 사본을 무시
+MIRROR_VERSION = 3
+
+
+def _normalize(df):
+    """모든 값을 문자열로 (빈 칸·빈 문자열은 NaN → 매체명이 빈 합계 행 등은 groupby 에서 빠짐)"""
+    df = df.copy()
+    df.columns = [str(c).strip() for c in df.columns]
+    for col in df.columns:
+        text = df[col].astype(object).map(str, na_action='ignore')
+        df[col] = text.where(text.notna() & text.ne(''))
+    return df.reset_index(drop=True)
+
+
+def _row_hashes(df):
+    if df.empty:
+        return np.empty(0, dtype=np.uint64)
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+# -----------------------------------------------------------
+# 시트 연결
+# -----------------------------------------------------------
+def _header_names(header):
+    """시트 헤더 행 → 컬럼명 (빈 칸은 'Unnamed: i', 중복은 '.1' 등 — pandas 파서와 같은 규칙)"""
+    names, seen = [], {}
+    for i, name in enumerate(header):
+        name = str(name).strip() or f"Unnamed: {i}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def open_service_account_spreadsheet(secrets):
+    """
+    st.secrets 의 gsheets 연결 설정 → gspread Spreadsheet (공개 API open_by_url / open_by_key 사용).
+    서비스 계정 설정이 아니거나 spreadsheet 가 없으면 None (→ conn.read 로 전체 읽기).
+    """
+    secrets = dict(secrets or {})
+    spreadsheet = secrets.pop('spreadsheet', None)
+    secrets.pop('worksheet', None)
+    if secrets.get('type') != 'service_account' or not spreadsheet:
+        return None
+    import gspread
+    client = gspread.service_account_from_dict(secrets)
+    if str(spreadsheet).startswith(('http://', 'https://')):
+        return client.open_by_url(spreadsheet)
+    return client.open_by_key(spreadsheet)
+
+
+class GSheetsSource:
+    """
+    st.connection("gsheets") (또는 같은 read 인터페이스의 대체 연결) 에서 구간 읽기.
+    - spreadsheet (gspread Spreadsheet) 가 있으면: 워크시트에 헤더 행 + 필요한 행 범위만 요청 (batch_get 1회)
+    - 없으면 (공개 시트 CSV, LocalSheetConnection): conn.read 로 전체를 받은 뒤
+      skiprows / nrows 를 pandas 파서로 전달 (받는 양은 같고 파싱 양만 줄어듦)
+    """
+
+    def __init__(self, conn, worksheet, spreadsheet=None):
+        self.conn = conn
+        self.worksheet = worksheet
+        self.spreadsheet = spreadsheet
+
+    def _gspread_worksheet(self):
+        """gspread Worksheet (매번 새로 열어 행 수 등 메타데이터 갱신), spreadsheet 가 없으면 None"""
+        if self.spreadsheet is None:
+            return None
+        return self.spreadsheet.worksheet(self.worksheet)
+
+    def read_rows(self, start=0, stop=None):
+        """데이터 행 [start, stop) (헤더 제외, 0부터) → DataFrame"""
+        ws = self._gspread_worksheet()
+        if ws is not None:
+            return _normalize(self._read_range(ws, start, stop))
+
+        options = {'dtype': str}
+        if start > 0:
+            options['skiprows'] = range(1, start + 1)
+        if stop is not None:
+            options['nrows'] = max(0, stop - start)
+        df = self.conn.read(worksheet=self.worksheet, ttl=0, **options)
+        return _normalize(df)
+
+    @staticmethod
+    def _read_range(ws, start, stop):
+        """
+        시트 행 번호 = 데이터 행 + 2 (1행은 헤더). 끝 행은 시트 격자 크기(row_count)까지 —
+        값이 있는 마지막 행 뒤의 빈 행은 API 가 돌려주지 않음. 중간 빈 행은 빈 행으로 유지 (행 위치 보존).
+        값은 기존 conn.read (get_as_dataframe) 와 같이 서식 없는 값 ("₩1,234" → 1234, "12%" → 0.12).
+        """
+        first = start + 2
+        last = ws.row_count if stop is None else min(stop + 1, ws.row_count)
+        ranges = ["1:1"] + ([f"{first}:{last}"] if last >= first else [])
+        fetched = ws.batch_get(ranges, value_render_option='UNFORMATTED_VALUE',
+                               date_time_render_option='FORMATTED_STRING')
+        header = _header_names(fetched[0][0] if fetched[0] else [])
+        values = fetched[1] if len(fetched) > 1 else []
+        width = len(header)
+        rows = [list(row[:width]) + [''] * (width - len(row)) for row in values]
+        return pd.DataFrame(rows, columns=header, dtype=object)
+
+
+class LocalSheetConnection:
+    """
+    오프라인 테스트용 시트 연결 대체품: <root>/<worksheet>.csv (또는 .xlsx) 를 시트로 사용.
+    GSheetsConnection.read 와 같은 방식으로 호출 가능 (ttl 은 무시).
+    fetched_rows 로 지금까지 읽어 간 행 수를 확인할 수 있음.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.reads = 0
+        self.fetched_rows = 0
+
+    def read(self, *, worksheet=None, ttl=None, **options):
+        options.pop('max_entries', None)
+        options.pop('evaluate_formulas', None)
+        path = os.path.join(self.root, f"{worksheet}.csv")
+        if os.path.exists(path):
+            df = pd.read_csv(path, encoding='utf-8-sig', **options)
+        else:
+            df = pd.read_excel(os.path.join(self.root, f"{worksheet}.xlsx"), **options)
+        self.reads += 1
+        self.fetched_rows += len(df)
+        return df
+
+
+# -----------------------------------------------------------
+# 미러
+# -----------------------------------------------------------
+class SheetMirror:
+    """
+    state (pickle 저장):
+      {'version', 'frame': 문자열 DataFrame, 'hashes': 행 해시(uint64),
+       'synced_at': 마지막 동기화 성공 시각, 'changed_at': 마지막 내용 변경 시각}
+    """
+
+    def __init__(self, source, path=None, interval=DEFAULT_INTERVAL,
+                 overlap=OVERLAP, full_every=FULL_EVERY):
+        self.source = source
+        self.path = path
+        self.interval = interval
+        self.overlap = overlap
+        self.full_every = full_every
+
+        self._lock = threading.Lock()          # state 교체
+        self._refresh_lock = threading.Lock()  # 동기화는 한 번에 하나만
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+        self._since_full = 0
+
+        self.state = self._empty_state()
+        self.last_error = None
+        self.last_error_at = None
+        self.last_result = None
+        if path and os.path.exists(path):
+            try:
+                with open(path, "rb") as f:
+                    state = pickle.load(f)
+                if state.get('version') == MIRROR_VERSION:
+                    self.state = state
+            except Exception:
+                pass
+
+    @staticmethod
+    def _empty_state():
+        return {'version': MIRROR_VERSION, 'frame': pd.DataFrame(),
+                'hashes': np.empty(0, dtype=np.uint64), 'synced_at': None, 'changed_at': None}
+
+    # --- 읽기 (네트워크 없음) ---------------------------------
+    def frame(self):
+        """로컬 사본에서 완전히 빈 행을 뺀 표 (호출 측에서 수정해도 되도록 복사본)"""
+        with self._lock:
+            frame = self.state['frame']
+        return frame.dropna(how='all').reset_index(drop=True)
+
+    def status(self):
+        """화면 표시용 동기화 상태"""
+        with self._lock:
+            synced_at = self.state['synced_at']
+            rows = int(self.state['frame'].notna().any(axis=1).sum())
+            changed_at = self.state['changed_at']
+        age = None
+        if synced_at is not None:
+            age = (datetime.datetime.now() - synced_at).total_seconds()
+        return {
+            'rows': rows,
+            'synced_at': synced_at,
+            'changed_at': changed_at,
+            'age_seconds': age,
+            'stale': age is None or age > self.interval * 2,
+            'refreshing': self._refresh_lock.locked(),
+            'running': self._thread is not None and self._thread.is_alive(),
+            'error': self.last_error,
+            'error_at': self.last_error_at,
+            'last_result': self.last_result,
+        }
+
+    # --- 동기화 -----------------------------------------------
+    def refresh(self, full=False):
+        """
+        시트와 동기화 1회. 다른 동기화가 진행 중이면 기다리지 않고 None.
+        반환: {'mode', 'appended', 'changed', 'removed', 'fetched', 'seconds'}
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            return None
+        try:
+            t0 = time.perf_counter()
+            try:
+                result = self._refresh(full or self._since_full + 1 >= self.full_every)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                self.last_error_at = datetime.datetime.now()
+                logger.warning(f"구글 시트 동기화 실패: {self.last_error}")
+                raise
+            result['seconds'] = round(time.perf_counter() - t0, 3)
+            self.last_error = None
+            self.last_result = result
+            logger.info(f"구글 시트 동기화: {result}")
+            return result
+        finally:
+            self._refresh_lock.release()
+
+    def _refresh(self, full):
+        with self._lock:
+            old = self.state['frame']
+            old_hashes = self.state['hashes']
+        n = len(old)
+
+        if not full and n > 0:
+            start = max(0, n - self.overlap)
+            tail = self.source.read_rows(start)
+            if list(tail.columns) == list(old.columns) and len(tail) >= n - start:
+                result = self._merge(old, old_hashes, start, tail, truncate=False)
+                result.update(mode='tail', fetched=len(tail))
+                self._since_full += 1
+                return result
+            # 열 구성이 바뀌었거나 행이 줄어듦 → 전체 대조
+
+        fresh = self.source.read_rows(0)
+        if list(fresh.columns) != list(old.columns):
+            old, old_hashes = pd.DataFrame(), old_hashes[:0]
+        result = self._merge(old, old_hashes, 0, fresh, truncate=True)
+        result.update(mode='full', fetched=len(fresh))
+        self._since_full = 0
+        return result
+
+    def _merge(self, old, old_hashes, start, fetched, truncate):
+        """old[start:] 구간을 fetched 와 대조해 바뀐 행만 교체 / 새 행 추가 / (truncate 시) 초과 행 삭제"""
+        n = len(old)
+        hashes = _row_hashes(fetched)
+        common = min(n - start, len(fetched))
+        diff = np.flatnonzero(hashes[:common] != old_hashes[start:start + common])
+        appended = len(fetched) - common
+        removed = (n - start - common) if truncate else 0
+
+        result = {'appended': int(appended), 'changed': int(len(diff)), 'removed': int(removed)}
+        now = datetime.datetime.now()
+        if not (appended or len(diff) or removed) and not old.columns.empty:
+            with self._lock:
+                self.state['synced_at'] = now
+            self._save()
+            return result
+
+        keep = old.iloc[:n - removed]
+        new_hashes = old_hashes[:n - removed].copy()
+        if len(diff):
+            keep = keep.copy()
+            keep.iloc[start + diff] = fetched.iloc[diff].to_numpy()
+            new_hashes[start + diff] = hashes[diff]
+        if appended:
+            keep = pd.concat([keep, fetched.iloc[common:]], ignore_index=True)
+            new_hashes = np.concatenate([new_hashes, hashes[common:]])
+        if old.columns.empty:
+            keep = fetched
+
+        with self._lock:
+            self.state = {'version': MIRROR_VERSION, 'frame': keep.reset_index(drop=True),
+                          'hashes': new_hashes, 'synced_at': now, 'changed_at': now}
+        self._save()
+        return result
+
+    def _save(self):
+        if not self.path:
+            return
+        with self._lock:
+            state = dict(self.state)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.path)
+        except OSError:
+            try: os.remove(tmp)
+            except OSError: pass
+
+    # --- 백그라운드 ------------------------------------------
+    def start(self):
+        """백그라운드 동기화 시작 (이미 실행 중이면 무시)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="gsheet-mirror", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def request_refresh(self):
+        """다음 주기를 기다리지 않고 바로 동기화 (비동기)"""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception:
+                pass  # last_error 에 기록됨, 이전 사본 유지
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+
+def default_mirror_path(worksheet):
+    root = os.environ.get("MERITZ_GSHEET_MIRROR_DIR", DEFAULT_MIRROR_DIR)
+    safe = "".join(c if c.isalnum() else "_" for c in str(worksheet))
+    return os.path.join(root, f"gsheet_{safe}.pkl")
+
+
+def format_age(seconds):
+    """경과 초 → '방금' / 'N분 전' / 'N시간 전'"""
+    if seconds is None:
+        return "동기화 전"
+    if seconds < 60:
+        return "방금"
+    if seconds < 3600:
+        return f"{int(seconds // 60)}분 전"
+    return f"{int(seconds // 3600)}시간 전"
@@ -0,0 +1,229 @@
+"""
+드롭 폴더 자동 집계 (백그라운드 수집기)
+
+매체 리포트를 드롭 폴더에 넣어 두면 파일명 규칙으로 분류 → 읽기/집계 → 매체×상품 통합 표를 게시.
+대시보드는 게시된 결과를 바로 읽고, 마지막 게시 이후 들어온 파일만 새로 처리함.
+
+예)
+  python ingest_daemon.py ./drop                 # 10초마다 폴더 확인 (Ctrl+C 로 종료)
+  python ingest_daemon.py ./drop --once -v       # 1회만 처리
+
+- 파일별 결과는 (크기, 수정 시각) 기준으로 재사용 → 새/변경 파일만 처리, 지운 파일은 결과에서 제외
+- 수정 후 SETTLE_SECONDS 가 지나지 않은 파일은 복사 중일 수 있으므로 다음 확인으로 미룸
+- 게시 상태는 <드롭 폴더>/.meritz/ingest_state.pkl (임시 파일 + os.replace 로 원자적 교체)
+  수집기와 대시보드가 동시에 갱신해도 깨진 상태를 읽지 않음 (같은 파일은 파싱 캐시로 재사용)
+"""
+import argparse
+import datetime
+import logging
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+EXPORT_EXTENSIONS = ('.csv', '.tsv', '.txt', '.xlsx', '.xls')
+TEMP_PREFIXES = ('.', '~$')
+TEMP_SUFFIXES = ('.part', '.crdownload', '.tmp', '.download')
+SETTLE_SECONDS = 2.0
+DEFAULT_INTERVAL = 10.0
+STATE_DIRNAME = ".meritz"
+
+# 상태 형식 / 집계 로직이 바뀌면 올려서 이전 상태를 무시
+STATE_VERSION = 5
+
+log = logging.getLogger("meritz_report.ingest")
+
+
+def _empty_state():
+    return {'version': STATE_VERSION, 'files': {}, 'final_df': None, 'removed': [],
+            'published_at': None, 'generation': 0}
+
+
+class DropFolderIngestor:
+    """
+    state 구조:
+      {'files': {상대경로: {'size', 'mtime_ns', 'result': ingest_file 결과}},
+       'final_df': 통합 표, 'removed': 중복 파일/겹치는 행 제외 내역, 'published_at': 게시 시각, 'generation': 게시 횟수}
+    """
+
+    def __init__(self, drop_dir, cache=None, state_path=None, settle_seconds=SETTLE_SECONDS):
+        self.drop_dir = os.path.abspath(drop_dir)
+        self.cache = cache
+        self.state_path = state_path or os.path.join(self.drop_dir, STATE_DIRNAME, "ingest_state.pkl")
+        self.settle_seconds = settle_seconds
+        self.state = _empty_state()
+        self._state_mtime = None
+        self._load()
+
+    # --- 상태 저장/불러오기 -----------------------------------
+    def _load(self):
+        """디스크 상태가 바뀌었을 때만 다시 읽음 (다른 프로세스의 게시 반영)"""
+        try:
+            mtime = os.stat(self.state_path).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._state_mtime:
+            return
+        try:
+            with open(self.state_path, "rb") as f:
+                state = pickle.load(f)
+        except Exception:
+            return
+        if state.get('version') == STATE_VERSION:
+            self.state = state
+        self._state_mtime = mtime
+
+    def _save(self):
+        folder = os.path.dirname(self.state_path)
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(self.state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.state_path)
+        except BaseException:
+            try: os.remove(tmp)
+            except OSError: pass
+            raise
+        self._state_mtime = os.stat(self.state_path).st_mtime_ns
+
+    # --- 폴더 확인 --------------------------------------------
+    def scan(self):
+        """드롭 폴더의 리포트 파일 → {상대경로: (크기, 수정 시각 ns)}"""
+        found = {}
+        for root, dirs, names in os.walk(self.drop_dir):
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            for name in names:
+                lower = name.lower()
+                if name.startswith(TEMP_PREFIXES) or lower.endswith(TEMP_SUFFIXES):
+                    continue
+                if not lower.endswith(EXPORT_EXTENSIONS):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue  # 확인 도중 삭제/이동
+                found[os.path.relpath(path, self.drop_dir)] = (st.st_size, st.st_mtime_ns)
+        return found
+
+    def refresh(self):
+        """
+        새/변경/삭제 파일만 반영해 다시 게시.
+        반환: {'added', 'updated', 'removed', 'pending', 'failed', 'published'}
+        """
+        import report_core
+
+        self._load()
+        known = self.state['files']
+        found = self.scan()
+        now_ns = time.time_ns()
+        settle_ns = int(self.settle_seconds * 1e9)
+
+        summary = {'added': [], 'updated': [], 'removed': [], 'pending': [], 'failed': [], 'published': False}
+        files = {rel: entry for rel, entry in known.items() if rel in found}
+        summary['removed'] = sorted(rel for rel in known if rel not in found)
+
+        for rel in sorted(found):
+            size, mtime_ns = found[rel]
+            entry = known.get(rel)
+            if entry is not None and (entry['size'], entry['mtime_ns']) == (size, mtime_ns):
+                continue
+            if now_ns - mtime_ns < settle_ns:
+                summary['pending'].append(rel)
+                continue
+            try:
+                with report_core.open_export_file(os.path.join(self.drop_dir, rel)) as f:
+                    result = report_core.ingest_file(f, self.cache)
+            except OSError as e:
+                log.warning(f"파일 읽기 실패 ({rel}): {e}")
+                summary['failed'].append(rel)
+                continue
+            for level, msg in result['messages']:
+                log.log(logging.ERROR if level == 'error' else logging.WARNING, msg)
+            files[rel] = {'size': size, 'mtime_ns': mtime_ns, 'result': result}
+            summary['updated' if entry is not None else 'added'].append(rel)
+
+        if summary['added'] or summary['updated'] or summary['removed'] or self.state['published_at'] is None:
+            results = [files[rel]['result'] for rel in sorted(files)]
+            removed = []
+            final_df = report_core.merge_ingest_results(results, notify=lambda level, msg: None, removed=removed)
+            for entry in removed:
+                log.warning(f"{entry['구분']} 제외 ({entry['파일']} = {entry['같은 내용']}): {entry['행']:,}행")
+            self.state = {
+                'version': STATE_VERSION,
+                'files': files,
+                'final_df': final_df,
+                'removed': removed,
+                'published_at': datetime.datetime.now(),
+                'generation': self.state['generation'] + 1,
+            }
+            self._save()
+            summary['published'] = True
+            log.info(f"게시 #{self.state['generation']}: 파일 {len(files)}개 "
+                     f"(추가 {len(summary['added'])}, 변경 {len(summary['updated'])}, 삭제 {len(summary['removed'])})")
+        return summary
+
+    # --- 게시 결과 --------------------------------------------
+    def results(self):
+        """파일별 ingest_file 결과 (경로 순) — 업로드 파일과 함께 병합할 때 사용"""
+        files = self.state['files']
+        return [files[rel]['result'] for rel in sorted(files)]
+
+    def final_df(self):
+        """게시된 매체×상품 통합 표 (없으면 None)"""
+        df = self.state['final_df']
+        return df.copy() if df is not None else None
+
+    def status(self):
+        return {'files': sorted(self.state['files']), 'published_at': self.state['published_at'],
+                'generation': self.state['generation'], 'removed': list(self.state['removed'])}
+
+    def run_forever(self, interval=DEFAULT_INTERVAL):
+        while True:
+            try:
+                self.refresh()
+            except Exception:
+                log.exception("드롭 폴더 처리 중 오류")
+            time.sleep(interval)
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(prog="ingest_daemon.py", description="드롭 폴더 매체 리포트 자동 집계")
+    p.add_argument("drop_dir", nargs="?", default=os.environ.get("MERITZ_DROP_DIR"),
+                   help="드롭 폴더 (기본: MERITZ_DROP_DIR)")
+    p.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="폴더 확인 주기 (초)")
+    p.add_argument("--once", action="store_true", help="1회만 처리하고 종료")
+    p.add_argument("--no-cache", action="store_true", help="파싱 캐시 사용 안 함")
+    p.add_argument("-v", "--verbose", action="store_true", help="진행 로그 출력")
+    args = p.parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format="%(asctime)s %(levelname)s %(message)s", stream=sys.stderr)
+    if not args.drop_dir or not os.path.isdir(args.drop_dir):
+        log.error(f"드롭 폴더를 찾을 수 없습니다: {args.drop_dir}")
+        return 2
+
+    cache = None
+    if not args.no_cache:
+        from parse_cache import ParseCache
+        try:
+            cache = ParseCache()
+        except OSError as e:
+            log.warning(f"파싱 캐시 사용 불가: {e}")
+
+    ingestor = DropFolderIngestor(args.drop_dir, cache=cache)
+    if args.once:
+        ingestor.settle_seconds = 0
+        summary = ingestor.refresh()
+        log.info(f"처리 결과: {summary}")
+        return 0
+    try:
+        ingestor.run_forever(args.interval)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
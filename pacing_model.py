@@ -0,0 +1,165 @@
+import datetime
+import json
+import os
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+from snapshot_store import TIME_SLOTS
+
+# -----------------------------------------------------------
+# 마감(18:00) 예상 배수 학습
+# - 과거 스냅샷에서 (요일, 시간대)별 18시 실적 / 해당 시간대 실적 비율을 학습
+# - 로그 비율의 평균/분산으로 배수와 예측 구간을 계산 (NumPy 일괄 계산)
+# - 일자별 기여분을 저장해 두고 새로 들어오거나 바뀐 일자만 다시 계산
+# -----------------------------------------------------------
+WEEKDAYS = ['월', '화', '수', '목', '금', '토', '일']
+FINAL_SLOT = "18:00"
+MIN_DAYS = 3  # (요일, 시간대)별 최소 학습 일수 — 미만이면 기존 상수 사용
+
+# 95% 양측 t 분위수 (자유도 → 값), 30 초과는 정규분포 근사
+_T95 = {1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306,
+        9: 2.262, 10: 2.228, 15: 2.131, 20: 2.086, 30: 2.042}
+
+
+def _t95(df):
+    if df > 30:
+        return 1.96
+    key = min(k for k in _T95 if k >= df)
+    return _T95[key]
+
+
+def weekday_of(day):
+    """'YYYY-MM-DD' → '월'~'일'"""
+    return WEEKDAYS[datetime.date.fromisoformat(day).weekday()]
+
+
+class PacingModel:
+    """
+    state 구조 (JSON 저장):
+      {'days': {day: {'sig': 저장 서명, 'weekday': '월', 'log_ratio': {slot: 값}}}}
+    프로세스당 한 개를 여러 세션이 공유하므로 state / 적합 결과는 잠금 안에서만 읽고 씀.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.state = {'days': {}}
+        self._fit = None
+        self._lock = threading.RLock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.state = json.load(f)
+            except (OSError, ValueError):
+                self.state = {'days': {}}
+
+    # --- 학습 -------------------------------------------------
+    def refresh(self, store):
+        """스냅샷 저장소와 동기화: 새/변경 일자만 다시 계산 후 배수 재적합. 반환: 갱신 일자 수"""
+        signatures = store.day_signatures()
+        with self._lock:
+            return self._refresh(store, signatures)
+
+    def _refresh(self, store, signatures):
+        days = self.state['days']
+        changed = [d for d, sig in signatures.items() if days.get(d, {}).get('sig') != sig]
+        removed = [d for d in days if d not in signatures]
+        for d in removed:
+            del days[d]
+
+        if changed:
+            ts = store.timeseries(min(changed), max(changed))
+            for d in changed:
+                entry = {'sig': signatures[d], 'weekday': weekday_of(d), 'log_ratio': {}}
+                if d in ts.index.get_level_values(0):
+                    cnt = ts.loc[d, 'cnt']
+                    final = cnt.get(FINAL_SLOT, 0.0)
+                    if final > 0:
+                        entry['log_ratio'] = {
+                            slot: float(np.log(final / v)) for slot, v in cnt.items() if v > 0
+                        }
+                days[d] = entry
+
+        if changed or removed or self._fit is None:
+            self._fit = None
+            self._save()
+        return len(changed) + len(removed)
+
+    def _save(self):
+        """state JSON 저장 (refresh 의 잠금 안에서 호출)"""
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def fit(self):
+        """
+        (요일, 시간대)별 n / 로그 비율 평균 / 표준편차를 한 번에 계산.
+        반환: dict(n, mean, std) — 각각 (요일 수 × 시간대 수) 배열
+        """
+        with self._lock:
+            if self._fit is None:
+                self._fit = self._compute_fit()
+            return self._fit
+
+    def _compute_fit(self):
+        wd_idx, slot_idx, values = [], [], []
+        for entry in self.state['days'].values():
+            w = WEEKDAYS.index(entry['weekday'])
+            for slot, v in entry['log_ratio'].items():
+                if slot in TIME_SLOTS:
+                    wd_idx.append(w)
+                    slot_idx.append(TIME_SLOTS.index(slot))
+                    values.append(v)
+
+        shape = (len(WEEKDAYS), len(TIME_SLOTS))
+        size = shape[0] * shape[1]
+        flat = np.asarray(wd_idx, dtype=np.int64) * shape[1] + np.asarray(slot_idx, dtype=np.int64)
+        values = np.asarray(values, dtype=float)
+
+        n = np.bincount(flat, minlength=size).astype(float)
+        s1 = np.bincount(flat, weights=values, minlength=size)
+        s2 = np.bincount(flat, weights=values ** 2, minlength=size)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(n > 0, s1 / n, np.nan)
+            var = np.where(n > 1, (s2 - n * mean ** 2) / (n - 1), np.nan)
+        std = np.sqrt(np.clip(var, 0.0, None))
+
+        return {'n': n.reshape(shape), 'mean': mean.reshape(shape), 'std': std.reshape(shape)}
+
+    # --- 예측 -------------------------------------------------
+    def multiplier(self, weekday, slot):
+        """
+        학습된 배수와 95% 예측 구간.
+        반환: {'mul', 'low', 'high', 'n'} / 학습 일수 부족 시 None
+        """
+        if weekday not in WEEKDAYS or slot not in TIME_SLOTS:
+            return None
+        fit = self.fit()
+        i, j = WEEKDAYS.index(weekday), TIME_SLOTS.index(slot)
+        n = int(fit['n'][i, j])
+        if n < MIN_DAYS:
+            return None
+        mean, std = fit['mean'][i, j], fit['std'][i, j]
+        half = _t95(n - 1) * std * np.sqrt(1 + 1 / n)
+        return {'mul': float(np.exp(mean)), 'low': float(np.exp(mean - half)),
+                'high': float(np.exp(mean + half)), 'n': n}
+
+    def predict(self, weekday, slot, current_total):
+        """현재 누적 실적 → 18시 예상 (예측 구간 포함), 학습 부족 시 None"""
+        m = self.multiplier(weekday, slot)
+        if m is None:
+            return None
+        return {'est': int(current_total * m['mul']), 'low': int(current_total * m['low']),
+                'high': int(current_total * m['high']), 'mul': m['mul'], 'n': m['n']}
+
+    def table(self):
+        """요일×시간대 학습 배수 표 (학습 부족 칸은 NaN)"""
+        fit = self.fit()
+        mul = np.where(fit['n'] >= MIN_DAYS, np.exp(fit['mean']), np.nan)
+        return pd.DataFrame(mul, index=WEEKDAYS, columns=TIME_SLOTS)
@@ -0,0 +1,137 @@
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+
+# -----------------------------------------------------------
+# 파일 내용 해시 기반 디스크 캐시
+# - 세션/스트림릿 프로세스 간 공유 (같은 디렉토리를 바라보면 공유됨)
+# - 용량 초과 시 가장 오래 안 쓴 항목부터 삭제 (LRU)
+# -----------------------------------------------------------
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "meritz_report")
+DEFAULT_MAX_MB = 512
+
+# 파싱/집계 로직이 바뀌면 올려서 이전 캐시를 무효화
+CACHE_VERSION = 8
+
+logger = logging.getLogger("meritz_report.cache")
+
+
+def file_digest(file):
+    """업로드 파일 내용의 SHA-256 (파일 포인터는 처음으로 되돌림)"""
+    file.seek(0)
+    h = hashlib.sha256()
+    for chunk in iter(lambda: file.read(1 << 20), b''):
+        h.update(chunk)
+    file.seek(0)
+    return h.hexdigest()
+
+
+class ParseCache:
+    """
+    key → pickle 파일 하나.
+    쓰기는 임시 파일 + os.replace 로 원자적으로 처리하므로
+    여러 프로세스가 동시에 읽고 써도 깨진 항목을 읽지 않음.
+    LRU 순서는 파일 mtime 으로 관리 (hit 시 갱신).
+    """
+
+    def __init__(self, root=None, max_bytes=None):
+        self.root = root or os.environ.get("MERITZ_CACHE_DIR", DEFAULT_CACHE_DIR)
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get("MERITZ_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024)
+        self.max_bytes = max_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def make_key(kind, digest, name=""):
+        """kind(frame/agg 등) + 내용 해시 + 파일명 (파일명 규칙이 파싱에 영향을 주므로 포함)"""
+        name_part = hashlib.sha1(name.encode("utf-8")).hexdigest()[:12]
+        return f"v{CACHE_VERSION}-{kind}-{digest}-{name_part}"
+
+    def _path(self, key):
+        return os.path.join(self.root, key + ".pkl")
+
+    def get(self, key, default=None):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return default
+        except Exception:
+            # 깨진 항목은 버리고 miss 처리
+            self._remove(path)
+            return default
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key, value):
+        """
+        저장 실패(디스크 부족, 읽기 전용/용량 제한 폴더, pickle 불가 값)는 로그만 남기고 무시.
+        캐시는 최적화일 뿐이라 집계는 그대로 진행. 반환: 저장 여부
+        """
+        tmp = None
+        try:
+            fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(key))
+        except (OSError, pickle.PicklingError, TypeError, AttributeError) as e:
+            if tmp is not None:
+                self._remove(tmp)
+            logger.warning(f"캐시 저장 실패 ({key}): {e}")
+            return False
+        try:
+            self._evict()
+        except OSError as e:
+            logger.warning(f"캐시 정리 실패: {e}")
+        return True
+
+    def get_or_compute(self, key, compute):
+        """캐시에 없으면 compute() 결과를 저장 (None 결과는 저장하지 않음)"""
+        value = self.get(key)
+        if value is not None:
+            return value
+        value = compute()
+        if value is not None:
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        for name in os.listdir(self.root):
+            if name.endswith(".pkl"):
+                self._remove(os.path.join(self.root, name))
+
+    def _entries(self):
+        entries = []
+        for entry in os.scandir(self.root):
+            if not entry.name.endswith(".pkl"):
+                continue
+            try:
+                info = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((info.st_mtime, info.st_size, entry.path))
+        return entries
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            self._remove(path)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,145 @@
+import contextlib
+import contextvars
+import datetime
+import itertools
+import json
+import logging
+import threading
+import time
+import tracemalloc
+import uuid
+
+import pandas as pd
+
+# -----------------------------------------------------------
+# 단계별 처리 시간 / 행 수 / 최대 메모리 기록
+# - recording(recorder) 블록 안에서 실행된 stage(...) 만 기록 (밖에서는 비용 거의 없음)
+# - 기록 대상은 contextvars 로 전달 → 세션/스레드끼리 섞이지 않음
+#   (작업 스레드에서는 bind(fn) 으로 감싸서 호출)
+# - 메모리는 trace_memory=True 일 때만 tracemalloc 으로 측정 (느려지므로 선택)
+#   tracemalloc 최대치는 프로세스 전체 기준이라 병렬 처리 중에는 파일별로 정확히 나뉘지 않음
+# -----------------------------------------------------------
+logger = logging.getLogger("meritz_report.perf")
+
+_recorder = contextvars.ContextVar("meritz_perf_recorder", default=None)
+_stack = contextvars.ContextVar("meritz_perf_stack", default=())
+
+RECORD_COLUMNS = ['seq', 'stage', 'parent', 'depth', 'file', 'source', 'path', 'rows',
+                  'seconds', 'peak_mb', 'error', 'thread', 'started_at']
+
+
+class PerfRecorder:
+    """실행 1회분 기록 (여러 스레드에서 동시에 추가 가능)"""
+
+    def __init__(self, trace_memory=False, run_id=None):
+        self.trace_memory = trace_memory
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.records = []
+        self._lock = threading.Lock()
+        self._seq = itertools.count(1)
+
+    def add(self, record):
+        with self._lock:
+            record['seq'] = next(self._seq)
+            self.records.append(record)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(json.dumps({'run_id': self.run_id, **record}, ensure_ascii=False, default=str))
+
+    def to_frame(self):
+        """기록 표 (시작 순서)"""
+        df = pd.DataFrame(self.records)
+        extra = [c for c in df.columns if c not in RECORD_COLUMNS]
+        df = df.reindex(columns=RECORD_COLUMNS + extra)
+        return df.sort_values('seq').reset_index(drop=True)
+
+    def summary(self):
+        """단계별 합계: 횟수 / 총 시간 / 최대 시간 / 총 행 수 / 최대 메모리"""
+        df = self.to_frame()
+        if df.empty:
+            return pd.DataFrame(columns=['count', 'seconds', 'max_seconds', 'rows', 'peak_mb'])
+        return df.groupby('stage', sort=False).agg(
+            count=('seq', 'size'), seconds=('seconds', 'sum'), max_seconds=('seconds', 'max'),
+            rows=('rows', 'sum'), peak_mb=('peak_mb', 'max'),
+        ).sort_values('seconds', ascending=False)
+
+    def to_jsonl(self):
+        """구조화 로그 (JSON Lines, 한 줄 = 단계 1개)"""
+        lines = [json.dumps({'run_id': self.run_id, **r}, ensure_ascii=False, default=str)
+                 for r in sorted(self.records, key=lambda r: r['seq'])]
+        return "\n".join(lines) + ("\n" if lines else "")
+
+
+@contextlib.contextmanager
+def recording(recorder):
+    """블록 안에서 실행되는 stage(...) 를 recorder 에 기록"""
+    token = _recorder.set(recorder)
+    started_tracing = False
+    if recorder.trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        started_tracing = True
+    try:
+        yield recorder
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+        _recorder.reset(token)
+
+
+def current_recorder():
+    return _recorder.get()
+
+
+def bind(fn):
+    """현재 기록 대상을 유지한 채 다른 스레드에서 실행할 함수 (호출 1회용 컨텍스트 복사)"""
+    ctx = contextvars.copy_context()
+    return lambda *args, **kwargs: ctx.run(fn, *args, **kwargs)
+
+
+@contextlib.contextmanager
+def stage(name, **fields):
+    """
+    단계 기록. 블록 안에서 info['rows'] / info['path'] 등을 채우면 함께 저장됨.
+    기록 중이 아니면 같은 모양의 dict 만 넘기고 (채워도 버려짐) 아무것도 하지 않음.
+    """
+    recorder = _recorder.get()
+    if recorder is None:
+        yield {'file': None, 'source': None, 'path': None, 'rows': None, **fields}
+        return
+
+    stack = _stack.get()
+    parent = stack[-1] if stack else None
+    tracing = recorder.trace_memory and tracemalloc.is_tracing()
+    frame = {'name': name, 'peak_abs': 0, 'start_mem': 0}
+    if tracing:
+        current, peak = tracemalloc.get_traced_memory()
+        if parent is not None:
+            parent['peak_abs'] = max(parent['peak_abs'], peak)
+        tracemalloc.reset_peak()
+        frame['start_mem'] = current
+    token = _stack.set(stack + (frame,))
+
+    info = {'file': None, 'source': None, 'path': None, 'rows': None, **fields}
+    error = None
+    started_at = datetime.datetime.now().isoformat(timespec='milliseconds')
+    t0 = time.perf_counter()
+    try:
+        yield info
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        seconds = time.perf_counter() - t0
+        _stack.reset(token)
+        peak_mb = None
+        if tracing:
+            peak_abs = max(frame['peak_abs'], tracemalloc.get_traced_memory()[1])
+            peak_mb = round(max(0, peak_abs - frame['start_mem']) / 2**20, 2)
+            if parent is not None:
+                parent['peak_abs'] = max(parent['peak_abs'], peak_abs)
+        recorder.add({
+            'stage': name, 'parent': parent['name'] if parent else None, 'depth': len(stack),
+            'file': info.get('file'), 'source': info.get('source'), 'path': info.get('path'),
+            'rows': info.get('rows'), 'seconds': round(seconds, 5), 'peak_mb': peak_mb,
+            'error': error, 'thread': threading.current_thread().name, 'started_at': started_at,
+            **{k: v for k, v in info.items() if k not in RECORD_COLUMNS},
+        })
@@ -0,0 +1,1574 @@
+import codecs
+import contextlib
+import csv
+import datetime
+import importlib.util
+import io
+import logging
+import os
+import shutil
+import tempfile
+import xml.etree.ElementTree as ET
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+import perf_trace
+from parse_cache import file_digest
+
+# -----------------------------------------------------------
+# 메리츠 보고 자동화 코어 (스트림릿 없이 사용 가능)
+# - 파일 읽기 / 매체별 집계 / 통계 변환 / 보고 문구 생성
+# - app.py(스트림릿 화면)와 cli.py(배치/크론)가 같은 로직을 공유
+# -----------------------------------------------------------
+logger = logging.getLogger("meritz_report")
+
+# -----------------------------------------------------------
+# 1. 유틸리티 및 데이터 처리 함수
+# -----------------------------------------------------------
+def clean_currency(x):
+    """쉼표 제거 및 숫자 변환"""
+    if pd.isna(x) or x == '':
+        return 0.0
+    if isinstance(x, (int, float)):
+        return float(x)
+    if isinstance(x, str):
+        try:
+            return float(x.replace(',', '').replace('"', '').replace("'", "").strip())
+        except:
+            return 0.0
+    return 0.0
+
+def classify_product(campaign_name):
+    """상품 구분"""
+    if pd.isna(campaign_name):
+        return '상품'
+    name = str(campaign_name)
+    if '보장' in name or '누적' in name:
+        return '보장분석'
+    else:
+        return '상품'
+
+def _parse_float(x):
+    """clean_currency 문자열 분기와 동일한 개별 변환 (벡터 변환 실패분 전용)"""
+    try:
+        return float(x)
+    except (TypeError, ValueError):
+        return 0.0
+
+def clean_currency_series(s):
+    """
+    clean_currency 벡터화 버전.
+    문자열은 pandas str 연산 + to_numeric으로 일괄 변환하고,
+    to_numeric이 못 읽은 값만 개별 float()로 재시도하여 결과를 동일하게 맞춤.
+    """
+    if not isinstance(s, pd.Series):
+        s = pd.Series(s)
+
+    # 숫자형 컬럼은 문자열 처리 불필요
+    if pd.api.types.is_bool_dtype(s) or pd.api.types.is_numeric_dtype(s):
+        return s.astype('float64').fillna(0.0)
+
+    try:
+        text = s.str.replace(r'[,"\']', '', regex=True).str.strip()
+    except AttributeError:
+        # 문자열이 하나도 없는 object 컬럼
+        text = pd.Series(np.nan, index=s.index, dtype=object)
+
+    has_text = text.notna().to_numpy()
+    out = pd.to_numeric(text, errors='coerce').to_numpy(dtype='float64', na_value=np.nan, copy=True)
+
+    # 문자열이 아닌 값 (엑셀 숫자 셀 등) → 숫자면 그대로, 그 외 0.0
+    other = ~has_text & s.notna().to_numpy()
+    if other.any():
+        out[other] = pd.to_numeric(s[other], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+
+    retry = has_text & np.isnan(out) & text.ne('').to_numpy()
+    out = np.where(np.isnan(out), 0.0, out)
+    if retry.any():
+        out[retry] = text[retry].map(_parse_float).to_numpy(dtype='float64')
+
+    return pd.Series(out, index=s.index, dtype='float64')
+
+def classify_product_series(s):
+    """classify_product 벡터화 버전 (보장/누적 포함 → 보장분석)"""
+    hit = s.astype(str).str.contains('보장|누적', regex=True, na=False) & s.notna()
+    return pd.Series(np.where(hit, '보장분석', '상품'), index=s.index, dtype=object)
+
+def get_media_from_plab(row):
+    """피랩 매체 식별"""
+    account = str(row.get('account', '')).upper()
+    gubun = str(row.get('구분', '')).upper()
+    
+    if 'DDN' in account: return '카카오'
+    if 'GDN' in account: return '구글'
+    
+    targets = ['네이버', '카카오', '토스', '구글', 'NAVER', 'KAKAO', 'TOSS', 'GOOGLE']
+    media_map = {'NAVER': '네이버', 'KAKAO': '카카오', 'TOSS': '토스', 'GOOGLE': '구글'}
+    
+    for t in targets:
+        if t in account: return media_map.get(t, t)
+    for t in targets:
+        if t in gubun: return media_map.get(t, t)
+
+    return '기타'
+
+# 피랩 매체 키워드: (필드, 키워드, 매체) — 위에서부터 먼저 맞는 규칙 적용
+# 키워드는 대문자로 비교하며, 규칙을 추가해도 벡터 연산 경로 그대로 사용됨
+_PLAB_TARGETS = [('네이버', '네이버'), ('카카오', '카카오'), ('토스', '토스'), ('구글', '구글'),
+                 ('NAVER', '네이버'), ('KAKAO', '카카오'), ('TOSS', '토스'), ('GOOGLE', '구글')]
+PLAB_MEDIA_RULES = (
+    [('account', 'DDN', '카카오'), ('account', 'GDN', '구글')]
+    + [('account', kw, media) for kw, media in _PLAB_TARGETS]
+    + [('구분', kw, media) for kw, media in _PLAB_TARGETS]
+)
+
+def classify_media_plab(df, rules=None):
+    """
+    get_media_from_plab 벡터화 버전 (우선순위 동일: DDN/GDN → account → 구분 → 기타).
+    컬럼별 고유값만 키워드 검사한 뒤 코드로 펼쳐서 행 수가 많아도 빠름.
+    """
+    rules = PLAB_MEDIA_RULES if rules is None else rules
+    prepared = {}
+    conds, choices = [], []
+    for field, keyword, media in rules:
+        if field not in prepared:
+            col = df[field] if field in df.columns else pd.Series('', index=df.index)
+            codes, uniques = pd.factorize(col.astype(str).str.upper())
+            prepared[field] = (codes, pd.Series(uniques, dtype=object))
+        codes, uniques = prepared[field]
+        hit = uniques.str.contains(str(keyword).upper(), regex=False, na=False).to_numpy(dtype=bool)
+        conds.append(np.append(hit, False)[codes]) # code -1 (빈 값) → 불일치
+        choices.append(media)
+
+    if not conds:
+        return pd.Series('기타', index=df.index, dtype=object)
+    return pd.Series(np.select(conds, choices, default='기타'), index=df.index, dtype=object)
+
+XLSX_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+
+def _xlsx_col_index(ref):
+    """셀 참조(C5) → 0부터 시작하는 열 번호"""
+    idx = 0
+    for ch in ref:
+        if 'A' <= ch <= 'Z':
+            idx = idx * 26 + (ord(ch) - 64)
+        else:
+            break
+    return idx - 1
+
+def _iter_xlsx_elements(f, tag):
+    """
+    iterparse로 tag 요소를 하나씩 넘겨주고, 처리 후 부모에서 제거하여
+    트리가 쌓이지 않도록 함 (파일 크기와 무관하게 메모리 일정).
+    """
+    parents = []
+    for event, elem in ET.iterparse(f, events=('start', 'end')):
+        if event == 'start':
+            parents.append(elem)
+            continue
+        parents.pop()
+        if elem.tag == tag:
+            yield elem
+            elem.clear()
+            if parents:
+                parents[-1].remove(elem)
+
+def _load_shared_strings(z):
+    strings = []
+    if 'xl/sharedStrings.xml' not in z.namelist():
+        return strings
+    with z.open('xl/sharedStrings.xml') as f:
+        for si in _iter_xlsx_elements(f, XLSX_NS + 'si'):
+            t = si.find(XLSX_NS + 't')
+            if t is not None and t.text:
+                strings.append(t.text)
+            else:
+                # 여러 서식이 섞인 경우 <r><t>...
+                parts = [rt.text for rt in si.findall(f'{XLSX_NS}r/{XLSX_NS}t') if rt.text]
+                strings.append("".join(parts))
+    return strings
+
+def _xlsx_cell_value(c, strings):
+    t = c.get('t') # 데이터 타입
+    v_tag = c.find(XLSX_NS + 'v')
+    val = v_tag.text if v_tag is not None else None
+
+    if t == 's' and val is not None: # Shared String 참조
+        try:
+            val = strings[int(val)]
+        except (ValueError, IndexError):
+            val = ""
+    elif t == 'inlineStr': # 인라인 문자열
+        t_tag = c.find(f'{XLSX_NS}is/{XLSX_NS}t')
+        val = t_tag.text if t_tag is not None else ""
+    return val
+
+def load_excel_xml_fallback(file, nrows=None, usecols=None, header=0):
+    """
+    [최후의 수단] 엑셀 파일을 Zip으로 열어서 XML 데이터를 직접 파싱.
+    openpyxl 라이브러리의 스타일 에러를 100% 우회함.
+    - iterparse 스트리밍: 행 단위로 읽고 바로 버리므로 대용량 파일도 메모리 일정
+    - 셀 참조(r="C5")로 열 위치를 잡아 빈 셀이 있어도 열이 밀리지 않음
+    - nrows: 헤더 제외 N행까지만 읽음 / usecols: 컬럼명 리스트 또는 callable
+    - header: 헤더로 쓸 행 번호 (위쪽 행은 버림) / None이면 헤더 없이 읽음
+    """
+    try:
+        file.seek(0)
+        z = zipfile.ZipFile(file)
+
+        # 1. Shared Strings 추출 (엑셀은 문자열을 별도 XML에 저장함)
+        strings = _load_shared_strings(z)
+
+        # 2. 첫 번째 시트 데이터 추출
+        # 보통 xl/worksheets/sheet1.xml에 있음
+        sheet_path = 'xl/worksheets/sheet1.xml'
+        if sheet_path not in z.namelist():
+             # sheet1이 없으면 sheet로 시작하는 첫번째 파일 찾기
+             sheets = [n for n in z.namelist() if n.startswith('xl/worksheets/sheet')]
+             if sheets: sheet_path = sheets[0]
+             else: return None
+
+        if usecols is not None and not callable(usecols):
+            wanted = {str(c).strip() for c in usecols}
+            usecols = lambda name: str(name).strip() in wanted
+
+        columns_row, keep, data = None, None, []
+        with z.open(sheet_path) as f:
+            for row_idx, row in enumerate(_iter_xlsx_elements(f, XLSX_NS + 'row')):
+                if header is not None and row_idx < header:
+                    continue
+                cells = {}
+                pos = -1
+                for c in row.iter(XLSX_NS + 'c'):
+                    ref = c.get('r')
+                    pos = _xlsx_col_index(ref) if ref else pos + 1
+                    cells[pos] = _xlsx_cell_value(c, strings)
+
+                # header 행을 컬럼명으로
+                if header is not None and columns_row is None:
+                    width = max(cells) + 1 if cells else 0
+                    columns_row = [cells.get(i) for i in range(width)]
+                    if usecols is not None:
+                        keep = [i for i, h in enumerate(columns_row) if usecols(h)]
+                    continue
+
+                if keep is not None:
+                    data.append([cells.get(i) for i in keep])
+                else:
+                    width = max(cells) + 1 if cells else 0
+                    data.append([cells.get(i) for i in range(width)])
+
+                if nrows is not None and len(data) >= nrows:
+                    break
+
+        if header is None:
+            return pd.DataFrame(data) if data else None
+        if columns_row is None: return None
+
+        if keep is not None:
+            columns = [columns_row[i] for i in keep]
+        else:
+            width = max([len(columns_row)] + [len(r) for r in data])
+            columns = columns_row + [None] * (width - len(columns_row))
+        return pd.DataFrame(data, columns=columns)
+
+    except Exception as e:
+        # st.error(f"XML 파싱 실패: {e}")
+        return None
+
+SNIFF_BYTES = 64 * 1024
+
+def _decode_prefix(head, encoding):
+    """잘린 앞부분 바이트 디코딩 (마지막 글자가 잘려도 실패로 보지 않음)"""
+    try:
+        return codecs.getincrementaldecoder(encoding)().decode(head, final=False)
+    except (UnicodeDecodeError, LookupError):
+        return None
+
+def _sniff_encoding(head):
+    # 1. BOM
+    if head.startswith(codecs.BOM_UTF8): return 'utf-8-sig'
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)): return 'utf-16'
+
+    # 2. BOM 없는 UTF-16: 짝/홀수 위치에 NUL 바이트가 몰려 있음
+    if head.count(b'\x00') > len(head) // 10:
+        even, odd = head[0::2].count(b'\x00'), head[1::2].count(b'\x00')
+        return 'utf-16-le' if odd > even else 'utf-16-be'
+
+    # 3. UTF-8 → CP949 (EUC-KR 상위 호환) 순으로 유효성 검사
+    for enc in ('utf-8', 'cp949'):
+        if _decode_prefix(head, enc) is not None:
+            return enc
+    return None
+
+def _sniff_separator(text):
+    """탭/쉼표 중 줄마다 필드 수가 일정한 쪽 선택 (숫자의 천단위 쉼표에 속지 않도록)"""
+    lines = text.splitlines()
+    if len(lines) > 1:
+        lines = lines[:-1] # 마지막 줄은 잘렸을 수 있음
+    lines = [l for l in lines if l.strip()][:50]
+
+    best_sep, best_score = ',', None
+    for sep in ('\t', ','):
+        counts = [len(row) for row in csv.reader(lines, delimiter=sep)]
+        # 상단 안내문(1칸짜리 줄)은 제외하고 판단
+        counts = [c for c in counts if c > 1] or counts
+        if not counts:
+            continue
+        mode = max(set(counts), key=counts.count)
+        score = (mode > 1, counts.count(mode), mode)
+        if best_score is None or score > best_score:
+            best_sep, best_score = sep, score
+    return best_sep
+
+def sniff_text_format(file, sample_size=SNIFF_BYTES):
+    """
+    CSV/TSV 앞부분(기본 64KB)만 읽어 인코딩과 구분자를 추정.
+    반환: {'encoding': ..., 'fallbacks': [...], 'sep': ..., 'sample': 디코딩된 앞부분} / 판별 불가 시 None
+    fallbacks: 앞부분은 똑같이 읽히는 다른 후보 인코딩 (뒷부분에서 디코딩이 깨지면 차례로 다시 시도)
+    """
+    file.seek(0)
+    head = file.read(sample_size)
+    file.seek(0)
+    if not head:
+        return None
+
+    encoding = _sniff_encoding(head)
+    if encoding is None:
+        return None
+    text = _decode_prefix(head, encoding)
+    if text is None:
+        return None
+    text = text.lstrip('\ufeff')
+    fallbacks = [enc for enc in ('utf-8', 'cp949') if enc != encoding and _decode_prefix(head, enc) is not None]
+    return {'encoding': encoding, 'fallbacks': fallbacks, 'sep': _sniff_separator(text), 'sample': text}
+
+def _with_encoding_fallback(fmt, read):
+    """
+    read() 가 디코딩 오류로 실패하면 fmt 의 다음 후보 인코딩으로 바꿔 다시 시도.
+    (앞 64KB 가 ASCII 뿐인 CP949 파일은 UTF-8 로 추정되므로, 뒤의 한글에서 깨지면 CP949 로 다시 읽음)
+    read 는 호출 시점의 fmt['encoding'] 을 사용해야 함.
+    """
+    while True:
+        try:
+            return read()
+        except UnicodeDecodeError:
+            if not fmt['fallbacks']:
+                raise
+            fmt['encoding'] = fmt['fallbacks'].pop(0)
+
+def log_notify(level, msg):
+    """기본 알림: 로그로 출력 (화면에서는 app.py가 st.error / st.warning 으로 바꿔서 넘김)"""
+    getattr(logger, level if level in ('error', 'warning') else 'info')(msg)
+
+# -----------------------------------------------------------
+# 매체별 소스 정의
+# match: 파일명 규칙 (위에서부터 먼저 맞는 것 사용)
+# csv_header / excel_header: 기본 헤더 행 위치 (앞부분에서 필수 컬럼 행을 찾으면 그 행 사용)
+# cost_col / label_col: 읽을 컬럼 (그 외 컬럼은 읽지 않음)
+# cost_mul: 비용 배수 (순서대로 곱함)
+# exclude: label_col 기준 제외할 행 (합계 등)
+# stream: 대용량 CSV/TSV는 chunk 단위로 읽어 바로 집계 (aggregate_csv_chunked)
+# -----------------------------------------------------------
+MEDIA_SOURCES = [
+    {'key': 'naver', 'match': 'result', 'media': '네이버', 'csv_header': 0, 'excel_header': 0,
+     'cost_col': '총 비용', 'label_col': '캠페인 이름', 'cost_mul': ()},
+    {'key': 'kakao', 'match': '메리츠화재다이렉트', 'media': '카카오', 'csv_header': 0, 'excel_header': 0,
+     'cost_col': '비용', 'label_col': '캠페인', 'cost_mul': (1.1,), 'stream': True},
+    {'key': 'toss', 'match': '메리츠 화재', 'media': '토스', 'csv_header': 3, 'excel_header': 3,
+     'cost_col': '소진 비용', 'label_col': '캠페인 명', 'cost_mul': (1.1,),
+     'exclude': '합계|Total'},
+    {'key': 'google', 'match': '캠페인 보고서', 'media': '구글', 'csv_header': 2, 'excel_header': 0,
+     'cost_col': '비용', 'label_col': '캠페인', 'cost_mul': (1.1, 1.15),
+     'exclude': '합계|Total|--', 'dropna_label': True, 'cost_optional': True, 'stream': True},
+    {'key': 'plab', 'match': 'Performance Lab', 'media': None, 'csv_header': None, 'excel_header': 0,
+     'columns': lambda c: c in ('account', '구분') or 'METIS' in c, 'required': ['구분']},
+]
+
+# 일자 컬럼 (있으면 같이 읽어 기간이 겹치는 리포트의 중복 행 판별에 사용, 없어도 됨)
+DAY_COLUMNS = ('일자', '날짜', '일별', '일', 'Date', 'Day', 'date')
+
+def find_media_source(filename):
+    """파일명 규칙으로 소스 정의 찾기 (없으면 None)"""
+    return next((src for src in MEDIA_SOURCES if src['match'] in filename), None)
+
+def _source_usecols(source):
+    """read_csv / read_excel / XML 파서 공용 usecols (컬럼명 앞뒤 공백 무시)"""
+    columns = source.get('columns')
+    if callable(columns):
+        return lambda c: columns(str(c).strip()) or str(c).strip() in DAY_COLUMNS
+    wanted = set(columns or [source['cost_col'], source['label_col']]) | set(DAY_COLUMNS)
+    return lambda c: str(c).strip() in wanted
+
+def _has_required(df, source):
+    required = source.get('required', [source.get('cost_col')])
+    names = {str(c).strip() for c in df.columns}
+    return all(col in names for col in required)
+
+def _read_projected(read, source):
+    """필요한 컬럼만 읽고, 헤더 위치가 달라 필수 컬럼을 못 찾으면 전체 컬럼으로 다시 읽음"""
+    if source is None:
+        return read()
+    df = read(usecols=_source_usecols(source))
+    if df is not None and not _has_required(df, source):
+        df = read()
+    return df
+
+HEADER_SCAN_ROWS = 15
+
+def _find_header_index(rows, source):
+    """앞부분 행 중 필수 컬럼이 모두 있는 첫 행 번호 (없으면 None)"""
+    required = source.get('required') or [source['cost_col']]
+    for idx, row in enumerate(rows):
+        names = {str(x).strip() for x in row if x is not None}
+        if all(col in names for col in required):
+            return idx
+    return None
+
+def detect_csv_header(fmt, source, default=0):
+    """
+    디코딩된 앞부분 텍스트에서 헤더 행 찾기.
+    pandas header 인자와 같게 빈 줄은 세지 않음.
+    """
+    if source is None:
+        return default
+    lines = fmt['sample'].splitlines()[:HEADER_SCAN_ROWS * 2]
+    rows = [r for r in csv.reader(lines, delimiter=fmt['sep']) if r][:HEADER_SCAN_ROWS]
+    idx = _find_header_index(rows, source)
+    return default if idx is None else idx
+
+def detect_excel_header(read_raw, source, default=0):
+    """read_raw(nrows)로 헤더 없이 앞부분만 읽어 헤더 행 찾기 (실패 시 default)"""
+    if source is None:
+        return default
+    raw = read_raw(HEADER_SCAN_ROWS)
+    if raw is None:
+        return default
+    idx = _find_header_index(raw.itertuples(index=False), source)
+    return default if idx is None else idx
+
+def load_file_by_rule(file, notify=log_notify, source=None):
+    """
+    파일명 기반 맞춤형 읽기 로직.
+    소스 정의(MEDIA_SOURCES)에 맞는 파일은 필요한 컬럼만 읽음.
+    성능 기록 시 path 에 성공한 읽기 경로 (excel:openpyxl / excel:xml_fallback / csv:projected ...) 를 남김.
+    """
+    if source is None:
+        source = find_media_source(file.name)
+    with perf_trace.stage('load_file_by_rule', file=file.name, source=source['key'] if source else None) as info:
+        df = _load_file_by_rule(file, notify, source, info)
+        info['rows'] = len(df) if df is not None else None
+        return df
+
+def _load_file_by_rule(file, notify, source, info):
+    name = file.name
+    file.seek(0)
+
+    def _read_excel(header=0, **kw):
+        file.seek(0)
+        return pd.read_excel(file, engine='openpyxl', header=header, **kw)
+
+    def _read_csv(**kw):
+        def read():
+            file.seek(0)
+            return pd.read_csv(file, encoding=fmt['encoding'], sep=fmt['sep'], on_bad_lines='skip', **kw)
+        return _with_encoding_fallback(fmt, read)
+    
+    # -------------------------------------------------------
+    # 1. 엑셀 파일 (.xlsx, .xls) 처리
+    #    앞부분 몇 행으로 헤더 위치를 먼저 찾고 본 파싱은 한 번만
+    # -------------------------------------------------------
+    if name.endswith(('.xlsx', '.xls')):
+        default = source['excel_header'] if source else 0
+
+        # [규칙 A] openpyxl (토스 Header=3 등은 헤더 탐지로 처리)
+        try:
+            with perf_trace.stage('detect_header', file=name, path='openpyxl') as h:
+                header = h['header'] = detect_excel_header(lambda n: _read_excel(None, nrows=n), source, default)
+            info['path'] = 'excel:openpyxl'
+            return _read_projected(lambda **kw: _read_excel(header, **kw), source)
+        except Exception:
+            # [규칙 B] 실패 시 XML 강제 파싱 (스타일 에러 해결)
+            with perf_trace.stage('detect_header', file=name, path='xml_fallback') as h:
+                header = h['header'] = detect_excel_header(lambda n: load_excel_xml_fallback(file, nrows=n, header=None), source, default)
+            with perf_trace.stage('load_excel_xml_fallback', file=name) as x:
+                df_force = _read_projected(lambda **kw: load_excel_xml_fallback(file, header=header, **kw), source)
+                x['rows'] = len(df_force) if df_force is not None else None
+            if df_force is not None:
+                info['path'] = 'excel:xml_fallback'
+                return df_force
+            
+            # 그것도 안되면 CSV로 시도
+            try:
+                file.seek(0)
+                info['path'] = 'excel:csv'
+                return pd.read_csv(file, on_bad_lines='skip')
+            except:
+                info['path'] = 'failed'
+                notify('error', f"❌ 파일 읽기 실패 ({name}). 파일이 손상되었거나 암호가 걸려있을 수 있습니다.")
+                return None
+
+    # -------------------------------------------------------
+    # 2. CSV 파일 처리 (앞부분만 보고 인코딩/구분자/헤더 결정 → 한 번만 파싱)
+    # -------------------------------------------------------
+    with perf_trace.stage('sniff_text_format', file=name) as sn:
+        fmt = sniff_text_format(file)
+        if fmt is not None:
+            sn.update(encoding=fmt['encoding'], sep=fmt['sep'])
+    if fmt is None:
+        info['path'] = 'failed'
+        notify('error', f"❌ 파일 형식을 인식할 수 없습니다: {name}")
+        return None
+
+    # 파일명 규칙별 기본 헤더 위치 (구글 2 / 토스 3 / 그 외 0) → 실제 헤더 행 탐지
+    if source is not None and source['csv_header'] is not None:
+        with perf_trace.stage('detect_header', file=name, path='csv') as h:
+            header = h['header'] = detect_csv_header(fmt, source, source['csv_header'])
+        dtype = {source['label_col']: str} if source.get('label_col') else None
+        try:
+            df = _read_projected(lambda **kw: _read_csv(header=header, dtype=dtype, **kw), source)
+            info['path'] = 'csv:projected'
+            return df
+        except Exception:
+            pass
+
+    # 3. 공통 Fallback
+    try:
+        df = _read_csv()
+        if len(df.columns) > 1:
+            info['path'] = 'csv:generic'
+            return df
+    except Exception:
+        pass
+                
+    info['path'] = 'failed'
+    notify('error', f"❌ 파일 형식을 인식할 수 없습니다: {name}")
+    return None
+
+# -----------------------------------------------------------
+# 표준 중간 형식 (파일별 캠페인 단위 집계)
+# - source / file / 매체 / 상품 / campaign 은 category, Cost / 보장 은 float64
+# - source / 매체 / 상품 은 고정 범주 → 파일끼리 합쳐도 category 그대로 (object 로 풀리지 않음)
+# - file / campaign 은 파일마다 범주가 달라 concat_canonical 에서 합집합으로 맞춤
+# - 캐시/일괄 처리 결과에 이 형식으로 저장 (pyarrow 가 있으면 Parquet)
+# -----------------------------------------------------------
+CANONICAL_SOURCES = [src['key'] for src in MEDIA_SOURCES]
+CANONICAL_MEDIA = ['네이버', '카카오', '토스', '구글', '제휴', '기타']
+CANONICAL_PRODUCTS = ['보장분석', '상품']
+CANONICAL_COLUMNS = ['source', 'file', '매체', '상품', 'campaign', 'Cost', '보장']
+_FIXED_CATEGORIES = {'source': CANONICAL_SOURCES, '매체': CANONICAL_MEDIA, '상품': CANONICAL_PRODUCTS}
+
+ROW_COLUMNS = ['매체', '상품', 'campaign', 'Cost', '보장']
+
+def _day_label(value):
+    """일자 셀 값 1개 → 'YYYY-MM-DD' (엑셀 일련번호 포함, 날짜로 못 읽으면 원래 글자 / 빈 값은 None)"""
+    if isinstance(value, (datetime.date, pd.Timestamp)):
+        return value.strftime('%Y-%m-%d')
+    text = str(value).strip().rstrip('.')
+    if not text or text.lower() == 'nan':
+        return None
+    try:
+        number = float(text)
+    except ValueError:
+        number = None
+    if number is not None:
+        if 20000 <= number < 80000:  # 엑셀 일련번호 (XML 파서는 날짜 셀을 숫자 그대로 돌려줌)
+            return (datetime.date(1899, 12, 30) + datetime.timedelta(days=int(number))).strftime('%Y-%m-%d')
+        if not (len(text) == 8 and text.isdigit()):
+            return text
+    parsed = pd.to_datetime(text, errors='coerce')
+    return text if pd.isna(parsed) else parsed.strftime('%Y-%m-%d')
+
+def row_days(df):
+    """DAY_COLUMNS 중 처음 있는 컬럼 → 행별 일자 문자열 (빈 값은 NaN, 일자 컬럼이 없으면 None). 고유값만 변환"""
+    col = next((c for c in DAY_COLUMNS if c in df.columns), None)
+    if col is None:
+        return None
+    codes, uniques = pd.factorize(df[col])
+    labels = np.array([_day_label(v) for v in uniques] + [None], dtype=object)
+    return pd.Series(labels[codes], index=df.index, dtype=object)
+
+def canonical_row_table(media, product, campaign, cost, bojang, day=None):
+    """
+    행 단위 값(Series 또는 스칼라) → 행 단위 표 (집계 전, 매체/상품/campaign 은 category)
+    고정 매체 목록에 없는 매체 (PLAB_MEDIA_RULES 에 추가한 매체 등) 는 기타 — convert_to_stats 와 같은 규칙
+    day: row_days 결과 — 있으면 '일자' 컬럼 추가 (집계에는 쓰지 않고 중복 행 판별에만 사용)
+    """
+    n = len(product)
+    campaign = campaign.astype(object).where(campaign.notna(), '').astype(str)
+    media = pd.Categorical(np.broadcast_to(np.asarray(media, dtype=object), n), categories=CANONICAL_MEDIA)
+    rows = pd.DataFrame({
+        '매체': media.fillna('기타'),
+        '상품': pd.Categorical(np.asarray(product, dtype=object), categories=CANONICAL_PRODUCTS),
+        'campaign': pd.Categorical(campaign.to_numpy()),
+        'Cost': np.broadcast_to(np.asarray(cost, dtype='float64'), n),
+        '보장': np.broadcast_to(np.asarray(bojang, dtype='float64'), n),
+    })
+    if day is not None:
+        rows['일자'] = day.to_numpy(dtype=object)
+    return rows
+
+def group_canonical_rows(rows, source_key, filename):
+    """행 단위 표 → 캠페인 단위로 합친 표준 표"""
+    out = rows.groupby(['매체', '상품', 'campaign'], observed=True, sort=False)[['Cost', '보장']].sum().reset_index()
+    out.insert(0, 'file', pd.Categorical([filename] * len(out)))
+    out.insert(0, 'source', pd.Categorical([source_key] * len(out), categories=CANONICAL_SOURCES))
+    out['campaign'] = out['campaign'].cat.remove_unused_categories()
+    return out
+
+def make_canonical(source_key, filename, media, product, campaign, cost, bojang):
+    """행 단위 값(Series 또는 스칼라) → 캠페인 단위로 합친 표준 표"""
+    return group_canonical_rows(canonical_row_table(media, product, campaign, cost, bojang), source_key, filename)
+
+def empty_canonical():
+    return pd.DataFrame({
+        col: pd.Categorical([], categories=_FIXED_CATEGORIES.get(col, [])) if col not in ('Cost', '보장')
+        else np.empty(0, dtype='float64')
+        for col in CANONICAL_COLUMNS
+    })
+
+def concat_canonical(frames):
+    """표준 표 여러 개 → 하나 (file / campaign 범주는 합집합)"""
+    frames = [f for f in frames if f is not None and len(f)]
+    if not frames:
+        return empty_canonical()
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+    data = {}
+    for col in CANONICAL_COLUMNS:
+        parts = [f[col] for f in frames]
+        if col in _FIXED_CATEGORIES:
+            data[col] = pd.Categorical(pd.concat(parts, ignore_index=True), categories=_FIXED_CATEGORIES[col])
+        elif col in ('file', 'campaign'):
+            data[col] = union_categoricals(parts, ignore_order=True)
+        else:
+            data[col] = np.concatenate([p.to_numpy(dtype='float64') for p in parts])
+    return pd.DataFrame(data)
+
+def _regroup_canonical(frames):
+    """같은 파일의 부분 합계 여러 개 → 캠페인 단위로 다시 합산"""
+    merged = concat_canonical(frames)
+    keys = ['source', 'file', '매체', '상품', 'campaign']
+    out = merged.groupby(keys, observed=True, sort=False)[['Cost', '보장']].sum().reset_index()
+    out['campaign'] = out['campaign'].cat.remove_unused_categories()
+    return out
+
+def aggregate_canonical(canon):
+    """표준 표 → 매체/상품별 합계 (매체/상품은 일반 문자열 컬럼)"""
+    grouped = canon.groupby(['매체', '상품'], observed=True)[['Cost', '보장']].sum().reset_index()
+    grouped['매체'] = grouped['매체'].astype(object)
+    grouped['상품'] = grouped['상품'].astype(object)
+    return grouped
+
+# -----------------------------------------------------------
+# 중복 업로드 판별
+# 1) 내용 지문 (같은 리포트를 두 번 올린 경우)
+#    - 집계에 쓰는 정규화 값(일자/매체/상품/캠페인/비용/보장) 행 해시의 합 (mod 2^64, 해시 키 2개) + 행 수
+#      → 행 순서·파일 형식(xlsx/csv)·파일명과 무관, chunk 단위로 누적해도 같은 값 (파일당 문자열 1개만 보관)
+#    - 같은 소스 안에서 지문이 같은 파일은 먼저 반영된 파일만 사용
+# 2) 겹치는 행 (기간이 겹치는 리포트 두 개)
+#    - 일자 컬럼이 있는 행만: (일자, 매체, 상품, 캠페인, 비용, 보장) 행 해시 → 고유 해시별 행 수/값/표준 표 행 위치
+#    - 같은 소스의 앞 파일들에 이미 나온 행은 그 횟수까지만 제외
+#      (한 파일 안에서 같은 값이 반복되는 정상 행은 앞 파일보다 많이 나온 만큼 유지)
+#    - 일자가 없는 행은 보지 않음 (다른 날 리포트의 같은 값 행을 중복으로 오인하지 않도록)
+#    - 행 표 대신 고유 해시별 숫자 배열만 보관 (캐시/드롭 폴더 상태 크기 최소화)
+# -----------------------------------------------------------
+_DIGEST_KEYS = ('meritz-report-01', 'meritz-report-02')
+
+def _fingerprint_columns(rows):
+    return (['일자'] if '일자' in rows.columns else []) + ROW_COLUMNS
+
+class ContentDigest:
+    """행 단위 표(전체 또는 chunk) → 순서 무관 내용 지문"""
+
+    def __init__(self):
+        self.rows = 0
+        self._sums = [0] * len(_DIGEST_KEYS)
+
+    def update(self, rows):
+        keys = rows[_fingerprint_columns(rows)]
+        if keys.empty:
+            return self
+        self.rows += len(keys)
+        for i, hash_key in enumerate(_DIGEST_KEYS):
+            h = pd.util.hash_pandas_object(keys, index=False, hash_key=hash_key).to_numpy()
+            self._sums[i] = (self._sums[i] + int(h.sum(dtype=np.uint64))) % (1 << 64)
+        return self
+
+    def hexdigest(self):
+        return f"{self.rows}-" + "".join(f"{v:016x}" for v in self._sums)
+
+_OVERLAP_VALUES = ['매체', '상품', 'campaign', 'Cost', '보장']
+
+class RowOverlapIndex:
+    """
+    행 단위 표(전체 또는 chunk) → 일자 있는 행의 고유 해시별 (행 수, 값) 누적.
+    finish(표준 표) → {'fp', 'count', 'pos', 'cost', 'bojang'} 배열 dict (일자 있는 행이 없으면 None)
+    """
+
+    def __init__(self):
+        self._parts = []
+
+    def update(self, rows):
+        if '일자' not in rows.columns:
+            return self
+        dated = rows[rows['일자'].notna()]
+        if dated.empty:
+            return self
+        fp = pd.util.hash_pandas_object(dated[_fingerprint_columns(dated)], index=False).to_numpy()
+        uniq, first, count = np.unique(fp, return_index=True, return_counts=True)
+        part = dated.iloc[first][_OVERLAP_VALUES].reset_index(drop=True)
+        part.insert(0, 'count', count)
+        part.insert(0, 'fp', uniq)
+        self._parts.append(part)
+        if len(self._parts) >= 32:
+            self._parts = [self._combined()]
+        return self
+
+    def _combined(self):
+        merged = pd.concat(self._parts, ignore_index=True)
+        if len(self._parts) == 1:
+            return merged
+        counts = merged.groupby('fp', sort=True)['count'].sum()
+        merged = merged.drop_duplicates('fp').set_index('fp').loc[counts.index]
+        merged['count'] = counts
+        return merged.reset_index()
+
+    def finish(self, canonical):
+        if not self._parts:
+            return None
+        merged = self._combined()
+        keys = ['매체', '상품', 'campaign']
+        pos = pd.MultiIndex.from_frame(canonical[keys].astype(object)).get_indexer(
+            pd.MultiIndex.from_frame(merged[keys].astype(object)))
+        return {'fp': merged['fp'].to_numpy(dtype=np.uint64), 'count': merged['count'].to_numpy(dtype=np.int32),
+                'pos': pos.astype(np.int32), 'cost': merged['Cost'].to_numpy(dtype='float64'),
+                'bojang': merged['보장'].to_numpy(dtype='float64')}
+
+def save_canonical(df, path):
+    """
+    표준 표 저장: pyarrow 가 있으면 Parquet, 없으면 같은 이름의 .pkl.
+    반환: 실제 저장 경로
+    """
+    if importlib.util.find_spec('pyarrow') is None:
+        path = os.path.splitext(path)[0] + '.pkl'
+        df.to_pickle(path)
+        return path
+    df.to_parquet(path, index=False)
+    return path
+
+def restore_canonical(df):
+    """저장/DB 에서 읽은 표 (문자열 컬럼) → 표준 표 dtype (고정 범주는 다시 맞춤)"""
+    for col, categories in _FIXED_CATEGORIES.items():
+        df[col] = pd.Categorical(df[col].astype(object), categories=categories)
+    for col in ('file', 'campaign'):
+        if not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    for col in ('Cost', '보장'):
+        df[col] = df[col].astype('float64')
+    return df[CANONICAL_COLUMNS]
+
+def load_canonical(path):
+    """save_canonical 로 저장한 표 (.parquet / .pkl) — 고정 범주는 다시 맞춤"""
+    return restore_canonical(pd.read_parquet(path) if path.endswith('.parquet') else pd.read_pickle(path))
+
+def _cost_source_rows(source, df):
+    """비용 매체 공통: 제외 행 필터 → 비용 파싱 × 배수 → 행 단위 표"""
+    cost_col, label_col = source['cost_col'], source['label_col']
+
+    if source.get('exclude') and label_col in df.columns:
+        df = df[~df[label_col].astype(str).str.contains(source['exclude'], case=False, na=False)]
+        if source.get('dropna_label'):
+            df = df[df[label_col].notna()]
+
+    if cost_col in df.columns:
+        cost = clean_currency_series(df[cost_col])
+    elif source.get('cost_optional'):
+        cost = 0
+    elif source['key'] == 'toss':
+        return None # 토스: '소진 비용' 없음 경고
+    else:
+        raise KeyError(cost_col)
+
+    for mul in source['cost_mul']:
+        cost = cost * mul
+
+    label = df[label_col]
+    return canonical_row_table(source['media'], classify_product_series(label), label, cost, 0.0, row_days(df))
+
+def _plab_rows(df):
+    """피랩: METIS 전송 - 실패 - 재인입 = 보장 건수"""
+    # 유연한 컬럼 찾기
+    send_col = next((c for c in df.columns if 'METIS전송' in c and '율' not in c), None)
+    fail_col = next((c for c in df.columns if 'METIS실패' in c), None)
+    re_col = next((c for c in df.columns if 'METIS재인입' in c), None)
+    
+    if send_col:
+        s = clean_currency_series(df[send_col])
+        f = clean_currency_series(df[fail_col]) if fail_col else 0
+        r = clean_currency_series(df[re_col]) if re_col else 0
+        bojang = s - f - r
+    else:
+        bojang = 0.0
+
+    return canonical_row_table(classify_media_plab(df), classify_product_series(df['구분']), df['구분'], 0.0, bojang,
+                               row_days(df))
+
+def canonical_media_rows(filename, df, source=None):
+    """파일 1개 → 행 단위 표 (집계 전, 소스를 알 수 없으면 None)"""
+    if source is None:
+        source = find_media_source(filename)
+    if source is None:
+        return None
+    with perf_trace.stage('aggregate', file=filename, source=source['key'], rows=len(df)):
+        return _plab_rows(df) if source['key'] == 'plab' else _cost_source_rows(source, df)
+
+def canonical_media_file(filename, df, source=None):
+    """파일 1개 → 표준 표 (소스를 알 수 없으면 None)"""
+    if source is None:
+        source = find_media_source(filename)
+    rows = canonical_media_rows(filename, df, source=source)
+    return group_canonical_rows(rows, source['key'], filename) if rows is not None else None
+
+def aggregate_media_file(filename, df, source=None):
+    """파일 1개를 매체/상품별로 집계 (소스를 알 수 없으면 None)"""
+    canon = canonical_media_file(filename, df, source=source)
+    return aggregate_canonical(canon) if canon is not None else None
+
+STREAM_CHUNK_ROWS = 200_000
+STREAM_MIN_BYTES = 8 * 1024 * 1024
+
+def _file_size(file):
+    size = getattr(file, 'size', None)
+    if size is None:
+        file.seek(0, os.SEEK_END)
+        size = file.tell()
+        file.seek(0)
+    return size
+
+def aggregate_csv_chunked(file, source, chunksize=STREAM_CHUNK_ROWS):
+    """
+    대용량 CSV/TSV를 chunk 단위로 읽으면서 같은 필터/비용 파싱을 거쳐 부분 합계(표준 표)와 내용 지문만 누적.
+    파일 크기와 무관하게 메모리는 chunk 1개 수준으로 유지됨.
+    반환: (표준 표, 내용 지문 ContentDigest, 겹치는 행 판별용 배열) / 헤더 위치가 달라 필수 컬럼을 못 찾으면 None (→ 일반 경로로 처리).
+    """
+    with perf_trace.stage('aggregate_csv_chunked', file=file.name, source=source['key'], rows=0) as info:
+        fmt = sniff_text_format(file)
+        if fmt is None or source.get('csv_header') is None:
+            return None
+
+        header = detect_csv_header(fmt, source, source['csv_header'])
+        # 뒷부분에서 디코딩이 깨지면 다음 후보 인코딩으로 처음부터 다시 집계
+        return _with_encoding_fallback(fmt, lambda: _aggregate_chunks(file, source, fmt, header, chunksize, info))
+
+def _aggregate_chunks(file, source, fmt, header, chunksize, info):
+    info.update(encoding=fmt['encoding'], sep=fmt['sep'], header=header, rows=0, chunks=0)
+    file.seek(0)
+    reader = pd.read_csv(
+        file, encoding=fmt['encoding'], sep=fmt['sep'], header=header,
+        usecols=_source_usecols(source), dtype={source['label_col']: str},
+        on_bad_lines='skip', chunksize=chunksize,
+    )
+    partials = []
+    digest, overlap = ContentDigest(), RowOverlapIndex()
+    with reader:
+        for chunk in reader:
+            chunk.columns = chunk.columns.astype(str).str.strip()
+            if not partials and not _has_required(chunk, source):
+                return None
+            rows = _cost_source_rows(source, chunk)
+            digest.update(rows)
+            overlap.update(rows)
+            partials.append(group_canonical_rows(rows, source['key'], file.name))
+            info['rows'] += len(chunk)
+            info['chunks'] += 1
+            # 부분 합계도 주기적으로 합쳐서 목록이 커지지 않도록
+            if len(partials) >= 32:
+                partials = [_regroup_canonical(partials)]
+
+    if not partials:
+        return None
+    canonical = _regroup_canonical(partials)
+    return canonical, digest, overlap.finish(canonical)
+
+def _use_streaming(file, source):
+    return (
+        source is not None and source.get('stream')
+        and not file.name.endswith(('.xlsx', '.xls'))
+        and _file_size(file) >= STREAM_MIN_BYTES
+    )
+
+def _cached(cache, kind, digest, name, compute):
+    """캐시가 있으면 (내용 해시 + 파일명) 키로 조회/저장"""
+    if cache is None:
+        return compute()
+    return cache.get_or_compute(cache.make_key(kind, digest, name), compute)
+
+def _load_frame(file, cache, digest, notify=log_notify, source=None):
+    df = _cached(cache, 'frame', digest, file.name, lambda: load_file_by_rule(file, notify=notify, source=source))
+    if df is not None:
+        # 컬럼 공백 제거
+        df.columns = df.columns.astype(str).str.strip()
+    return df
+
+def open_export_file(path):
+    """
+    디스크 파일 → 업로드 파일과 같은 모양의 파일 객체 (CLI/배치용).
+    name 은 파일명만 남김 (파일명 규칙이 폴더 경로에 걸리지 않도록).
+    """
+    raw = io.FileIO(path, 'r')
+    raw.name = os.path.basename(path)
+    return io.BufferedReader(raw)
+
+# --- ZIP 업로드 (매체 리포트 여러 개를 압축 1개로) ---
+ZIP_MEMBER_EXTENSIONS = ('.csv', '.tsv', '.txt', '.xlsx', '.xls')
+ZIP_UTF8_FLAG = 0x800
+
+def _zip_member_name(info):
+    """
+    압축 안 경로 → 파일명만.
+    한글 윈도우 압축은 UTF-8 표시가 없어 cp437 로 읽힌 이름을 cp949 로 복원 (파일명 규칙 인식용).
+    """
+    name = info.filename
+    if not info.flag_bits & ZIP_UTF8_FLAG:
+        try:
+            name = name.encode('cp437').decode('cp949')
+        except UnicodeError:
+            pass
+    return name.replace('\\', '/').rsplit('/', 1)[-1]
+
+class _SpooledMember(tempfile.SpooledTemporaryFile):
+    """업로드 파일처럼 name / size 를 붙일 수 있는 SpooledTemporaryFile"""
+    name = None
+
+
+class ZipMember:
+    """
+    ZIP 안의 리포트 파일 1개. open() 은 작업 스레드에서 호출.
+    작은 파일은 메모리로 압축 해제, 대용량 텍스트는 한 번만 풀어 임시 파일(STREAM_MIN_BYTES 초과분은 디스크)로 옮김
+    → 해시/인코딩 판별/헤더 탐지/집계의 seek(0) 마다 처음부터 다시 압축을 풀지 않음.
+    """
+
+    def __init__(self, archive, info, name):
+        self.archive = archive
+        self.info = info
+        self.name = name
+        self.size = info.file_size
+
+    def open(self):
+        if self.name.lower().endswith(('.csv', '.tsv', '.txt')) and self.size >= STREAM_MIN_BYTES:
+            f = _SpooledMember(max_size=STREAM_MIN_BYTES)
+            try:
+                with self.archive.open(self.info) as src:
+                    shutil.copyfileobj(src, f, 1 << 20)
+            except BaseException:
+                f.close()
+                raise
+            f.seek(0)
+        else:
+            f = io.BytesIO(self.archive.read(self.info))
+        f.name = self.name
+        f.size = self.size
+        return f
+
+def expand_zip_uploads(files, archives, notify=log_notify):
+    """
+    업로드 목록의 ZIP 파일 → 안의 리포트 파일(ZipMember) 목록으로 펼침 (그 외 파일은 그대로).
+    연 ZIP 은 archives(ExitStack)에 등록 → 호출 측이 처리를 마친 뒤 닫음
+    """
+    expanded = []
+    for f in files:
+        if not f.name.lower().endswith('.zip'):
+            expanded.append(f)
+            continue
+        try:
+            f.seek(0)
+            archive = archives.enter_context(zipfile.ZipFile(f))
+        except (zipfile.BadZipFile, OSError) as e:
+            notify('error', f"❌ ZIP 파일을 열 수 없습니다 ({f.name}): {e}")
+            continue
+        members = []
+        for info in archive.infolist():
+            name = _zip_member_name(info)
+            if info.is_dir() or info.filename.startswith('__MACOSX/') or name.startswith(('.', '~$')):
+                continue
+            if name.lower().endswith(ZIP_MEMBER_EXTENSIONS):
+                members.append(ZipMember(archive, info, name))
+        if not members:
+            notify('warning', f"⚠️ ZIP 파일에 리포트 파일이 없습니다: {f.name}")
+        expanded.extend(members)
+    return expanded
+
+def _ingest_upload(item, cache):
+    """업로드 파일 또는 ZIP 안 파일 1개 → ingest_file 결과"""
+    if not isinstance(item, ZipMember):
+        return ingest_file(item, cache)
+    try:
+        f = item.open()
+    except (RuntimeError, NotImplementedError, zipfile.BadZipFile, OSError) as e:  # 암호/미지원 압축 방식 등
+        return {'name': item.name, 'source': None, 'toss': False, 'canonical': None, 'digest': None, 'row_count': 0,
+                'overlap': None, 'toss_messages': [],
+                'messages': [('error', f"❌ ZIP 압축 해제 실패 ({item.name}): {e}")]}
+    with f:
+        return ingest_file(f, cache)
+
+def ingest_file(file, cache=None):
+    """
+    파일 1개 읽기 + 집계 → 결과 dict ('canonical': 표준 표, 'digest': 내용 지문, 'row_count': 행 수,
+    'overlap': 겹치는 행 판별용 배열 (일자 컬럼이 없으면 None) — 읽지 못하면 canonical/digest 는 None).
+    화면 출력 없이 메시지를 결과에 담아 반환하므로 작업 스레드에서 호출 가능.
+    토스 파일은 미리 집계해 두고, 어떤 파일을 쓸지는 process_marketing_data에서 결정.
+    """
+    source = find_media_source(file.name)
+    with perf_trace.stage('ingest_file', file=file.name, source=source['key'] if source else None) as info:
+        return _ingest_file(file, cache, source, info)
+
+def _ingest_file(file, cache, source, info):
+    filename = file.name
+    result = {'name': filename, 'source': source['key'] if source else None,
+              'toss': source is not None and source['key'] == 'toss', 'canonical': None, 'digest': None,
+              'row_count': 0, 'overlap': None, 'messages': [], 'toss_messages': []}
+    notify = lambda level, msg: result['messages'].append((level, msg))
+    digest = file_digest(file) if cache is not None else None
+    kind = 'toss' if result['toss'] else 'canon'
+
+    def keep(canonical, content, overlap):
+        value = {'canonical': canonical, 'digest': content.hexdigest(), 'row_count': content.rows, 'overlap': overlap}
+        result.update(value)
+        if cache is not None:
+            cache.put(cache.make_key(kind, digest, filename), value)
+
+    if cache is not None:
+        hit = cache.get(cache.make_key(kind, digest, filename))
+        if hit is not None:
+            result.update(hit)
+            info['path'] = 'cache'
+            return result
+
+    if _use_streaming(file, source):
+        try:
+            streamed = aggregate_csv_chunked(file, source)
+        except Exception:
+            streamed = None # 일반 경로에서 다시 시도 (오류 메시지도 그쪽에서)
+        if streamed is not None:
+            info['path'] = 'stream'
+            keep(*streamed)
+            return result
+
+    info['path'] = 'load'
+    df = _load_frame(file, cache, digest, notify=notify, source=source)
+    if df is None:
+        result['toss'] = False
+        return result
+
+    try:
+        rows = canonical_media_rows(filename, df, source=source)
+        if result['toss'] and rows is None:
+            result['toss_messages'].append(('warning', f"⚠️ 토스 파일에 '소진 비용' 컬럼이 없습니다: {filename}"))
+    except Exception as e:
+        if result['toss']:
+            result['toss_messages'].append(('error', f"❌ 토스 파일 처리 오류 ({filename}): {e}"))
+        else:
+            notify('error', f"❌ 데이터 파싱 중 오류 ({filename}): {e}")
+        return result
+
+    if rows is not None:
+        canonical = group_canonical_rows(rows, source['key'], filename)
+        keep(canonical, ContentDigest().update(rows), RowOverlapIndex().update(rows).finish(canonical))
+    return result
+
+def process_marketing_data(uploaded_files, cache=None, max_workers=None, notify=log_notify, preloaded=None,
+                           removed=None):
+    """
+    파일명 기반 통합 로직 (ZIP 업로드는 안의 파일별로 같은 규칙 적용).
+    cache(ParseCache)를 넘기면 파일 내용 해시 기준으로 읽기/집계 결과를 재사용함.
+    max_workers: 동시 처리 파일 수 (None → 파일 수/CPU 수 기준 자동, 1 → 순차 처리)
+    notify(level, msg): 오류/경고 출력 (업로드 순서대로 호출)
+    preloaded: 이미 처리된 ingest_file 결과 목록 (드롭 폴더 등) — 업로드 파일보다 앞에 병합
+    removed: 리스트를 넘기면 중복 파일로 제외한 내역을 추가 (select_canonical 참고)
+    """
+    uploaded_files = list(uploaded_files)
+    with perf_trace.stage('process_marketing_data', files=len(uploaded_files)) as info, \
+            contextlib.ExitStack() as archives:
+        canon = _ingest_canonical(uploaded_files, archives, cache, max_workers, notify, preloaded, removed)
+        final_df = final_from_canonical(canon)
+        info['rows'] = len(final_df) if final_df is not None else None
+        return final_df
+
+def ingest_canonical(uploaded_files, cache=None, max_workers=None, notify=log_notify, preloaded=None, removed=None):
+    """process_marketing_data 와 같은 처리 — 통합 표 대신 병합 대상 표준 표 반환 (팀 공유 집계 게시용)"""
+    uploaded_files = list(uploaded_files)
+    with perf_trace.stage('process_marketing_data', files=len(uploaded_files)) as info, \
+            contextlib.ExitStack() as archives:
+        canon = _ingest_canonical(uploaded_files, archives, cache, max_workers, notify, preloaded, removed)
+        info['rows'] = len(canon) if canon is not None else None
+        return canon
+
+def _ingest_canonical(uploaded_files, archives, cache, max_workers, notify, preloaded, removed):
+    # ZIP 은 안의 파일 단위로 펼쳐서 일반 업로드 파일과 같이 병렬 처리 (ZIP 은 모두 읽은 뒤 ingest_canonical 에서 닫음)
+    uploaded_files = expand_zip_uploads(uploaded_files, archives, notify)
+    if not uploaded_files:
+        return select_canonical(preloaded or [], notify, removed)
+    if max_workers is None:
+        max_workers = min(len(uploaded_files), os.cpu_count() or 4)
+
+    if max_workers > 1:
+        # 작업 스레드에서도 같은 성능 기록에 남도록 파일마다 컨텍스트 복사
+        tasks = [perf_trace.bind(_ingest_upload) for _ in uploaded_files]
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(lambda task, f: task(f, cache), tasks, uploaded_files))
+    else:
+        results = [_ingest_upload(f, cache) for f in uploaded_files]
+    return select_canonical(list(preloaded or []) + results, notify, removed)
+
+def merge_ingest_results(results, notify=log_notify, removed=None):
+    """
+    ingest_file 결과 목록 → 매체×상품 통합 표 (결과가 없으면 None).
+    토스는 '통합' 파일이 있으면 그 파일만 사용.
+    """
+    return final_from_canonical(select_canonical(results, notify, removed))
+
+def _report_removed(entry, notify, removed):
+    notify('warning', f"⚠️ {entry['구분']} 제외 ({entry['파일']} = {entry['같은 내용']}): {entry['행']:,}행 "
+                      f"(비용 {entry['비용']:,.0f} / 보장 {entry['보장']:,.0f})")
+    if removed is not None:
+        removed.append(entry)
+
+def _drop_duplicate_file(item, seen, notify, removed):
+    """같은 소스에 내용 지문이 같은 파일이 이미 반영됐으면 None, 아니면 표준 표"""
+    digest = item.get('digest')
+    if digest is None or not item.get('row_count'):
+        return item['canonical']
+    first = seen.get((item['source'], digest))
+    if first is None:
+        seen[(item['source'], digest)] = item['name']
+        return item['canonical']
+
+    canon = item['canonical']
+    _report_removed({'파일': item['name'], '소스': item['source'], '구분': '중복 파일', '같은 내용': first,
+                     '행': item['row_count'], '비용': float(canon['Cost'].sum()), '보장': float(canon['보장'].sum())},
+                    notify, removed)
+    return None
+
+def _drop_overlapping_rows(item, canon, index, notify, removed):
+    """
+    같은 소스의 앞 파일들에 이미 나온 (일자 있는) 행을 그 횟수까지 표준 표에서 뺌.
+    index: 소스별 {해시: 행 수 최댓값, 처음 나온 파일} 표 (여기서 갱신)
+    """
+    overlap = item.get('overlap')
+    if overlap is None:
+        return canon
+    fresh = pd.DataFrame({'count': overlap['count'], 'file': item['name']}, index=pd.Index(overlap['fp']))
+    prev = index.get(item['source'])
+    if prev is None:
+        index[item['source']] = fresh
+        return canon
+    index[item['source']] = (pd.concat([prev, fresh])
+                             .groupby(level=0, sort=False).agg(count=('count', 'max'), file=('file', 'first')))
+
+    seen = prev.reindex(fresh.index)
+    drop = np.minimum(overlap['count'], seen['count'].fillna(0).to_numpy(dtype=np.int64))
+    hit = np.flatnonzero(drop)
+    if not len(hit):
+        return canon
+
+    cost, bojang = drop[hit] * overlap['cost'][hit], drop[hit] * overlap['bojang'][hit]
+    canon = canon.copy()
+    for col, values in (('Cost', cost), ('보장', bojang)):
+        column = canon[col].to_numpy(dtype='float64', copy=True)
+        np.subtract.at(column, overlap['pos'][hit], values)
+        canon[col] = column
+    # 행이 모두 빠진 캠페인은 표에서도 제외
+    touched = np.zeros(len(canon), dtype=bool)
+    touched[overlap['pos'][hit]] = True
+    emptied = touched & np.isclose(canon['Cost'], 0.0) & np.isclose(canon['보장'], 0.0)
+    canon = canon[~emptied].reset_index(drop=True)
+
+    _report_removed({'파일': item['name'], '소스': item['source'], '구분': '겹치는 행',
+                     '같은 내용': ', '.join(dict.fromkeys(seen['file'].iloc[hit])), '행': int(drop[hit].sum()),
+                     '비용': float(cost.sum()), '보장': float(bojang.sum())}, notify, removed)
+    return canon
+
+def select_canonical(results, notify=log_notify, removed=None):
+    """
+    ingest_file 결과 목록 → 병합 대상 파일들의 표준 표 (하나로 합침, 결과가 없으면 None).
+    같은 소스 안에서 앞 파일과 내용 지문이 같은 파일은 제외 (같은 리포트 재업로드, 형식/파일명만 다른 경우 포함),
+    일자 컬럼이 있는 파일은 앞 파일들과 겹치는 행만 제외 (기간이 겹치는 리포트).
+    removed: 리스트를 넘기면 제외 내역
+        {'파일', '소스', '구분': 중복 파일/겹치는 행, '같은 내용': 먼저 반영된 파일, '행', '비용', '보장'} 을 추가
+    """
+    # 업로드 순서대로 메시지 출력 / 결과 병합 (결과가 실행 순서와 무관하게 동일)
+    selected = []
+    toss_files = [] 
+    for result in results:
+        for level, msg in result['messages']:
+            notify(level, msg)
+        if result['toss']:
+            toss_files.append(result)
+        elif result['canonical'] is not None:
+            selected.append(result)
+
+    # [토스 파일 후처리]
+    if toss_files:
+        toss_total_file = next((item for item in toss_files if '통합' in item['name']), None)
+        target_toss_files = [toss_total_file] if toss_total_file else toss_files
+        
+        for item in target_toss_files:
+            for level, msg in item['toss_messages']:
+                notify(level, msg)
+            if item['canonical'] is not None:
+                selected.append(item)
+
+    seen, index = {}, {}
+    frames = []
+    for item in selected:
+        canon = _drop_duplicate_file(item, seen, notify, removed)
+        if canon is not None:
+            frames.append(_drop_overlapping_rows(item, canon, index, notify, removed))
+    if not frames:
+        return None
+    return concat_canonical(frames)
+
+def final_from_canonical(canon):
+    """표준 표 → 매체×상품 통합 표 (+ CPA)"""
+    if canon is None:
+        return None
+    # 표준 표는 category 라 합치기/집계가 가벼움
+    with perf_trace.stage('merge', rows=len(canon)):
+        final_df = aggregate_canonical(canon)
+        final_df['CPA'] = (final_df['Cost'] / final_df['보장'].where(final_df['보장'] > 0)).fillna(0)
+    return final_df
+
+STATS_MEDIA = ['네이버', '카카오', '토스', '구글', '제휴', '기타']
+STATS_PRODUCTS = ['보장분석', '상품']
+STATS_COLUMNS = ['Bojang_Cnt', 'Prod_Cnt', 'Cost', 'CPA']
+
+def convert_to_stats(final_df, manual_aff_cnt, manual_aff_cost, manual_da_cnt, manual_da_cost, override_manual=False):
+    """
+    통계 변환.
+    매체×상품 한 번의 groupby 후 고정 매체 목록으로 reindex → 수기 보정 → 매체별 표로 펼침.
+    (목록에 없는 매체는 기타, 보장분석 외 상품은 상품 건수로 집계)
+    수기 보정은 값이 0보다 클 때만 반영하고, 제휴는 데이터 대신 수기 값으로 통째로 바꿈.
+    override_manual=True: test_app(V18.35) 방식 — 부호와 관계없이 DA 추가분을 더하고,
+        제휴 보장 건수/비용만 수기 값으로 덮어씀 (데이터의 제휴 상품 건수는 유지)
+    res['media_product']: 매체×상품별 건수/비용 (스냅샷 저장용)
+    """
+    with perf_trace.stage('convert_to_stats', rows=len(final_df) if final_df is not None else 0):
+        return _convert_to_stats(final_df, manual_aff_cnt, manual_aff_cost, manual_da_cnt, manual_da_cost, override_manual)
+
+def _convert_to_stats(final_df, manual_aff_cnt, manual_aff_cost, manual_da_cnt, manual_da_cost, override_manual=False):
+    full_index = pd.MultiIndex.from_product([STATS_MEDIA, STATS_PRODUCTS], names=['매체', '상품'])
+    if final_df is not None and not final_df.empty:
+        mp = (
+            pd.DataFrame({
+                '매체': final_df['매체'].where(final_df['매체'].isin(STATS_MEDIA), '기타'),
+                '상품': np.where(final_df['상품'].eq('보장분석'), '보장분석', '상품'),
+                'Cnt': final_df['보장'].astype(float),
+                'Cost': final_df['Cost'].astype(float),
+            })
+            .groupby(['매체', '상품'])[['Cnt', 'Cost']].sum()
+            .reindex(full_index, fill_value=0.0)
+        )
+    else:
+        mp = pd.DataFrame(0.0, index=full_index, columns=['Cnt', 'Cost'])
+
+    # 수기 보정
+    if override_manual:
+        mp.loc[('기타', '상품')] += [manual_da_cnt, manual_da_cost]
+        mp.loc[('제휴', '보장분석')] = [manual_aff_cnt, manual_aff_cost]
+        mp.loc[('제휴', '상품'), 'Cost'] = 0.0
+    elif manual_da_cnt > 0 or manual_da_cost > 0:
+        mp.loc[('기타', '상품')] += [manual_da_cnt, manual_da_cost]
+
+    if not override_manual and (manual_aff_cnt > 0 or manual_aff_cost > 0):
+        mp.loc['제휴'] = 0.0
+        mp.loc[('제휴', '보장분석')] = [manual_aff_cnt, manual_aff_cost]
+
+    cnt = mp['Cnt'].unstack()
+    stats = pd.DataFrame({
+        'Bojang_Cnt': cnt['보장분석'],
+        'Prod_Cnt': cnt['상품'],
+        'Cost': mp['Cost'].groupby(level='매체').sum(),
+        'CPA': 0.0,
+    }).reindex(STATS_MEDIA)
+    stats.index.name = None
+
+    stats['Total_Cnt'] = stats['Bojang_Cnt'] + stats['Prod_Cnt']
+    stats['CPA'] = (stats['Cost'] / stats['Total_Cnt'].where(stats['Total_Cnt'] > 0)).fillna(0.0)
+
+    da = stats.drop('제휴').sum()
+    totals = stats.sum()
+    res = {
+        'da_cost': int(da['Cost']),
+        'da_cnt': int(da['Total_Cnt']),
+        'da_bojang': int(da['Bojang_Cnt']),
+        'da_prod': int(da['Prod_Cnt']),
+        'aff_cost': int(stats.loc['제휴', 'Cost']),
+        'aff_cnt': int(stats.loc['제휴', 'Total_Cnt']),
+        'bojang_cnt': int(totals['Bojang_Cnt']),
+        'prod_cnt': int(totals['Prod_Cnt']),
+        'media_stats': stats,
+        'media_product': mp.reset_index(),
+    }
+    
+    res['total_cost'] = res['da_cost'] + res['aff_cost']
+    res['total_cnt'] = res['da_cnt'] + res['aff_cnt']
+    res['ratio_ba'] = res['bojang_cnt'] / res['total_cnt'] if res['total_cnt'] > 0 else 0.898
+    
+    return res
+
+def snapshot_progress_by_hour(store, day):
+    """스냅샷 시간대(10:00 등) → 대시보드 시간 라벨(10시 등)별 총 건수 (09:30은 10시 칸)"""
+    if store is None:
+        return pd.Series(dtype=float)
+    try:
+        progress = store.day_progress(day)
+    except Exception:
+        return pd.Series(dtype=float)
+    if progress.empty:
+        return progress
+    labels = progress.index.str.replace(":00", "시").str.replace("09:30", "10시")
+    # 10시 칸은 09:30보다 10:00 값 우선 (시간 순서상 나중 값 유지)
+    return pd.Series(progress.to_numpy(), index=labels).groupby(level=0).last()
+
+def stats_from_snapshot(rows):
+    """
+    스냅샷 행(media/product/cnt/cost, 한 일자·시간대) → compute_stats 결과와 같은 모양.
+    수기 보정은 저장 시점에 이미 반영돼 있으므로 다시 더하지 않음.
+    """
+    final_df = pd.DataFrame({'매체': rows['media'].to_numpy(), '상품': rows['product'].to_numpy(),
+                             'Cost': rows['cost'].to_numpy(), '보장': rows['cnt'].to_numpy()})
+    return convert_to_stats(final_df, 0, 0, 0, 0)
+
+# -----------------------------------------------------------
+# 3. 보고 계산 (목표 / 마감 예상 / 보고 문구)
+# 화면 사이드바 입력값과 같은 키를 쓰는 dict 로 받음 (빠진 키는 기본값)
+# -----------------------------------------------------------
+REPORT_SLOTS = ["09:30", "10:00", "11:00", "12:00", "13:00", "14:00", "15:00", "16:00", "17:00", "18:00"]
+
+DEFAULT_PARAMS = {
+    'time': "14:00", 'day': '월', 'is_boosting': False,
+    'active_member': 359, 'target_bojang': 500, 'target_product': 3100,
+    'sa_est_bojang': 200, 'sa_est_prod': 800, 'da_add_target': 50,
+    'start_resource_10': 1100,
+    'manual_da_cnt': 0, 'manual_da_cost': 0, 'manual_aff_cost': 11270000, 'manual_aff_cpa': 14000,
+    'tom_member': 350, 'tom_dawn_ad': False,
+    'fixed_ad_type': "Both", 'fixed_content': "14시 카카오페이 TMS 발송 예정입니다",
+}
+
+DASHBOARD_HOURS = ["10시", "11시", "12시", "13시", "14시", "15시", "16시", "17시", "18시"]
+DASHBOARD_WEIGHTS = [0, 0.11, 0.18, 0.15, 0.11, 0.16, 0.10, 0.10, 0.09]
+
+def report_params(**overrides):
+    """기본값 + 변경값 (알 수 없는 키는 오류)"""
+    unknown = set(overrides) - set(DEFAULT_PARAMS)
+    if unknown:
+        raise KeyError(f"알 수 없는 보고 설정: {', '.join(sorted(unknown))}")
+    params = dict(DEFAULT_PARAMS)
+    params.update(overrides)
+    return params
+
+def manual_aff_count(params):
+    """제휴 소진액 / 단가 → 제휴 환산 건수"""
+    return int(params['manual_aff_cost'] / params['manual_aff_cpa']) if params['manual_aff_cpa'] > 0 else 0
+
+def compute_stats(final_df, params):
+    """convert_to_stats + 사이드바 수기 입력값"""
+    return convert_to_stats(final_df, manual_aff_count(params), params['manual_aff_cost'],
+                            params['manual_da_cnt'], params['manual_da_cost'])
+
+def compute_targets(params):
+    """DA 목표 (18시/17시, 인당 배분)"""
+    da_target_bojang = params['target_bojang'] - params['sa_est_bojang']
+    da_target_prod = params['target_product'] - params['sa_est_prod'] + params['da_add_target']
+    da_target_18 = da_target_bojang + da_target_prod
+    active_member = params['active_member']
+    targets = {
+        'da_target_bojang': da_target_bojang,
+        'da_target_prod': da_target_prod,
+        'da_target_18': da_target_18,
+        'target_ratio_ba': da_target_bojang / da_target_18 if da_target_18 > 0 else 0.898,
+        'da_target_17': int(da_target_18 * 0.96),
+        'da_per_18': 0.0,
+        'da_per_17': 0.0,
+    }
+    if active_member > 0:
+        targets['da_per_18'] = round(da_target_18 / active_member, 1)
+        targets['da_per_17'] = round(targets['da_target_17'] / active_member, 1)
+    return targets
+
+def hourly_goal(start_resource_10, da_target_18):
+    """10시 자원 → 18시 목표까지 시간대별 누적 목표 (DASHBOARD_HOURS 순서)"""
+    acc_res = [start_resource_10]
+    gap = da_target_18 - start_resource_10
+    total_w = sum(DASHBOARD_WEIGHTS)
+    for w in DASHBOARD_WEIGHTS[1:]:
+        acc_res.append(acc_res[-1] + round(gap * (w / total_w)))
+    acc_res[-1] = da_target_18
+    return acc_res
+
+def hourly_goal_table(acc_res, target_ratio_ba, actual_by_hour=None):
+    """시간대별 목표 표 (행: 누적/보장/상품 목표 + 스냅샷이 있으면 실제 실적, 열: DASHBOARD_HOURS)"""
+    table = pd.DataFrame({
+        '누적 목표': acc_res,
+        '보장 목표': [int(x * target_ratio_ba) for x in acc_res],
+        '상품 목표': [int(x * (1-target_ratio_ba)) for x in acc_res],
+    }, index=DASHBOARD_HOURS).T
+    if actual_by_hour is not None and not actual_by_hour.empty:
+        table.loc['실제 실적'] = actual_by_hour.reindex(DASHBOARD_HOURS).to_numpy()
+    return table
+
+def estimate_close(res, params, targets, pacing=None):
+    """
+    18시 마감 예상.
+    pacing(PacingModel)이 있고 해당 요일·시간대 학습 이력이 충분하면 학습 배수 사용, 아니면 기존 상수 배수.
+    14시 기준 예상은 어느 쪽이든 목표 ±250 보정 (학습 배수는 발송 시간 구분 없이 요일별로 학습되므로
+    발송 유무에 따른 차이는 이 보정 범위 안에서만 반영됨).
+    """
+    day, slot, is_boosting = params['day'], params['time'], params['is_boosting']
+    current_total = res['total_cnt']
+    da_target_18 = targets['da_target_18']
+
+    base_mul_14 = 1.35
+    if day == '월': base_mul_14 = 1.15
+    elif params['fixed_ad_type'] != "없음": base_mul_14 = 1.215
+
+    mul_14 = base_mul_14
+    mul_16 = 1.25 if is_boosting else 1.10
+
+    pace_14 = pacing.multiplier(day, "14:00") if pacing is not None and not is_boosting else None
+    est_18_from_14 = int(current_total * (pace_14['mul'] if pace_14 is not None else mul_14))
+    if est_18_from_14 > da_target_18 + 250: est_18_from_14 = da_target_18 + 150
+    elif est_18_from_14 < da_target_18 - 250: est_18_from_14 = da_target_18 - 150
+
+    est_ba_18_14 = int(est_18_from_14 * res['ratio_ba'])
+
+    time_multipliers = {
+        "09:30": 1.0, "10:00": 1.75, "11:00": 1.65, "12:00": 1.55, "13:00": 1.45,
+        "14:00": mul_14, "15:00": (mul_14 + mul_16)/2, "16:00": mul_16,
+        "17:00": 1.05 if not is_boosting else 1.15, "18:00": 1.0
+    }
+    current_mul = time_multipliers.get(slot, 1.35)
+    pace_live = pacing.predict(day, slot, current_total) if pacing is not None and not is_boosting else None
+    est_final_live = pace_live['est'] if pace_live is not None else int(current_total * current_mul)
+    est_ba_live = int(est_final_live * res['ratio_ba'])
+
+    return {
+        'est_18_from_14': est_18_from_14,
+        'est_ba_18_14': est_ba_18_14,
+        'est_prod_18_14': est_18_from_14 - est_ba_18_14,
+        'current_mul': current_mul,
+        'pace_live': pace_live,
+        'est_final_live': est_final_live,
+        'est_ba_live': est_ba_live,
+        'est_prod_live': est_final_live - est_ba_live,
+    }
+
+def cpa_summary(res):
+    """DA / 제휴 / 총합 가망 CPA (만원)"""
+    return {
+        'cpa_da': round(res['da_cost'] / res['da_cnt'] / 10000, 1) if res['da_cnt'] > 0 else 0,
+        'cpa_aff': round(res['aff_cost'] / res['aff_cnt'] / 10000, 1) if res['aff_cnt'] > 0 else 0,
+        'cpa_total': round(res['total_cost'] / res['total_cnt'] / 10000, 1) if res['total_cnt'] > 0 else 0,
+    }
+
+def build_report_texts(res, params, targets, est):
+    """09:30 / 14:00 / 16:00 / 18:00 보고 복사 텍스트"""
+    da_target_18 = targets['da_target_18']
+    da_target_17 = targets['da_target_17']
+    target_ratio_ba = targets['target_ratio_ba']
+    active_member = params['active_member']
+    current_total = res['total_cnt']
+    cost_total = res['total_cost']
+    cpa = cpa_summary(res)
+    cpa_total, cpa_da, cpa_aff = cpa['cpa_total'], cpa['cpa_da'], cpa['cpa_aff']
+    est_18_from_14 = est['est_18_from_14']
+    tom_member, tom_dawn_ad = params['tom_member'], params['tom_dawn_ad']
+
+    if params['fixed_ad_type'] != "없음":
+        fixed_content = params['fixed_content']
+        fixed_msg = f"금일 {fixed_content}." if fixed_content.strip() else "금일 특이사항 없이 운영 중이며,"
+    else:
+        fixed_msg = "금일 특이사항 없이 운영 중이며,"
+
+    msg_14 = "금일 고정구좌 이슈없이 집행중이며..." if est_18_from_14 >= da_target_18 else "오전 목표 대비 소폭 부족할 것으로 예상되나, 남은 시간 집중 관리하겠습니다."
+
+    report_morning = f"""금일 DA+제휴파트 예상마감 공유드립니다.
+
+[17시 기준]
+총 자원 : {da_target_17:,}건 ({active_member}명, {targets['da_per_17']:.1f}건 배정 기준)
+ㄴ 보장분석 : {int(da_target_17*target_ratio_ba):,}건
+ㄴ 상품 : {int(da_target_17*(1-target_ratio_ba)):,}건
+
+[18시 기준]
+총 자원 : {da_target_18:,}건 ({active_member}명, {targets['da_per_18']:.1f}건 배정 기준)
+ㄴ 보장분석 : {int(targets['da_target_bojang']):,}건
+ㄴ 상품 : {int(targets['da_target_prod']):,}건
+
+* {fixed_msg}"""
+
+    report_1400 = f"""DA파트 금일 14시간 현황 전달드립니다.
+
+금일 목표(18시 기준) : 인당배분 {targets['da_per_18']:.1f}건 / 총 {da_target_18:,}건
+현황(14시) : 인당배분 {round(current_total/active_member, 1) if active_member else 0:.1f}건 / 총 {current_total:,}건
+예상 마감(18시 기준) : 인당배분 {round(est_18_from_14/active_member, 1) if active_member else 0:.1f}건 / 총 {est_18_from_14:,}건
+ㄴ 보장분석 : {est['est_ba_18_14']:,}건, 상품 {est['est_prod_18_14']:,}건
+
+* {fixed_msg} {msg_14}
+
+[현재 성과 - 14시 기준]
+- 총합(DA/제휴): {int(cost_total)//10000:,}만원 / 가망CPA {cpa_total:.1f}만원
+- DA: {int(res['da_cost'])//10000:,}만원 / 가망CPA {cpa_da:.1f}만원
+- 제휴: {int(res['aff_cost'])//10000:,}만원 / 가망CPA {cpa_aff:.1f}만원
+
+[예상 마감 - 18시 기준]
+- 총합(DA/제휴): {int(cost_total * 1.35)//10000:,}만원 / 가망CPA {max(3.1, cpa_total-0.2):.1f}만원
+- DA: {int(res['da_cost'] * 1.4)//10000:,}만원 / 가망CPA {max(4.4, cpa_da):.1f}만원
+- 제휴: {int(res['aff_cost'] * 1.25)//10000:,}만원 / 가망CPA {max(2.4, cpa_aff-0.2):.1f}만원"""
+
+    report_1600 = f"""DA파트 금일 16시간 현황 전달드립니다.
+
+금일 목표(18시 기준) : 총 {da_target_18:,}건
+ㄴ 보장분석 : {targets['da_target_bojang']:,}건, 상품 {targets['da_target_prod']:,}건
+
+16시 현황 : 총 {current_total:,}건
+ㄴ 보장분석 : {int(res['bojang_cnt']):,}건, 상품 {int(res['prod_cnt']):,}건
+
+* 마감 전까지 배너광고 및 제휴 매체 최대한 활용하여 자원 확보하겠습니다."""
+
+    tom_base_total = int(tom_member * 3.15) + (300 if tom_dawn_ad else 0)
+    report_tomorrow = f"""DA+제휴 명일 오전 9시 예상 자원 공유드립니다.
+
+- 9시 예상 시작 자원 : {tom_base_total:,}건
+ㄴ 보장분석 : {int(tom_base_total * target_ratio_ba):,}건
+ㄴ 상품자원 : {int(tom_base_total * (1-target_ratio_ba)):,}건
+
+* 영업가족 {tom_member}명 기준 인당 {4.4 if not tom_dawn_ad else 5.0}건 이상 확보할 수 있도록 운영 예정입니다."""
+
+    return {"09:30": report_morning, "14:00": report_1400, "16:00": report_1600, "18:00": report_tomorrow}
+
+def build_report(res, params, pacing=None):
+    """
+    통계(compute_stats 결과) → 목표 / 마감 예상 / 보고 문구 한 번에.
+    반환: {'res', 'targets', 'estimate', 'cpa', 'texts'}
+    """
+    targets = compute_targets(params)
+    est = estimate_close(res, params, targets, pacing=pacing)
+    return {'res': res, 'targets': targets, 'estimate': est, 'cpa': cpa_summary(res),
+            'texts': build_report_texts(res, params, targets, est)}
+
+def media_stats_table(res):
+    """매체별 실적 표 (화면 표시와 같은 컬럼, 합계 행 포함)"""
+    stats = res['media_stats'].copy()
+    stats.loc['합계'] = stats.sum(numeric_only=True)
+    total_cnt = stats.loc['합계', 'Total_Cnt']
+    stats.loc['합계', 'CPA'] = stats.loc['합계', 'Cost'] / total_cnt if total_cnt > 0 else 0
+    stats = stats[['Total_Cnt', 'Prod_Cnt', 'Bojang_Cnt', 'Cost', 'CPA']]
+    stats.columns = ['토탈', '상품', '보장분석', '비용', 'CPA']
+    stats.index.name = '매체'
+    body = stats.drop('합계').sort_values('토탈', ascending=False)
+    return pd.concat([body, stats.loc[['합계']]])
@@ -0,0 +1,211 @@
+"""
+보고 엑셀 내보내기 (매체별 실적 / 시간대별 목표 / 보고 문구)
+
+하루 또는 여러 일자를 엑셀 파일 1개로 저장 (시트 3개, 일자 컬럼으로 구분).
+openpyxl write-only 모드로 일자별 행을 바로 써 내려가므로 일자 수와 무관하게 메모리는 일자 1개 분량.
+
+예)
+  python report_export.py --from 2026-10-01 --to 2026-10-31 --out 2026-10.xlsx   # 저장된 스냅샷 기준
+  python report_export.py --from 2026-10-16 --out day.xlsx --param active_member=340
+
+기간 내보내기는 스냅샷 저장소(SnapshotStore)의 일자·시간대별 실적으로 보고를 다시 계산:
+- 09:30 / 14:00 / 16:00 / 18:00 보고 문구 = 해당 시간대 스냅샷 기준 (스냅샷이 없는 보고는 생략)
+- 매체별 실적 = 그 일자의 마지막 시간대 스냅샷
+- 목표/보고 설정은 --param 값 (수기 보정은 스냅샷에 이미 반영)
+"""
+import argparse
+import datetime
+import logging
+import math
+import os
+import sys
+
+WEEKDAYS = ['월', '화', '수', '목', '금', '토', '일']
+REPORT_KEYS = ["09:30", "14:00", "16:00", "18:00"]
+
+SHEET_MEDIA = "매체별 실적"
+SHEET_GOAL = "시간대별 목표"
+SHEET_TEXT = "보고 문구"
+NUMBER_FORMAT = '#,##0'
+
+log = logging.getLogger("meritz_report.export")
+
+
+# -----------------------------------------------------------
+# 1. 일자별 내보내기 내용
+# {'day', 'slot': 기준 시간대, 'media_stats': media_stats_table, 'goal': hourly_goal_table, 'texts': {보고: 문구}}
+# -----------------------------------------------------------
+def day_section(day, res, params, targets=None, est=None, pacing=None, actual_by_hour=None):
+    """현재 계산 결과(화면/CLI) → 일자 1개 내보내기 내용"""
+    from report_core import (compute_targets, estimate_close, build_report_texts, hourly_goal,
+                             hourly_goal_table, media_stats_table)
+
+    targets = targets or compute_targets(params)
+    est = est or estimate_close(res, params, targets, pacing=pacing)
+    acc_res = hourly_goal(params['start_resource_10'], targets['da_target_18'])
+    return {
+        'day': day,
+        'slot': params['time'],
+        'media_stats': media_stats_table(res),
+        'goal': hourly_goal_table(acc_res, targets['target_ratio_ba'], actual_by_hour),
+        'texts': build_report_texts(res, params, targets, est),
+    }
+
+
+def _day_str(day):
+    return day.isoformat() if isinstance(day, (datetime.date, datetime.datetime)) else str(day)
+
+
+def snapshot_sections(store, start, end, params, pacing=None):
+    """
+    저장된 스냅샷 → 일자별 내보내기 내용 (제너레이터).
+    일자 1개씩 읽어 계산한 뒤 바로 넘기므로 기간이 길어도 메모리에 쌓이지 않음.
+    """
+    from report_core import (REPORT_SLOTS, build_report, compute_targets, hourly_goal, hourly_goal_table,
+                             media_stats_table, snapshot_progress_by_hour, stats_from_snapshot)
+
+    start, end = _day_str(start), _day_str(end)
+    targets = compute_targets(params)
+    acc_res = hourly_goal(params['start_resource_10'], targets['da_target_18'])
+    for day in store.days():
+        if not start <= day <= end:
+            continue
+        rows = store.load_day(day)
+        slots = sorted(set(rows['slot']), key=REPORT_SLOTS.index)
+        if not slots:
+            continue
+        weekday = WEEKDAYS[datetime.date.fromisoformat(day).weekday()]
+        by_slot = {slot: stats_from_snapshot(group) for slot, group in rows.groupby('slot')}
+
+        texts = {}
+        for key in REPORT_KEYS:
+            if key in by_slot:
+                texts[key] = build_report(by_slot[key], dict(params, day=weekday, time=key), pacing=pacing)['texts'][key]
+
+        last = slots[-1]
+        yield {
+            'day': day,
+            'slot': last,
+            'media_stats': media_stats_table(by_slot[last]),
+            'goal': hourly_goal_table(acc_res, targets['target_ratio_ba'], snapshot_progress_by_hour(store, day)),
+            'texts': texts,
+        }
+
+
+# -----------------------------------------------------------
+# 2. 엑셀 쓰기 (write-only)
+# -----------------------------------------------------------
+def _number(value):
+    """numpy 스칼라 → 파이썬 숫자 (빈 값은 None)"""
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def write_report_workbook(target, sections):
+    """
+    일자별 내보내기 내용(목록 또는 제너레이터) → xlsx (target: 경로 또는 파일 객체).
+    시트별 행은 추가 즉시 임시 파일로 기록됨 (write-only). 반환: 기록한 일자 수
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Font
+
+    from report_core import DASHBOARD_HOURS
+
+    wb = Workbook(write_only=True)
+    ws_media = wb.create_sheet(SHEET_MEDIA)
+    ws_goal = wb.create_sheet(SHEET_GOAL)
+    ws_text = wb.create_sheet(SHEET_TEXT)
+    for ws, widths in ((ws_media, [12, 10, 12]), (ws_goal, [12, 12]), (ws_text, [12, 8, 90])):
+        for col, width in zip("ABC", widths):
+            ws.column_dimensions[col].width = width
+
+    bold = Font(bold=True)
+    wrap = Alignment(wrap_text=True, vertical='top')
+
+    def header(ws, names):
+        cells = []
+        for name in names:
+            cell = WriteOnlyCell(ws, value=name)
+            cell.font = bold
+            cells.append(cell)
+        ws.append(cells)
+
+    def numbers(ws, values):
+        cells = []
+        for value in values:
+            cell = WriteOnlyCell(ws, value=_number(value))
+            cell.number_format = NUMBER_FORMAT
+            cells.append(cell)
+        return cells
+
+    header(ws_media, ['일자', '기준 시간', '매체', '토탈', '상품', '보장분석', '비용', 'CPA'])
+    header(ws_goal, ['일자', '구분', *DASHBOARD_HOURS])
+    header(ws_text, ['일자', '보고', '문구'])
+
+    count = 0
+    for section in sections:
+        day = _day_str(section['day'])
+        for media, row in section['media_stats'].iterrows():
+            ws_media.append([day, section['slot'], media, *numbers(ws_media, row.to_numpy())])
+        for name, row in section['goal'].iterrows():
+            ws_goal.append([day, name, *numbers(ws_goal, row.to_numpy())])
+        for key, text in section['texts'].items():
+            cell = WriteOnlyCell(ws_text, value=text)
+            cell.alignment = wrap
+            ws_text.append([day, key, cell])
+        count += 1
+
+    wb.save(target)
+    return count
+
+
+# -----------------------------------------------------------
+# 3. CLI (기간 내보내기)
+# -----------------------------------------------------------
+def main(argv=None):
+    p = argparse.ArgumentParser(prog="report_export.py", description="저장된 스냅샷 기준 보고 엑셀 (일자/기간)")
+    p.add_argument("--from", dest="day_from", type=datetime.date.fromisoformat, required=True,
+                   help="시작 일자 YYYY-MM-DD")
+    p.add_argument("--to", dest="day_to", type=datetime.date.fromisoformat, help="종료 일자 (기본: 시작 일자)")
+    p.add_argument("--out", required=True, metavar="FILE", help="저장할 엑셀 파일")
+    p.add_argument("--param", action="append", default=[], metavar="KEY=VALUE",
+                   help="보고 설정 변경 (report_core.DEFAULT_PARAMS 키, 여러 번 지정 가능)")
+    p.add_argument("--params-json", metavar="FILE", help="보고 설정 JSON 파일 (--param 이 우선)")
+    p.add_argument("--no-pacing", action="store_true", help="학습 배수 대신 기존 상수 배수 사용")
+    p.add_argument("-v", "--verbose", action="store_true", help="진행 로그 출력")
+    args = p.parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format="%(levelname)s %(message)s", stream=sys.stderr)
+
+    import report_core
+    from cli import parse_param_overrides
+    from snapshot_store import SnapshotStore
+
+    try:
+        params = report_core.report_params(**parse_param_overrides(args.param, report_core.DEFAULT_PARAMS,
+                                                                    args.params_json))
+    except (KeyError, ValueError, OSError) as e:
+        log.error(f"보고 설정 오류: {e}")
+        return 2
+
+    store = SnapshotStore()
+    pacing = None
+    if not args.no_pacing:
+        from pacing_model import PacingModel
+        pacing = PacingModel(os.path.join(os.path.dirname(os.path.abspath(store.path)), "pacing_model.json"))
+        pacing.refresh(store)
+
+    days = write_report_workbook(args.out, snapshot_sections(store, args.day_from, args.day_to or args.day_from,
+                                                             params, pacing=pacing))
+    if not days:
+        log.warning("기간 안에 저장된 스냅샷이 없습니다 (빈 엑셀 저장).")
+    log.info(f"엑셀 저장: {os.path.abspath(args.out)} (일자 {days}개)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
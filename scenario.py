@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+
+# -----------------------------------------------------------
+# 목표/배수 시나리오 일괄 계산 (what-if)
+# - 입력 조합(격자) 수천 개를 NumPy 배열 연산 한 번으로 계산
+# - 계산식은 report_core.compute_targets / estimate_close 와 동일 (조합 1개 = 보고 1회 계산)
+# - 현재 실적(res)·요일·시간대·학습 배수는 고정, 사이드바 목표/설정값만 바꿔 봄
+# -----------------------------------------------------------
+SCENARIO_AXES = {
+    'target_bojang': "보장 목표",
+    'target_product': "상품 목표",
+    'sa_est_bojang': "SA 보장",
+    'sa_est_prod': "SA 상품",
+    'da_add_target': "DA 버퍼",
+    'active_member': "활동 인원",
+    'is_boosting': "긴급 부스팅",
+    'fixed_ad_type': "발송 시간",
+}
+FIXED_AD_TYPES = ["없음", "12시", "14시", "Both"]
+
+SCENARIO_OUTPUTS = {
+    'da_target_18': "18시 목표",
+    'da_per_18': "인당 배분(18시)",
+    'est_18_from_14': "14시 기준 마감 예상",
+    'gap_14': "14시 기준 Gap",
+    'est_final_live': "현재 기준 마감 예상",
+    'gap_live': "현재 기준 Gap",
+    'achieve_live': "달성률(현재 기준)",
+    'cpa_close': "예상 마감 가망CPA(만원)",
+}
+
+MAX_SCENARIOS = 2_000_000  # 격자가 이보다 크면 오류 (메모리 보호)
+
+
+def scenario_grid(base_params, **axes):
+    """
+    축별 후보값 → 모든 조합 표 (지정하지 않은 항목은 base_params 값).
+    예) scenario_grid(params, target_product=range(2800, 3401, 100), active_member=[340, 359, 380])
+    """
+    unknown = set(axes) - set(SCENARIO_AXES)
+    if unknown:
+        raise KeyError(f"알 수 없는 시나리오 항목: {', '.join(sorted(unknown))}")
+    values = {k: list(v) for k, v in axes.items()}
+    size = int(np.prod([len(v) for v in values.values()])) if values else 1
+    if size > MAX_SCENARIOS:
+        raise ValueError(f"시나리오가 너무 많습니다: {size:,}개 (최대 {MAX_SCENARIOS:,})")
+
+    names = list(values)
+    if names:
+        # 축별 인덱스 격자 → 후보값 (object 축도 같은 방식)
+        idx = np.indices([len(values[n]) for n in names]).reshape(len(names), -1)
+        grid = pd.DataFrame({n: np.asarray(values[n], dtype=object)[idx[i]] for i, n in enumerate(names)})
+    else:
+        grid = pd.DataFrame(index=range(1))
+    for key in SCENARIO_AXES:
+        if key not in grid.columns:
+            grid[key] = base_params[key]
+    grid = grid[list(SCENARIO_AXES)]
+    for key in SCENARIO_AXES:
+        if key == 'is_boosting':
+            grid[key] = grid[key].astype(bool)
+        elif key != 'fixed_ad_type':
+            grid[key] = grid[key].astype('int64')
+    return grid
+
+
+def evaluate_scenarios(grid, res, params, pacing=None):
+    """
+    scenario_grid 표 + 현재 실적(res) → 조합별 목표/마감 예상/Gap/CPA 표.
+    day / time 은 params 값 고정, pacing(PacingModel)이 있으면 estimate_close 와 같은 규칙으로 학습 배수 사용.
+    """
+    tb = grid['target_bojang'].to_numpy(dtype='int64')
+    tp = grid['target_product'].to_numpy(dtype='int64')
+    sb = grid['sa_est_bojang'].to_numpy(dtype='int64')
+    sp = grid['sa_est_prod'].to_numpy(dtype='int64')
+    add = grid['da_add_target'].to_numpy(dtype='int64')
+    am = grid['active_member'].to_numpy(dtype='int64')
+    boost = grid['is_boosting'].to_numpy(dtype=bool)
+    no_ad = grid['fixed_ad_type'].to_numpy(dtype=object) == "없음"
+    day, slot = params['day'], params['time']
+    current_total = res['total_cnt']
+
+    # --- compute_targets ---
+    da_target_bojang = tb - sb
+    da_target_prod = tp - sp + add
+    da_target_18 = da_target_bojang + da_target_prod
+    with np.errstate(divide='ignore', invalid='ignore'):
+        target_ratio_ba = np.where(da_target_18 > 0, da_target_bojang / np.where(da_target_18 > 0, da_target_18, 1), 0.898)
+        da_target_17 = np.trunc(da_target_18 * 0.96).astype('int64')
+        safe_am = np.where(am > 0, am, 1)
+        da_per_18 = np.where(am > 0, np.round(da_target_18 / safe_am, 1), 0.0)
+        da_per_17 = np.where(am > 0, np.round(da_target_17 / safe_am, 1), 0.0)
+
+    # --- estimate_close ---
+    if day == '월':
+        mul_14 = np.full(len(grid), 1.15)
+    else:
+        mul_14 = np.where(no_ad, 1.35, 1.215)
+    mul_16 = np.where(boost, 1.25, 1.10)
+
+    est_14 = np.trunc(current_total * mul_14).astype('int64')
+    pace_14 = pacing.multiplier(day, "14:00") if pacing is not None else None
+    if pace_14 is not None:
+        est_14 = np.where(boost, est_14, int(current_total * pace_14['mul']))
+    est_14 = np.where(est_14 > da_target_18 + 250, da_target_18 + 150,
+                      np.where(est_14 < da_target_18 - 250, da_target_18 - 150, est_14))
+    est_ba_14 = np.trunc(est_14 * res['ratio_ba']).astype('int64')
+
+    slot_mul = {
+        "09:30": 1.0, "10:00": 1.75, "11:00": 1.65, "12:00": 1.55, "13:00": 1.45,
+        "14:00": mul_14, "15:00": (mul_14 + mul_16) / 2, "16:00": mul_16,
+        "17:00": np.where(boost, 1.15, 1.05), "18:00": 1.0,
+    }
+    current_mul = np.broadcast_to(np.asarray(slot_mul.get(slot, 1.35), dtype=float), len(grid))
+    est_live = np.trunc(current_total * current_mul).astype('int64')
+    pace_live = pacing.predict(day, slot, current_total) if pacing is not None else None
+    if pace_live is not None:
+        est_live = np.where(boost, est_live, pace_live['est'])
+    est_ba_live = np.trunc(est_live * res['ratio_ba']).astype('int64')
+
+    # --- CPA (14시 보고 '예상 마감' 비용 배수와 같은 기준) ---
+    cost_close = int(res['total_cost'] * 1.35)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cpa_close = np.where(est_live > 0, np.round(cost_close / np.where(est_live > 0, est_live, 1) / 10000, 1), 0.0)
+        achieve_live = np.where(da_target_18 > 0, est_live / np.where(da_target_18 > 0, da_target_18, 1), np.nan)
+        est_per_14 = np.where(am > 0, np.round(est_14 / safe_am, 1), 0.0)
+
+    out = grid.copy()
+    out['da_target_bojang'] = da_target_bojang
+    out['da_target_prod'] = da_target_prod
+    out['da_target_18'] = da_target_18
+    out['da_target_17'] = da_target_17
+    out['target_ratio_ba'] = target_ratio_ba
+    out['da_per_18'] = da_per_18
+    out['da_per_17'] = da_per_17
+    out['current_mul'] = current_mul
+    out['est_18_from_14'] = est_14
+    out['est_ba_18_14'] = est_ba_14
+    out['est_prod_18_14'] = est_14 - est_ba_14
+    out['est_per_14'] = est_per_14
+    out['gap_14'] = est_14 - da_target_18
+    out['on_track_14'] = est_14 >= da_target_18
+    out['est_final_live'] = est_live
+    out['est_ba_live'] = est_ba_live
+    out['est_prod_live'] = est_live - est_ba_live
+    out['gap_live'] = est_live - da_target_18
+    out['achieve_live'] = achieve_live
+    out['cpa_close'] = cpa_close
+    return out
+
+
+def sensitivity_table(scenarios, row, col, value='gap_live', agg='mean'):
+    """두 항목 기준 민감도 표 (나머지 항목은 agg 로 요약)"""
+    return scenarios.pivot_table(index=row, columns=col, values=value, aggfunc=agg)
+
+
+def one_way_sensitivity(scenarios, base_params, value='gap_live'):
+    """
+    항목별 1차원 민감도: 다른 항목은 기준값(base_params)에 고정하고 한 항목만 바꿨을 때 value 범위.
+    반환: 항목 / 최소 / 최대 / 폭 (폭 큰 순)
+    """
+    rows = []
+    for key in SCENARIO_AXES:
+        if scenarios[key].nunique() < 2:
+            continue
+        mask = np.ones(len(scenarios), dtype=bool)
+        for other in SCENARIO_AXES:
+            if other != key and scenarios[other].nunique() > 1:
+                mask &= (scenarios[other] == base_params[other]).to_numpy()
+        subset = scenarios.loc[mask, value]
+        if subset.empty:
+            continue
+        rows.append({'항목': SCENARIO_AXES[key], '최소': subset.min(), '최대': subset.max(),
+                     '폭': subset.max() - subset.min()})
+    return pd.DataFrame(rows, columns=['항목', '최소', '최대', '폭']).sort_values('폭', ascending=False)
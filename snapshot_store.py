@@ -0,0 +1,121 @@
+import contextlib
+import datetime
+import os
+import sqlite3
+
+import pandas as pd
+
+# -----------------------------------------------------------
+# 시간대별 실적 스냅샷 저장소 (SQLite)
+# - convert_to_stats 결과(res['media_product'])를 일자/시간대/매체/상품 단위로 저장
+# - 같은 일자·시간대를 다시 저장하면 덮어씀 (재실행해도 중복 없음)
+# -----------------------------------------------------------
+DEFAULT_DB_PATH = os.path.join(os.path.expanduser("~"), ".local", "share", "meritz_report", "snapshots.db")
+
+TIME_SLOTS = ["09:30", "10:00", "11:00", "12:00", "13:00", "14:00", "15:00", "16:00", "17:00", "18:00"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    day      TEXT NOT NULL,  -- YYYY-MM-DD
+    slot     TEXT NOT NULL,  -- HH:MM (TIME_SLOTS)
+    media    TEXT NOT NULL,
+    product  TEXT NOT NULL,
+    cnt      REAL NOT NULL,
+    cost     REAL NOT NULL,
+    saved_at TEXT NOT NULL,
+    PRIMARY KEY (day, slot, media, product)
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_media ON snapshots (media, day);
+"""
+
+
+def default_db_path():
+    """MERITZ_SNAPSHOT_DB 가 있으면 그 경로, 없으면 기본 경로"""
+    return os.environ.get("MERITZ_SNAPSHOT_DB", DEFAULT_DB_PATH)
+
+
+def _day_str(day):
+    if isinstance(day, (datetime.date, datetime.datetime)):
+        return day.strftime("%Y-%m-%d")
+    return str(day)
+
+
+class SnapshotStore:
+    """일자/시간대/매체/상품 키로 인덱싱된 스냅샷 저장소"""
+
+    def __init__(self, path=None):
+        self.path = path or default_db_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """트랜잭션 단위 연결 (정상 종료 시 commit, 항상 close)"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def save(self, day, slot, res, saved_at=None):
+        """convert_to_stats 결과 저장 (같은 일자·시간대는 교체)"""
+        if slot not in TIME_SLOTS:
+            raise ValueError(f"알 수 없는 시간대: {slot}")
+        day = _day_str(day)
+        saved_at = (saved_at or datetime.datetime.now()).isoformat(timespec="seconds")
+        mp = res['media_product']
+        rows = [
+            (day, slot, m, p, float(c), float(cost), saved_at)
+            for m, p, c, cost in zip(mp['매체'], mp['상품'], mp['Cnt'], mp['Cost'])
+        ]
+        with self._connect() as conn:
+            conn.execute("DELETE FROM snapshots WHERE day = ? AND slot = ?", (day, slot))
+            conn.executemany("INSERT INTO snapshots VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def load_range(self, start, end):
+        """start~end(포함) 스냅샷 (day, slot, media, product, cnt, cost, saved_at)"""
+        with self._connect() as conn:
+            return pd.read_sql_query(
+                "SELECT * FROM snapshots WHERE day BETWEEN ? AND ? ORDER BY day, slot, media, product",
+                conn, params=(_day_str(start), _day_str(end)),
+            )
+
+    def load_day(self, day):
+        return self.load_range(day, day)
+
+    def load_month(self, month):
+        """month: 'YYYY-MM' 또는 date"""
+        if isinstance(month, (datetime.date, datetime.datetime)):
+            month = month.strftime("%Y-%m")
+        return self.load_range(f"{month}-01", f"{month}-31")
+
+    def days(self):
+        with self._connect() as conn:
+            return [r[0] for r in conn.execute("SELECT DISTINCT day FROM snapshots ORDER BY day")]
+
+    def day_signatures(self):
+        """일자별 (마지막 저장 시각, 행 수) — 변경된 일자만 다시 읽을 때 사용"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT day, MAX(saved_at), COUNT(*) FROM snapshots GROUP BY day ORDER BY day")
+            return {day: f"{saved_at}|{cnt}" for day, saved_at, cnt in rows}
+
+    def timeseries(self, start, end=None):
+        """
+        일자×시간대 총 건수/비용 시계열.
+        반환: index=(day, slot), columns=['cnt', 'cost', 'bojang', 'prod']
+        """
+        df = self.load_range(start, end or start)
+        if df.empty:
+            return pd.DataFrame(columns=['cnt', 'cost', 'bojang', 'prod'])
+        df['bojang'] = df['cnt'].where(df['product'] == '보장분석', 0.0)
+        df['prod'] = df['cnt'].where(df['product'] != '보장분석', 0.0)
+        return df.groupby(['day', 'slot'])[['cnt', 'cost', 'bojang', 'prod']].sum()
+
+    def day_progress(self, day):
+        """하루 시간대별 누적 총 건수 (slot → cnt)"""
+        ts = self.timeseries(day)
+        if ts.empty:
+            return pd.Series(dtype=float)
+        return ts.loc[_day_str(day), 'cnt']
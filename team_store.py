@@ -0,0 +1,150 @@
+import contextlib
+import datetime
+import os
+import sqlite3
+
+import pandas as pd
+
+# -----------------------------------------------------------
+# 팀 공유 집계 저장소 (SQLite, WAL)
+# - 매체 담당자별로 자기 파일만 올리면 일자별 통합 집계가 만들어짐
+# - 게시 단위는 (일자, 소스): 같은 소스를 다시 게시하면 그 소스 행만 통째로 교체, 다른 소스는 그대로
+# - 표준 중간 형식(캠페인 단위)만 저장 → 다른 사람 파일을 다시 읽지 않고 convert_to_stats 로 바로 집계
+# - WAL 모드라 읽기는 쓰기와 동시에 진행, 쓰기는 BEGIN IMMEDIATE 로 한 번에 한 세션만
+# -----------------------------------------------------------
+DEFAULT_DB_PATH = os.path.join(os.path.expanduser("~"), ".local", "share", "meritz_report", "team.db")
+
+SOURCE_LABELS = {'naver': "네이버", 'kakao': "카카오", 'toss': "토스", 'google': "구글", 'plab': "Performance Lab"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS team_rows (
+    day      TEXT NOT NULL,  -- YYYY-MM-DD
+    source   TEXT NOT NULL,  -- MEDIA_SOURCES key
+    file     TEXT NOT NULL,
+    media    TEXT NOT NULL,
+    product  TEXT NOT NULL,
+    campaign TEXT NOT NULL,
+    cost     REAL NOT NULL,
+    bojang   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_team_rows_day ON team_rows (day, source);
+CREATE TABLE IF NOT EXISTS team_sources (
+    day        TEXT NOT NULL,
+    source     TEXT NOT NULL,
+    owner      TEXT NOT NULL,
+    files      INTEGER NOT NULL,
+    rows       INTEGER NOT NULL,
+    cost       REAL NOT NULL,
+    bojang     REAL NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (day, source)
+);
+"""
+
+
+def _day_str(day):
+    if isinstance(day, (datetime.date, datetime.datetime)):
+        return day.strftime("%Y-%m-%d")
+    return str(day)
+
+
+class TeamStore:
+    """일자/소스 단위로 교체되는 공유 표준 표"""
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get("MERITZ_TEAM_DB", DEFAULT_DB_PATH)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")  # DB 파일에 기록되어 이후 연결에도 유지
+            with conn:
+                conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """읽기 연결 (항상 close)"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextlib.contextmanager
+    def _write(self):
+        """쓰기 트랜잭션: 시작할 때 쓰기 잠금을 잡아 (다른 세션은 timeout 까지 대기) 도중에 충돌하지 않음"""
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    # --- 게시 -------------------------------------------------
+    def publish(self, day, canon, owner, updated_at=None):
+        """
+        표준 표(select_canonical 결과)에 들어 있는 소스를 일자 단위로 교체.
+        반환: 게시한 소스 목록
+        """
+        if canon is None or canon.empty:
+            return []
+        day = _day_str(day)
+        updated_at = (updated_at or datetime.datetime.now()).isoformat(timespec="microseconds")
+        sources = sorted(canon['source'].astype(object).unique())
+        with self._write() as conn:
+            for source in sources:
+                part = canon[canon['source'] == source]
+                conn.execute("DELETE FROM team_rows WHERE day = ? AND source = ?", (day, source))
+                conn.executemany(
+                    "INSERT INTO team_rows VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    zip([day] * len(part), [source] * len(part), part['file'].astype(str), part['매체'].astype(str),
+                        part['상품'].astype(str), part['campaign'].astype(str),
+                        part['Cost'].astype(float), part['보장'].astype(float)),
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO team_sources VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (day, source, owner, int(part['file'].nunique()), len(part),
+                     float(part['Cost'].sum()), float(part['보장'].sum()), updated_at),
+                )
+        return sources
+
+    def clear(self, day, sources):
+        """소스 게시 취소 (그 소스 행 삭제)"""
+        day = _day_str(day)
+        with self._write() as conn:
+            for source in sources:
+                conn.execute("DELETE FROM team_rows WHERE day = ? AND source = ?", (day, source))
+                conn.execute("DELETE FROM team_sources WHERE day = ? AND source = ?", (day, source))
+
+    # --- 읽기 -------------------------------------------------
+    def sources(self, day):
+        """일자별 소스 게시 현황 (source, owner, files, rows, cost, bojang, updated_at)"""
+        with self._connect() as conn:
+            return pd.read_sql_query(
+                "SELECT source, owner, files, rows, cost, bojang, updated_at FROM team_sources "
+                "WHERE day = ? ORDER BY source", conn, params=(_day_str(day),))
+
+    def signature(self, day):
+        """일자 게시 상태 요약 — 바뀐 경우에만 통합 표를 다시 읽을 때 사용"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT source, updated_at, rows, cost, bojang FROM team_sources "
+                                "WHERE day = ? ORDER BY source", (_day_str(day),)).fetchall()
+        return tuple(rows)
+
+    def load_canonical(self, day):
+        """일자 통합 표준 표 (게시된 소스가 없으면 None)"""
+        import report_core
+
+        with self._connect() as conn:
+            df = pd.read_sql_query(
+                "SELECT source, file, media AS 매체, product AS 상품, campaign, cost AS Cost, bojang AS 보장 "
+                "FROM team_rows WHERE day = ? ORDER BY source, rowid", conn, params=(_day_str(day),))
+        if df.empty:
+            return None
+        return report_core.restore_canonical(df)
@@ -1,12 +1,16 @@
 import streamlit as st
 import pandas as pd
+import os
 import platform
-import io
 import warnings
-import zipfile
-import xml.etree.ElementTree as ET
-import re
-from streamlit_gsheets import GSheetsConnection  # 추가
+from gsheet_mirror import (
+    SheetMirror, GSheetsSource, LocalSheetConnection, default_mirror_path, format_age,
+    open_service_account_spreadsheet,
+)
+from report_core import (
+    clean_currency_series, classify_product_series, get_media_from_plab,
+    load_excel_xml_fallback, convert_to_stats,
+)
 
 # 경고 메시지 무시
 warnings.simplefilter("ignore")
@@ -16,8 +20,46 @@ warnings.simplefilter("ignore")
 # -----------------------------------------------------------
 st.set_page_config(page_title="메리츠 보고 자동화 V18.35 Ultimate", layout="wide")
 
+RAW_WORKSHEET = "RAW_실시간 예상 배분"
+
 # 구글 시트 연결 객체 생성
-conn = st.connection("gsheets", type=GSheetsConnection)
+# - MERITZ_GSHEETS_LOCAL_DIR 지정 시 <폴더>/<탭 이름>.csv 를 시트 대신 사용 (오프라인 테스트)
+def get_sheet_connection():
+    local_dir = os.environ.get("MERITZ_GSHEETS_LOCAL_DIR")
+    if local_dir:
+        return LocalSheetConnection(local_dir)
+    from streamlit_gsheets import GSheetsConnection
+    return st.connection("gsheets", type=GSheetsConnection)
+
+# 서비스 계정 설정이면 gspread 로 같은 시트를 열어 끝부분 범위만 읽음 (실패하면 conn.read 로 전체 읽기)
+def get_sheet_spreadsheet():
+    if os.environ.get("MERITZ_GSHEETS_LOCAL_DIR"):
+        return None
+    try:
+        return open_service_account_spreadsheet(st.secrets["connections"]["gsheets"].to_dict())
+    except Exception:
+        return None
+
+# RAW 시트 로컬 미러: 백그라운드에서 5분마다 증분 동기화, 화면은 로컬 사본만 읽음
+@st.cache_resource
+def get_raw_mirror():
+    mirror = SheetMirror(GSheetsSource(get_sheet_connection(), RAW_WORKSHEET, get_sheet_spreadsheet()),
+                         path=default_mirror_path(RAW_WORKSHEET))
+    mirror.start()
+    return mirror
+
+def show_mirror_status(mirror):
+    status = mirror.status()
+    if status['synced_at'] is None:
+        msg = "🌐 RAW 시트: 첫 동기화 중..." if status['error'] is None else "🌐 RAW 시트: 동기화 실패"
+    else:
+        msg = f"🌐 RAW 시트: {format_age(status['age_seconds'])} 동기화 · {status['rows']:,}행"
+        if status['refreshing']: msg += " · 갱신 중"
+    (st.warning if status['stale'] else st.caption)(msg)
+    if status['error']:
+        st.caption(f"⚠️ 최근 동기화 오류 (이전 사본 사용 중): {status['error']}")
+    if st.button("🔄 지금 동기화", use_container_width=True):
+        mirror.request_refresh()
 
 @st.cache_resource
 def set_korean_font():
@@ -38,69 +80,7 @@ set_korean_font()
 # 1. 유틸리티 및 데이터 처리 함수
 # -----------------------------------------------------------
 
-# [기존 유틸리티 함수들: clean_currency, classify_product, get_media_from_plab 등 동일 유지]
-def clean_currency(x):
-    if pd.isna(x) or x == '': return 0.0
-    if isinstance(x, (int, float)): return float(x)
-    if isinstance(x, str):
-        try: return float(x.replace(',', '').replace('"', '').replace("'", "").strip())
-        except: return 0.0
-    return 0.0
-
-def classify_product(campaign_name):
-    if pd.isna(campaign_name): return '상품'
-    name = str(campaign_name)
-    if '보장' in name or '누적' in name: return '보장분석'
-    else: return '상품'
-
-def get_media_from_plab(row):
-    account = str(row.get('account', '')).upper()
-    gubun = str(row.get('구분', '')).upper()
-    if 'DDN' in account: return '카카오'
-    if 'GDN' in account: return '구글'
-    targets = ['네이버', '카카오', '토스', '구글', 'NAVER', 'KAKAO', 'TOSS', 'GOOGLE']
-    media_map = {'NAVER': '네이버', 'KAKAO': '카카오', 'TOSS': '토스', 'GOOGLE': '구글'}
-    for t in targets:
-        if t in account: return media_map.get(t, t)
-    for t in targets:
-        if t in gubun: return media_map.get(t, t)
-    return '기타'
-
-# [XML 파싱 및 파일 로드 함수 동일 유지...]
-def load_excel_xml_fallback(file):
-    try:
-        file.seek(0)
-        z = zipfile.ZipFile(file)
-        strings = []
-        if 'xl/sharedStrings.xml' in z.namelist():
-            with z.open('xl/sharedStrings.xml') as f:
-                tree = ET.parse(f)
-                root = tree.getroot()
-                ns = {'ns': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
-                for si in root.findall('ns:si', ns):
-                    t = si.find('ns:t', ns)
-                    if t is not None and t.text: strings.append(t.text)
-                    else:
-                        text_parts = [rt.text for rt in si.findall('ns:r/ns:t', ns) if rt.text]
-                        strings.append("".join(text_parts))
-        sheets = [n for n in z.namelist() if n.startswith('xl/worksheets/sheet')]
-        if not sheets: return None
-        with z.open(sheets[0]) as f:
-            tree = ET.parse(f)
-            root = tree.getroot()
-            ns = {'ns': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
-            data = []
-            for row in root.findall('ns:sheetData/ns:row', ns):
-                row_data = []
-                for c in row.findall('ns:c', ns):
-                    t, v_tag = c.get('t'), c.find('ns:v', ns)
-                    val = v_tag.text if v_tag is not None else None
-                    if t == 's' and val is not None: val = strings[int(val)]
-                    row_data.append(val)
-                data.append(row_data)
-        return pd.DataFrame(data[1:], columns=data[0]) if data else None
-    except: return None
-
+# [유틸리티 / XML 파싱 함수는 report_core 공용]
 def load_file_by_rule(file):
     name = file.name
     file.seek(0)
@@ -140,19 +120,19 @@ def process_marketing_data(uploaded_files, use_gsheets=False):
     # [A] 구글 시트에서 데이터 가져오기 로직 추가
     if use_gsheets:
         try:
-            # 탭 이름 'RAW_실시간 예상 배분'을 읽어옵니다.
-            gsheet_df = conn.read(worksheet="RAW_실시간 예상 배분", ttl="5m")
+            # 탭 'RAW_실시간 예상 배분'의 로컬 미러를 읽음 (네트워크 대기 없음)
+            gsheet_df = get_raw_mirror().frame()
             if not gsheet_df.empty:
                 # 구글 시트의 데이터 컬럼명을 기존 로직에 맞게 매핑
                 # 예: 시트의 '비용' -> 'Cost', '상품구분' -> '상품'
-                gsheet_df['Cost'] = gsheet_df['비용'].apply(clean_currency)
-                gsheet_df['상품'] = gsheet_df['상품구분'].apply(classify_product)
+                gsheet_df['Cost'] = clean_currency_series(gsheet_df['비용'])
+                gsheet_df['상품'] = classify_product_series(gsheet_df['상품구분'])
                 gsheet_df['매체'] = gsheet_df['매체명']
-                gsheet_df['보장'] = gsheet_df['실적'].apply(clean_currency)
+                gsheet_df['보장'] = clean_currency_series(gsheet_df['실적'])
                 
                 grouped_gs = gsheet_df.groupby(['매체', '상품'])[['Cost', '보장']].sum().reset_index()
                 dfs.append(grouped_gs)
-                st.success("✅ 구글 시트 데이터 로드 완료")
+                st.success("✅ 구글 시트 데이터 로드 완료 (로컬 미러)")
         except Exception as e:
             st.error(f"❌ 구글 시트 연동 오류: {e}")
 
@@ -167,28 +147,28 @@ def process_marketing_data(uploaded_files, use_gsheets=False):
             
             try:
                 if 'result' in filename: # 네이버
-                    df['Cost'] = df['총 비용'].apply(clean_currency)
-                    df['상품'] = df['캠페인 이름'].apply(classify_product)
+                    df['Cost'] = clean_currency_series(df['총 비용'])
+                    df['상품'] = classify_product_series(df['캠페인 이름'])
                     df['매체'] = '네이버'
                     dfs.append(df.groupby(['매체', '상품'])['Cost'].sum().reset_index().assign(보장=0))
                 elif '메리츠화재다이렉트' in filename: # 카카오
-                    df['Cost'] = df['비용'].apply(clean_currency) * 1.1
-                    df['상품'] = df['캠페인'].apply(classify_product)
+                    df['Cost'] = clean_currency_series(df['비용']) * 1.1
+                    df['상품'] = classify_product_series(df['캠페인'])
                     df['매체'] = '카카오'
                     dfs.append(df.groupby(['매체', '상품'])['Cost'].sum().reset_index().assign(보장=0))
                 elif '메리츠 화재' in filename: # 토스
                     toss_files.append((filename, df))
                 elif '캠페인 보고서' in filename: # 구글
                     df = df[df['캠페인'].notna()]
-                    df['Cost'] = df['비용'].apply(clean_currency) * 1.1 * 1.15
-                    df['상품'] = df['캠페인'].apply(classify_product)
+                    df['Cost'] = clean_currency_series(df['비용']) * 1.1 * 1.15
+                    df['상품'] = classify_product_series(df['캠페인'])
                     df['매체'] = '구글'
                     dfs.append(df.groupby(['매체', '상품'])['Cost'].sum().reset_index().assign(보장=0))
                 elif 'Performance Lab' in filename: # 피랩
                     send_col = next((c for c in df.columns if 'METIS전송' in c), None)
-                    df['보장'] = (df[send_col].apply(clean_currency) - df.get('METIS실패', 0) - df.get('METIS재인입', 0)) if send_col else 0
+                    df['보장'] = (clean_currency_series(df[send_col]) - df.get('METIS실패', 0) - df.get('METIS재인입', 0)) if send_col else 0
                     df['매체'] = df.apply(get_media_from_plab, axis=1)
-                    df['상품'] = df['구분'].apply(classify_product)
+                    df['상품'] = classify_product_series(df['구분'])
                     dfs.append(df.groupby(['매체', '상품'])['보장'].sum().reset_index().assign(Cost=0))
             except: continue
 
@@ -196,41 +176,16 @@ def process_marketing_data(uploaded_files, use_gsheets=False):
         for fname, df in toss_files:
             df = find_header_and_reload(df, '소진 비용')
             if '소진 비용' in df.columns:
-                df['Cost'] = df['소진 비용'].apply(clean_currency) * 1.1
-                df['상품'] = df['캠페인 명'].apply(classify_product)
+                df['Cost'] = clean_currency_series(df['소진 비용']) * 1.1
+                df['상품'] = classify_product_series(df['캠페인 명'])
                 df['매체'] = '토스'
                 dfs.append(df.groupby(['매체', '상품'])['Cost'].sum().reset_index().assign(보장=0))
 
     if not dfs: return None
     final_df = pd.concat(dfs, ignore_index=True).groupby(['매체', '상품']).sum().reset_index()
-    final_df['CPA'] = final_df.apply(lambda x: x['Cost'] / x['보장'] if x['보장'] > 0 else 0, axis=1)
+    final_df['CPA'] = (final_df['Cost'] / final_df['보장'].where(final_df['보장'] > 0)).fillna(0)
     return final_df
 
-# [기존 convert_to_stats 함수 동일 유지]
-def convert_to_stats(final_df, manual_aff_cnt, manual_aff_cost, manual_da_cnt, manual_da_cost):
-    media_list = ['네이버', '카카오', '토스', '구글', '제휴', '기타']
-    stats = pd.DataFrame(index=media_list, columns=['Bojang_Cnt', 'Prod_Cnt', 'Cost', 'CPA']).fillna(0)
-    if final_df is not None:
-        for _, row in final_df.iterrows():
-            m = row['매체'] if row['매체'] in stats.index else '기타'
-            stats.loc[m, 'Cost'] += row['Cost']
-            if row['상품'] == '보장분석': stats.loc[m, 'Bojang_Cnt'] += row['보장']
-            else: stats.loc[m, 'Prod_Cnt'] += row['보장']
-    stats.loc['기타', 'Prod_Cnt'] += manual_da_cnt
-    stats.loc['기타', 'Cost'] += manual_da_cost
-    stats.loc['제휴', 'Bojang_Cnt'] = manual_aff_cnt
-    stats.loc['제휴', 'Cost'] = manual_aff_cost
-    stats['Total_Cnt'] = stats['Bojang_Cnt'] + stats['Prod_Cnt']
-    stats['CPA'] = stats.apply(lambda x: x['Cost'] / x['Total_Cnt'] if x['Total_Cnt'] > 0 else 0, axis=1)
-    
-    res = {'da_cost': int(stats.drop('제휴')['Cost'].sum()), 'da_cnt': int(stats.drop('제휴')['Total_Cnt'].sum()),
-           'da_bojang': int(stats.drop('제휴')['Bojang_Cnt'].sum()), 'da_prod': int(stats.drop('제휴')['Prod_Cnt'].sum()),
-           'aff_cost': int(stats.loc['제휴', 'Cost']), 'aff_cnt': int(stats.loc['제휴', 'Total_Cnt']),
-           'bojang_cnt': int(stats['Bojang_Cnt'].sum()), 'prod_cnt': int(stats['Prod_Cnt'].sum()), 'media_stats': stats}
-    res['total_cost'], res['total_cnt'] = res['da_cost'] + res['aff_cost'], res['da_cnt'] + res['aff_cnt']
-    res['ratio_ba'] = res['bojang_cnt'] / res['total_cnt'] if res['total_cnt'] > 0 else 0.898
-    return res
-
 # -----------------------------------------------------------
 # MODE: V18.35 Master
 # -----------------------------------------------------------
@@ -240,6 +195,8 @@ def run_v18_35_master():
     with st.sidebar:
         st.header("1. 데이터 소스 선택")
         use_gsheets = st.toggle("🌐 구글 시트 RAW 연결", value=True)
+        if use_gsheets:
+            show_mirror_status(get_raw_mirror())
         
         st.header("2. 기본 설정")
         current_time_str = st.select_slider("⏱️ 현재 기준", options=["09:30", "10:00", "11:00", "12:00", "13:00", "14:00", "15:00", "16:00", "17:00", "18:00"], value="14:00")
@@ -268,7 +225,7 @@ def run_v18_35_master():
 
         # --- 데이터 처리 실행 ---
         final_df = process_marketing_data(uploaded_realtime, use_gsheets=use_gsheets)
-        res = convert_to_stats(final_df, manual_aff_cnt, manual_aff_cost, manual_da_cnt, manual_da_cost)
+        res = convert_to_stats(final_df, manual_aff_cnt, manual_aff_cost, manual_da_cnt, manual_da_cost, override_manual=True)
 
     # [이후 시각화 및 탭 구성 로직은 기존 코드와 동일하게 흐름...]
     # (코드 중복 방지를 위해 생략하지만, 실제 파일에는 기존의 Tab0~Tab4 내용을 그대로 유지하시면 됩니다.)